@@ -1,6 +1,95 @@
+import hashlib
 import pygame as pg
-from settings import *
-import os
+from spritesheet import ATLAS
+
+class FrameStore():
+    '''
+    Content addressed store of all animation frames. Every variant of a sprite is transformed
+    only once, and variants which end up with the same pixels, like the round closed Pac-Man in
+    every direction, share one surface. Frames which need no transformation are the sprites of
+    the atlas themselves. The frames must not be drawn on
+
+    Attributes
+    ----------
+    frames : dict
+        The frame of every (file name, rotation, flip)
+    contents : dict
+        The frame of every hash of pixels, size and colorkey
+
+    Methods
+    -------
+    get(sprite, rotation, flip)
+        Returns a sprite, rotated or flipped horizontally
+    '''
+    def __init__(self):
+        self.frames = {}
+        self.contents = {}
+
+    def get(self, sprite, rotation, flip):
+        '''
+        Returns a sprite, rotated or flipped horizontally
+
+        Parameters
+        ----------
+        sprite : string
+            File name of the sprite
+        rotation : int
+            Rotation in degrees, ignored if flip is set
+        flip : bool
+            Whether the sprite is flipped horizontally
+
+        Returns
+        -------
+        pygame.Surface
+            The shared frame
+        '''
+        key = (sprite, 0 if flip else rotation % 360, bool(flip))
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = ATLAS.get(sprite)
+            if flip:
+                frame = pg.transform.flip(frame, True, False)
+            elif key[1]:
+                frame = pg.transform.rotate(frame, key[1])
+            content = hashlib.sha1(pg.image.tostring(frame, "RGBA"))
+            content.update(repr((frame.get_size(), frame.get_colorkey())).encode())
+            frame = self.contents.setdefault(content.hexdigest(), frame)
+            self.frames[key] = frame
+        return frame
+
+
+#the frames shared by all animations
+FRAMES = FrameStore()
+
+
+def find_frame(animations, sprite):
+    '''
+    Looks for a sprite in the frames of a list of animations, so that it can be stored as a
+    position instead of a surface
+
+    Returns
+    -------
+    tuple
+        The index of the animation and of the frame, None if no animation contains the sprite
+    '''
+    for i, anim in enumerate(animations):
+        for j, frame in enumerate(anim.sprites):
+            if frame is sprite:
+                return i, j
+    return None
+
+
+def find_animation(animations, anim):
+    '''
+    Returns
+    -------
+    int
+        The index of anim in animations, None if anim is None
+    '''
+    if anim is None:
+        return None
+    return animations.index(anim)
+
 
 class Animation():
     def __init__(self, anim_type, name):
@@ -15,14 +104,15 @@ class Animation():
     def reset(self):
         self.current_frame = 0
         self.complete = False
+
+    def snapshot(self):
+        return self.current_frame, self.deltatime, self.complete
+
+    def restore(self, state):
+        self.current_frame, self.deltatime, self.complete = state
     
     def add_frame(self, sprite, rotation, flip):
-        if flip:
-            self.sprites.append(pg.transform.flip(pg.image.load(
-            os.path.join(PATH, "assets", "Sprites", sprite)), flip, False))
-        else:
-            self.sprites.append(pg.transform.rotate(pg.image.load(
-            os.path.join(PATH, "assets", "Sprites", sprite)), rotation))
+        self.sprites.append(FRAMES.get(sprite, rotation, flip))
     
     def update(self, deltatime, next_frame=True):
         if next_frame:
@@ -49,6 +139,45 @@ class Animation():
             elif self.anim_type == "frozen":
                 self.current_frame = 0
         return self.sprites[self.current_frame]
+
+    def skip(self, deltatime, ticks):
+        '''
+        Does what ticks calls of update do, a looping animation without going through every tick
+
+        Parameters
+        ----------
+        deltatime : float
+            The time of a tick
+        ticks : int
+            The amount of ticks
+
+        Returns
+        -------
+        pygame.Surface
+            The sprite of the current frame
+        '''
+        if self.anim_type != "looping":
+            for _ in range(ticks):
+                self.update(deltatime)
+            return self.sprites[self.current_frame]
+        #the time adds up from where it is until the next frame, and from 0 for every frame after
+        while ticks:
+            ticks -= 1
+            self.deltatime += deltatime
+            if self.deltatime >= (1.0 / self.fps):
+                self.current_frame += 1
+                self.deltatime = 0
+                break
+        period = 0
+        time = 0
+        while time < (1.0 / self.fps):
+            time += deltatime
+            period += 1
+        frames, rest = divmod(ticks, period)
+        self.current_frame = (self.current_frame + frames) % len(self.sprites)
+        for _ in range(rest):
+            self.deltatime += deltatime
+        return self.sprites[self.current_frame]
     
     
 
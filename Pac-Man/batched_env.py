@@ -0,0 +1,536 @@
+'''
+Contains the BatchedPacmanEnv class, which runs many independent games in lockstep on NumPy arrays
+'''
+import numpy as np
+from settings import *
+from map_script import Map, GHOST_UP_BANNED
+from pellets import AllPellets
+from fruit import FRUITS
+from maze_graph import *
+
+#ghost modes, the same numbers as Ghost.mode
+CHASE = 0
+SCATTER = 1
+FRIGHTENED = 2
+EATEN = 3
+
+#the way between two tile centers is divided into SUBSTEPS, so that all speeds are whole numbers
+SUBSTEPS = 96
+PACMAN_SPEED = 80 * SUBSTEPS // (TILEWIDTH * FPS)
+GHOST_SPEED = 80 * SUBSTEPS // (TILEWIDTH * FPS)
+CRUISE_SPEED = 90 * SUBSTEPS // (TILEWIDTH * FPS)
+FRIGHTENED_SPEED = 60 * SUBSTEPS // (TILEWIDTH * FPS)
+EATEN_SPEED = 160 * SUBSTEPS // (TILEWIDTH * FPS)
+
+#ghosts in the order Blinky, Pinky, Inky, Clyde. Corners are the same as in ghosts.py
+GHOST_CORNERS = np.array([(25, -1), (3, -1), (27, 34), (0, 34)], dtype=np.float64)
+DOOR_TILE = (14, 14)
+DOOR_TARGET = (13.5, 14)
+PACMAN_TILE = (14, 26)
+FRUIT_POSITION = (13.5 * TILEWIDTH, 20 * TILEHEIGHT)
+
+#length of the scatter and chase phases in seconds, starting with scatter. Chase lasts forever afterwards
+MODE_TIMES = [15, 20, 7, 20, 5, 20, 5]
+FRIGHTENED_TIME = 8
+LIVES = 5
+
+
+class BatchedPacmanEnv():
+    '''
+    Runs n independent games in lockstep. The state of all games is stored as one NumPy array
+    per property, so a single call of step advances all games with a few vectorized operations.
+
+    Movement happens on the tile grid with whole-numbered progress between two tile centers,
+    using the node table of Map and the targeting rules of Blinky, Pinky, Inky and Clyde. The
+    ghost cage is simplified: released and revived ghosts appear right at the cage entrance
+
+    Parameters
+    ----------
+    n : int
+        The amount of games
+    seed : int
+        Seed of the random number generator used for frightened ghosts and fruit
+    auto_reset : bool
+        If True, finished games start over at the end of the step they ended in
+    fruit_type : string
+        The fruit of all games, which decides its points like in Fruit
+
+    Attributes
+    ----------
+    move_table : numpy.ndarray
+        Bitmask of allowed directions for every tile
+    pellet_template : numpy.ndarray
+        The pellets of a new level, one byte per tile like AllPellets.grid
+    pac_x, pac_y : numpy.ndarray
+        Pac-Man's last tile center, shape (n,)
+    pac_dir : numpy.ndarray
+        Pac-Man's direction index
+    pac_progress : numpy.ndarray
+        Progress from the tile center towards the next tile in SUBSTEPS
+    pac_stopped : numpy.ndarray
+        True if Pac-Man stands still
+    pac_remember : numpy.ndarray
+        Input which is used at the next tile center, NO_ACTION if there is none
+    pac_stop_frame : numpy.ndarray
+        True if Pac-Man rests for a tick after eating a pellet
+    ghost_x, ghost_y, ghost_dir, ghost_progress : numpy.ndarray
+        Like the values of Pac-Man, shape (n, 4)
+    ghost_mode : numpy.ndarray
+        The mode of every ghost, CHASE, SCATTER, FRIGHTENED or EATEN
+    ghost_home : numpy.ndarray
+        True if the ghost still waits in the cage
+    pellets : numpy.ndarray
+        Pellet bitmap of every game, shape (n, GRIDROWS * GRIDCOLS)
+    pellets_left, pellets_eaten : numpy.ndarray
+        Remaining and eaten pellets of the current level
+    score, lives, level, ticks : numpy.ndarray
+        The score, lives, level and the amount of ticks played of every game
+    mode_phase, mode_ticks : numpy.ndarray
+        Index into MODE_TIMES and ticks spent in that phase
+    frightened_ticks : numpy.ndarray
+        Remaining ticks of the frightened phase
+    ghosts_eaten : numpy.ndarray
+        Ghosts eaten during the current frightened phase
+    release_count, release_base : numpy.ndarray
+        Amount of released ghosts and eaten pellets at the start of the current life
+    cruising : numpy.ndarray
+        True once Blinky speeds up
+    fruit_state, fruit_ticks, fruit_length : numpy.ndarray
+        0 before, 1 while and 2 after the fruit is shown, its display ticks and their maximum
+    fruit_points : int
+        The points for eating the fruit
+    done : numpy.ndarray
+        True for games which are over
+
+    Methods
+    -------
+    reset(mask)
+        Starts new games
+    reset_level(mask)
+        Puts Pac-Man and the ghosts back to their starting positions
+    step(actions)
+        Advances all games by one tick
+    '''
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, n, seed=None, auto_reset=True, fruit_type="cherry"):
+        self.n = n
+        self.auto_reset = auto_reset
+        self.fruit_points = FRUITS[fruit_type][1]
+        self.rng = np.random.default_rng(seed)
+        self.index = np.arange(n)
+
+        _map = Map()
+        pellets = AllPellets()
+        self.move_table = build_move_table(_map)
+        self.pellet_template = np.frombuffer(bytes(pellets.grid), dtype=np.uint8)
+        self.up_banned = (np.frombuffer(_map.moves, dtype=np.uint8) & GHOST_UP_BANNED) != 0
+        self.mode_ticks_table = np.array([t * FPS for t in MODE_TIMES] + [np.iinfo(np.int64).max])
+
+        self.pac_x = np.zeros(n, dtype=np.int64)
+        self.pac_y = np.zeros(n, dtype=np.int64)
+        self.pac_dir = np.zeros(n, dtype=np.int64)
+        self.pac_progress = np.zeros(n, dtype=np.int64)
+        self.pac_stopped = np.zeros(n, dtype=bool)
+        self.pac_remember = np.zeros(n, dtype=np.int64)
+        self.pac_stop_frame = np.zeros(n, dtype=bool)
+        self.ghost_x = np.zeros((n, 4), dtype=np.int64)
+        self.ghost_y = np.zeros((n, 4), dtype=np.int64)
+        self.ghost_dir = np.zeros((n, 4), dtype=np.int64)
+        self.ghost_progress = np.zeros((n, 4), dtype=np.int64)
+        self.ghost_mode = np.zeros((n, 4), dtype=np.int64)
+        self.ghost_home = np.zeros((n, 4), dtype=bool)
+        self.pellets = np.zeros((n, GRIDROWS * GRIDCOLS), dtype=np.uint8)
+        self.pellets_left = np.zeros(n, dtype=np.int64)
+        self.pellets_eaten = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.mode_phase = np.zeros(n, dtype=np.int64)
+        self.mode_ticks = np.zeros(n, dtype=np.int64)
+        self.frightened_ticks = np.zeros(n, dtype=np.int64)
+        self.ghosts_eaten = np.zeros(n, dtype=np.int64)
+        self.release_count = np.zeros(n, dtype=np.int64)
+        self.release_base = np.zeros(n, dtype=np.int64)
+        self.release_steps = np.zeros(n, dtype=np.int64)
+        self.cruising = np.zeros(n, dtype=bool)
+        self.fruit_state = np.zeros(n, dtype=np.int64)
+        self.fruit_ticks = np.zeros(n, dtype=np.int64)
+        self.fruit_length = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        '''
+        Starts new games
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            Boolean array of the games to reset, all games if None
+        '''
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.pellets[mask] = self.pellet_template
+        self.pellets_left[mask] = np.count_nonzero(self.pellet_template)
+        self.pellets_eaten[mask] = 0
+        self.score[mask] = 0
+        self.lives[mask] = LIVES
+        self.level[mask] = 1
+        self.ticks[mask] = 0
+        self.fruit_state[mask] = 0
+        self.fruit_ticks[mask] = 0
+        self.fruit_length[mask] = self.rng.integers(15, 41, size=self.n)[mask] * FPS
+        self.done[mask] = False
+        self.reset_level(mask)
+        #the first ghosts leave the cage later than after a death
+        self.release_steps[mask] = 30
+
+    def reset_level(self, mask):
+        '''
+        Puts Pac-Man and the ghosts back to their starting positions and restarts the mode timers
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            Boolean array of the games to reset
+        '''
+        self.pac_x[mask] = PACMAN_TILE[0]
+        self.pac_y[mask] = PACMAN_TILE[1]
+        self.pac_dir[mask] = D_LEFT
+        self.pac_progress[mask] = SUBSTEPS // 2
+        self.pac_stopped[mask] = True
+        self.pac_remember[mask] = NO_ACTION
+        self.pac_stop_frame[mask] = False
+
+        self.ghost_x[mask] = DOOR_TILE[0]
+        self.ghost_y[mask] = DOOR_TILE[1]
+        self.ghost_dir[mask] = D_LEFT
+        self.ghost_progress[mask] = SUBSTEPS // 2
+        self.ghost_mode[mask] = SCATTER
+        self.ghost_home[mask] = True
+        self.ghost_home[mask, 0] = False
+
+        self.mode_phase[mask] = 0
+        self.mode_ticks[mask] = 0
+        self.frightened_ticks[mask] = 0
+        self.ghosts_eaten[mask] = 0
+        self.release_count[mask] = 0
+        self.release_base[mask] = self.pellets_eaten[mask]
+        self.release_steps[mask] = 10
+        self.cruising[mask] = False
+
+    def step(self, actions):
+        '''
+        Advances all games by one tick
+
+        Parameters
+        ----------
+        actions : numpy.ndarray
+            The direction index for Pac-Man of every game, NO_ACTION if there is no input
+
+        Returns
+        -------
+        tuple
+            The reward(score increase) and the done flag of every game
+        '''
+        actions = np.asarray(actions, dtype=np.int64)
+        previous_score = self.score.copy()
+        running = ~self.done
+        self.ticks += running
+
+        self.move_pacman(actions, running)
+        self.eat_pellets(running)
+        self.check_fruit(running)
+        self.update_modes(running)
+        self.move_ghosts(running)
+        self.release_ghosts(running)
+        self.check_collisions(running)
+
+        cleared = running & (self.pellets_left == 0)
+        if cleared.any():
+            self.level += cleared
+            self.pellets[cleared] = self.pellet_template
+            self.pellets_left[cleared] = np.count_nonzero(self.pellet_template)
+            self.pellets_eaten[cleared] = 0
+            self.reset_level(cleared)
+
+        rewards = self.score - previous_score
+        done = self.done.copy()
+        if self.auto_reset and done.any():
+            self.reset(done)
+        return rewards, done
+
+    def move_pacman(self, actions, running):
+        '''
+        Applies the input and moves Pac-Man. Reversing is always possible, all other
+        turns are taken at tile centers, or remembered until the next one
+        '''
+        direction = self.pac_dir
+        has_action = running & (actions != NO_ACTION)
+        reverse = has_action & (actions == REVERSE[direction])
+        parallel = reverse | (has_action & (actions == direction))
+        between = self.pac_progress > 0
+
+        #turn around between two tiles
+        turn = between & reverse
+        self.pac_x = np.where(turn, (self.pac_x + DIR_X[direction]) % GRIDCOLS, self.pac_x)
+        self.pac_y = np.where(turn, self.pac_y + DIR_Y[direction], self.pac_y)
+        self.pac_progress = np.where(turn, SUBSTEPS - self.pac_progress, self.pac_progress)
+        self.pac_dir = np.where(turn, actions, direction)
+        self.pac_stopped &= ~(between & parallel)
+        self.pac_remember = np.where(between & has_action & ~parallel, actions, self.pac_remember)
+
+        #move, except for the tick after eating a pellet
+        moving = running & ~self.pac_stopped & ~self.pac_stop_frame
+        self.pac_stop_frame &= ~running
+        self.pac_progress += moving * PACMAN_SPEED
+        arrived = self.pac_progress >= SUBSTEPS
+        self.pac_x = np.where(arrived, (self.pac_x + DIR_X[self.pac_dir]) % GRIDCOLS, self.pac_x)
+        self.pac_y = np.where(arrived, self.pac_y + DIR_Y[self.pac_dir], self.pac_y)
+        self.pac_progress -= arrived * SUBSTEPS
+
+        #decide on the tile center, input first, then remembered input, then going straight on
+        center = running & (arrived | (self.pac_stopped & (self.pac_progress == 0)))
+        allowed = self.move_table[self.pac_y * GRIDCOLS + self.pac_x]
+        action_ok = has_action & ((allowed >> np.minimum(actions, 3)) & 1).astype(bool)
+        remember_ok = (self.pac_remember != NO_ACTION) & \
+            ((allowed >> np.minimum(self.pac_remember, 3)) & 1).astype(bool)
+        straight_ok = ~self.pac_stopped & ((allowed >> self.pac_dir) & 1).astype(bool)
+        new_dir = np.where(action_ok, actions, np.where(remember_ok, self.pac_remember, self.pac_dir))
+        go = action_ok | remember_ok | straight_ok
+        self.pac_remember = np.where(center & ~action_ok & remember_ok, NO_ACTION, self.pac_remember)
+        self.pac_dir = np.where(center, new_dir, self.pac_dir)
+        self.pac_stopped = np.where(center, ~go, self.pac_stopped)
+        self.pac_progress = np.where(center & ~go, 0, self.pac_progress)
+        parallel_memory = (self.pac_remember == self.pac_dir) | (self.pac_remember == REVERSE[self.pac_dir])
+        self.pac_remember = np.where(parallel_memory, NO_ACTION, self.pac_remember)
+
+    def pacman_tile(self):
+        '''
+        Returns
+        -------
+        tuple
+            The x and y coordinates of the tile center closest to Pac-Man
+        '''
+        ahead = self.pac_progress * 2 >= SUBSTEPS
+        x = (self.pac_x + ahead * DIR_X[self.pac_dir]) % GRIDCOLS
+        y = self.pac_y + ahead * DIR_Y[self.pac_dir]
+        return x, y
+
+    def eat_pellets(self, running):
+        '''
+        Eats the pellet on Pac-Man's tile and starts the frightened phase for power pellets
+        '''
+        x, y = self.pacman_tile()
+        tile = y * GRIDCOLS + x
+        pellet = self.pellets[self.index, tile] * running
+        eaten = pellet > 0
+        if not eaten.any():
+            return
+        power = pellet == 2
+        self.pellets[self.index[eaten], tile[eaten]] = 0
+        self.pellets_left -= eaten
+        self.pellets_eaten += eaten
+        self.score += np.where(power, 50, eaten * 10)
+        self.pac_stop_frame |= eaten
+
+        cruise = ~self.cruising & (self.pellets_eaten >= self.release_base + 60)
+        self.cruising |= cruise
+
+        if power.any():
+            self.ghosts_eaten = np.where(power & (self.frightened_ticks == 0), 0, self.ghosts_eaten)
+            self.frightened_ticks = np.where(power, FRIGHTENED_TIME * FPS, self.frightened_ticks)
+            scared = power[:, None] & (self.ghost_mode < FRIGHTENED)
+            self.reverse_ghosts(scared & ~self.ghost_home)
+            self.ghost_mode = np.where(scared, FRIGHTENED, self.ghost_mode)
+
+    def check_fruit(self, running):
+        '''
+        Shows the fruit after 10 seconds for fruit_length ticks and checks whether it is eaten
+        '''
+        appear = running & (self.fruit_state == 0) & (self.ticks >= 10 * FPS)
+        self.fruit_state = np.where(appear, 1, self.fruit_state)
+        shown = running & (self.fruit_state == 1)
+        self.fruit_ticks += shown
+        d_x = self.pac_x * TILEWIDTH + TILEWIDTH / 2 + \
+            DIR_X[self.pac_dir] * self.pac_progress * TILEWIDTH / SUBSTEPS - FRUIT_POSITION[0]
+        d_y = self.pac_y * TILEHEIGHT + TILEHEIGHT / 2 + \
+            DIR_Y[self.pac_dir] * self.pac_progress * TILEHEIGHT / SUBSTEPS - FRUIT_POSITION[1]
+        eaten = shown & (d_x * d_x + d_y * d_y < 16 ** 2)
+        self.score += eaten * self.fruit_points
+        gone = eaten | (shown & (self.fruit_ticks >= self.fruit_length))
+        self.fruit_state = np.where(gone, 2, self.fruit_state)
+
+    def update_modes(self, running):
+        '''
+        Advances the frightened and the scatter/chase timers. The scatter/chase timer is paused
+        while the ghosts are frightened
+        '''
+        frightened = running & (self.frightened_ticks > 0)
+        self.frightened_ticks -= frightened
+        over = frightened & (self.frightened_ticks == 0)
+        current = np.where(self.mode_phase % 2 == 0, SCATTER, CHASE)
+        self.ghost_mode = np.where(over[:, None] & (self.ghost_mode == FRIGHTENED), current[:, None], self.ghost_mode)
+
+        counting = running & (self.frightened_ticks == 0)
+        self.mode_ticks += counting
+        switch = counting & (self.mode_ticks >= self.mode_ticks_table[self.mode_phase])
+        if switch.any():
+            self.mode_phase += switch
+            self.mode_ticks = np.where(switch, 0, self.mode_ticks)
+            current = np.where(self.mode_phase % 2 == 0, SCATTER, CHASE)
+            change = switch[:, None] & (self.ghost_mode < FRIGHTENED)
+            self.reverse_ghosts(change & ~self.ghost_home)
+            self.ghost_mode = np.where(change, current[:, None], self.ghost_mode)
+
+    def reverse_ghosts(self, mask):
+        '''
+        Turns the selected ghosts around, so that they head back to the tile they came from
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            Boolean array of shape (n, 4)
+        '''
+        direction = self.ghost_dir
+        self.ghost_x = np.where(mask, (self.ghost_x + DIR_X[direction]) % GRIDCOLS, self.ghost_x)
+        self.ghost_y = np.where(mask, self.ghost_y + DIR_Y[direction], self.ghost_y)
+        self.ghost_progress = np.where(mask, SUBSTEPS - self.ghost_progress, self.ghost_progress)
+        self.ghost_dir = np.where(mask, REVERSE[direction], direction)
+
+    def ghost_targets(self):
+        '''
+        Computes the target tile of every ghost according to its mode
+
+        Returns
+        -------
+        tuple
+            The x and y coordinates of the targets, shape (n, 4)
+        '''
+        pac_x, pac_y = self.pacman_tile()
+        moving = ~self.pac_stopped
+        dir_x = DIR_X[self.pac_dir] * moving
+        dir_y = DIR_Y[self.pac_dir] * moving
+        up = moving & (self.pac_dir == D_UP)
+
+        ahead = self.ghost_progress * 2 >= SUBSTEPS
+        tile_x = self.ghost_x + ahead * DIR_X[self.ghost_dir]
+        tile_y = self.ghost_y + ahead * DIR_Y[self.ghost_dir]
+
+        target_x = np.empty((self.n, 4))
+        target_y = np.empty((self.n, 4))
+        #Blinky targets Pac-Man
+        target_x[:, 0] = pac_x
+        target_y[:, 0] = pac_y
+        #Pinky targets 4 tiles ahead of Pac-Man
+        target_x[:, 1] = pac_x + dir_x * 4 - up * 4
+        target_y[:, 1] = pac_y + dir_y * 4
+        #Inky doubles the vector from Blinky to 2 tiles ahead of Pac-Man
+        target_x[:, 2] = tile_x[:, 0] + (pac_x + dir_x * 2 - tile_x[:, 0]) * 2 + up * 2
+        target_y[:, 2] = tile_y[:, 0] + (pac_y + dir_y * 2 - tile_y[:, 0]) * 2
+        #Clyde targets Pac-Man, unless he is closer than 8 tiles
+        close = (pac_x - tile_x[:, 3]) ** 2 + (pac_y - tile_y[:, 3]) ** 2 < 8 ** 2
+        target_x[:, 3] = np.where(close, GHOST_CORNERS[3, 0], pac_x)
+        target_y[:, 3] = np.where(close, GHOST_CORNERS[3, 1], pac_y)
+
+        scatter = self.ghost_mode == SCATTER
+        target_x = np.where(scatter, GHOST_CORNERS[:, 0], target_x)
+        target_y = np.where(scatter, GHOST_CORNERS[:, 1], target_y)
+        eaten = self.ghost_mode == EATEN
+        target_x = np.where(eaten, DOOR_TARGET[0], target_x)
+        target_y = np.where(eaten, DOOR_TARGET[1], target_y)
+        return target_x, target_y
+
+    def move_ghosts(self, running):
+        '''
+        Moves all ghosts outside of the cage and lets the ones on a tile center choose their
+        next direction
+        '''
+        speed = np.select(
+            [self.ghost_mode == EATEN, self.ghost_mode == FRIGHTENED],
+            [EATEN_SPEED, FRIGHTENED_SPEED],
+            GHOST_SPEED
+        )
+        speed[:, 0] = np.where(self.cruising & (self.ghost_mode[:, 0] < FRIGHTENED), CRUISE_SPEED, speed[:, 0])
+        active = running[:, None] & ~self.ghost_home
+        self.ghost_progress += speed * active
+        #a ghost only arrives once it passed the tile center, so a ghost which turns around
+        #always has a progress between 0 and SUBSTEPS towards the tile it came from
+        arrived = self.ghost_progress > SUBSTEPS
+        if not arrived.any():
+            return
+        self.ghost_x = np.where(arrived, (self.ghost_x + DIR_X[self.ghost_dir]) % GRIDCOLS, self.ghost_x)
+        self.ghost_y = np.where(arrived, self.ghost_y + DIR_Y[self.ghost_dir], self.ghost_y)
+        self.ghost_progress -= arrived * SUBSTEPS
+
+        #eaten ghosts revive at the cage entrance
+        revive = arrived & (self.ghost_mode == EATEN) & (self.ghost_y == DOOR_TILE[1]) & \
+            ((self.ghost_x == DOOR_TILE[0]) | (self.ghost_x == DOOR_TILE[0] - 1))
+        current = np.where(self.mode_phase % 2 == 0, SCATTER, CHASE)
+        self.ghost_mode = np.where(revive, current[:, None], self.ghost_mode)
+
+        #possible directions, ghosts never reverse and some tiles forbid going up
+        tile = self.ghost_y * GRIDCOLS + self.ghost_x
+        allowed = (self.move_table[tile][:, :, None] >> np.arange(4)) & 1
+        allowed = allowed.astype(bool)
+        allowed &= np.arange(4) != REVERSE[self.ghost_dir][:, :, None]
+        allowed[:, :, D_UP] &= ~self.up_banned[tile]
+        stuck = ~allowed.any(axis=2)
+
+        target_x, target_y = self.ghost_targets()
+        d_x = self.ghost_x[:, :, None] + DIR_X[:4] - target_x[:, :, None]
+        d_y = self.ghost_y[:, :, None] + DIR_Y[:4] - target_y[:, :, None]
+        distance = np.where(allowed, d_x * d_x + d_y * d_y, np.inf)
+        chosen = np.argmin(distance, axis=2)
+        randomly = np.argmax(self.rng.random((self.n, 4, 4)) * allowed, axis=2)
+        chosen = np.where(self.ghost_mode == FRIGHTENED, randomly, chosen)
+        self.ghost_dir = np.where(arrived & ~stuck, chosen, self.ghost_dir)
+
+        self.ghost_x = np.where(revive, DOOR_TILE[0], self.ghost_x)
+        self.ghost_dir = np.where(revive, D_LEFT, self.ghost_dir)
+        self.ghost_progress = np.where(revive, SUBSTEPS // 2, self.ghost_progress)
+
+    def release_ghosts(self, running):
+        '''
+        Releases the next ghost from the cage once enough pellets have been eaten
+        '''
+        threshold = self.release_base + self.release_count * self.release_steps
+        release = running & (self.release_count < 3) & (self.pellets_eaten >= threshold)
+        if not release.any():
+            return
+        ghost = np.minimum(self.release_count + 1, 3)
+        self.ghost_home[self.index[release], ghost[release]] = False
+        self.release_count += release
+
+    def check_collisions(self, running):
+        '''
+        Checks for collisions between Pac-Man and the ghosts, frightened ghosts get eaten,
+        all others take one of Pac-Man's lives
+        '''
+        pac_x = self.pac_x * TILEWIDTH + DIR_X[self.pac_dir] * self.pac_progress * TILEWIDTH / SUBSTEPS
+        pac_y = self.pac_y * TILEHEIGHT + DIR_Y[self.pac_dir] * self.pac_progress * TILEHEIGHT / SUBSTEPS
+        ghost_x = self.ghost_x * TILEWIDTH + DIR_X[self.ghost_dir] * self.ghost_progress * TILEWIDTH / SUBSTEPS
+        ghost_y = self.ghost_y * TILEHEIGHT + DIR_Y[self.ghost_dir] * self.ghost_progress * TILEHEIGHT / SUBSTEPS
+        d_x = ghost_x - pac_x[:, None]
+        d_y = ghost_y - pac_y[:, None]
+        touching = running[:, None] & ~self.ghost_home & (d_x * d_x + d_y * d_y <= 16 ** 2)
+        if not touching.any():
+            return
+
+        eaten = touching & (self.ghost_mode == FRIGHTENED)
+        for ghost in range(4):
+            points = 200 * 2 ** self.ghosts_eaten
+            self.score += eaten[:, ghost] * points
+            self.ghosts_eaten += eaten[:, ghost]
+        self.ghost_mode = np.where(eaten, EATEN, self.ghost_mode)
+        #the frightened phase ends early once no frightened ghost is left
+        self.frightened_ticks = np.where((self.ghost_mode == FRIGHTENED).any(axis=1), self.frightened_ticks, 0)
+
+        caught = (touching & (self.ghost_mode < FRIGHTENED)).any(axis=1)
+        if caught.any():
+            self.lives -= caught
+            self.done |= caught & (self.lives == 0)
+            self.reset_level(caught & ~self.done)
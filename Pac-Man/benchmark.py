@@ -0,0 +1,429 @@
+'''
+Benchmarks the game loop and its subsystems and writes the results as JSON
+
+Runs scripted episodes, in which Pac-Man takes a random direction every half second, once
+headless, once headless with Simulation.advance and once rendered to a hidden window, so the
+results can be compared between releases. Coarse steps of several frames are checked against
+as many single steps
+
+Usage: python benchmark.py [--episodes N] [--frames N] [--seed N] [--output FILE]
+'''
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+#render into a hidden window, play no sound and keep stdout free for the results
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+from settings import *
+from vectors import Vector2
+from pacman import Pacman
+from ghosts import AllGhosts
+from simulation import Simulation, PELLET_EATEN, POWER_PELLET_EATEN, DEATH
+from text import Text
+import main
+
+#amounts of ticks simulated per rendered frame
+SPEEDS = [1, 2, 4, 8]
+#amounts of frames per coarse step of Simulation.step
+COARSE_FRAMES = [2, 4, 8]
+#the subsystems which are timed, as (name, class, method name)
+SUBSYSTEMS = [
+    ("Pacman.update", Pacman, "update"),
+    ("AllGhosts.update", AllGhosts, "update"),
+    ("Simulation.check_pellet_collision", Simulation, "check_pellet_collision"),
+    ("GameController.render", main.GameController, "render"),
+    ("Text.create_textbox", Text, "create_textbox")
+]
+
+
+class ScriptedInput():
+    '''
+    Chooses a random direction every 30 ticks, the same for the same seed
+
+    Parameters
+    ----------
+    seed : int
+        Seed of the random directions
+    '''
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.ticks = 0
+        self.direction = LEFT
+
+    def __call__(self):
+        if self.ticks % 30 == 0:
+            self.direction = self.random.choice([UP, LEFT, DOWN, RIGHT])
+        self.ticks += 1
+        return self.direction
+
+
+class Timings():
+    '''
+    Sums up the amount of calls and the time spent in each subsystem
+
+    Methods
+    -------
+    wrap(name, func)
+        Returns func, which now is timed under name
+    results()
+        Returns the timings as a dictionary
+    '''
+    def __init__(self):
+        self.calls = {}
+        self.total = {}
+
+    def wrap(self, name, func):
+        self.calls.setdefault(name, 0)
+        self.total.setdefault(name, 0)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.total[name] += time.perf_counter_ns() - start
+                self.calls[name] += 1
+        return timed
+
+    def results(self):
+        return {
+            name: {
+                "calls": self.calls[name],
+                "total_ms": self.total[name] / 1e6,
+                "mean_us": self.total[name] / self.calls[name] / 1e3 if self.calls[name] else None
+            }
+            for name in self.calls
+        }
+
+
+@contextmanager
+def timed_subsystems(timings):
+    '''
+    Times all SUBSYSTEMS while the context is active
+    '''
+    originals = [(cls, method, getattr(cls, method)) for _, cls, method in SUBSYSTEMS]
+    for name, cls, method in SUBSYSTEMS:
+        setattr(cls, method, timings.wrap(name, getattr(cls, method)))
+    try:
+        yield timings
+    finally:
+        for cls, method, func in originals:
+            setattr(cls, method, func)
+
+
+class NoClock():
+    '''
+    Replaces the clock of the GameController, so frames are not limited to FPS
+    '''
+    def tick(self, framerate=0):
+        return 0
+
+
+def new_controller(seed):
+    '''
+    Returns a GameController, whose input is scripted and whose frames are not limited. The
+    pauses between the parts of the game are skipped
+    '''
+    game = main.GameController(seed)
+    game.clock = NoClock()
+    game.pauses = False
+    game.sim.pacman.possible_dirs = ScriptedInput(seed)
+    return game
+
+
+def run_headless(episodes, seed):
+    '''
+    Plays whole games without a window
+
+    Parameters
+    ----------
+    episodes : int
+        The amount of games
+    seed : int
+        Seed of the first game, every following game uses the next one
+
+    Returns
+    -------
+    dict
+        Ticks per second and the timings of the subsystems
+    '''
+    timings = Timings()
+    ticks = 0
+    scores = []
+    seconds = 0
+    with timed_subsystems(timings):
+        for episode in range(episodes):
+            sim = Simulation(seed=seed + episode)
+            script = ScriptedInput(seed + episode)
+            start = time.perf_counter()
+            while not sim.gameover:
+                sim.step(script())
+                ticks += 1
+            seconds += time.perf_counter() - start
+            scores.append(sim.score)
+    return {
+        "episodes": episodes,
+        "ticks": ticks,
+        "seconds": seconds,
+        "ticks_per_second": ticks / seconds,
+        "scores": scores,
+        "subsystems": timings.results()
+    }
+
+
+def run_headless_advance(episodes, seed):
+    '''
+    Plays the same games as run_headless, but lets Simulation.advance skip the ticks in
+    which nothing happens, up to the next change of direction of the script
+
+    Parameters
+    ----------
+    episodes : int
+        The amount of games
+    seed : int
+        Seed of the first game, every following game uses the next one
+
+    Returns
+    -------
+    dict
+        Ticks per second, the amount of calls of advance and the scores, which are the same
+        as those of run_headless
+    '''
+    ticks = 0
+    calls = 0
+    scores = []
+    seconds = 0
+    for episode in range(episodes):
+        sim = Simulation(seed=seed + episode)
+        script = ScriptedInput(seed + episode)
+        start = time.perf_counter()
+        while not sim.gameover:
+            script.ticks = sim.ticks
+            sim.advance(script(), 30 - sim.ticks % 30)
+            calls += 1
+        seconds += time.perf_counter() - start
+        ticks += sim.ticks
+        scores.append(sim.score)
+    return {
+        "episodes": episodes,
+        "ticks": ticks,
+        "advance_calls": calls,
+        "seconds": seconds,
+        "ticks_per_second": ticks / seconds,
+        "scores": scores
+    }
+
+
+def step_outcome(sim, score, events):
+    '''
+    Returns
+    -------
+    tuple
+        The points scored since score, the positions of the pellets eaten and whether
+        Pac-Man died
+    '''
+    pellets = sorted(position.as_tuple() for event, _, position in events
+                     if event in (PELLET_EATEN, POWER_PELLET_EATEN))
+    return sim.score - score, pellets, any(event == DEATH for event, _, _ in events)
+
+
+def run_headless_coarse(frames, episodes, seed):
+    '''
+    Plays the same games as run_headless in coarse steps of several frames. Every coarse
+    step is also played as single steps from the same state, and the points, pellets and
+    deaths of both are compared
+
+    Parameters
+    ----------
+    frames : int
+        The amount of frames of a coarse step
+    episodes : int
+        The amount of games
+    seed : int
+        Seed of the first game, every following game uses the next one
+
+    Returns
+    -------
+    dict
+        Ticks per second of the coarse steps alone and the amount of steps whose outcome
+        differs from that of the single steps
+    '''
+    ticks = 0
+    steps = 0
+    mismatches = 0
+    scores = []
+    seconds = 0
+    for episode in range(episodes):
+        sim = Simulation(seed=seed + episode)
+        script = ScriptedInput(seed + episode)
+        while not sim.gameover:
+            script.ticks = sim.ticks
+            action = script()
+            state = sim.snapshot()
+            score = sim.score
+            events = []
+            for _ in range(frames):
+                events += sim.step(action)
+                if sim.waiting or sim.gameover:
+                    break
+            single = step_outcome(sim, score, events)
+            sim.restore(state)
+            start = time.perf_counter()
+            events = sim.step(action, frames)
+            seconds += time.perf_counter() - start
+            steps += 1
+            if step_outcome(sim, score, events) != single:
+                mismatches += 1
+        ticks += sim.ticks
+        scores.append(sim.score)
+    return {
+        "frames": frames,
+        "episodes": episodes,
+        "ticks": ticks,
+        "steps": steps,
+        "mismatches": mismatches,
+        "seconds": seconds,
+        "ticks_per_second": ticks / seconds,
+        "scores": scores
+    }
+
+
+def run_rendered(speed, frames, seed, timings=None):
+    '''
+    Runs the GameController with a hidden window for a number of frames, a new game is started
+    after each game over
+
+    Parameters
+    ----------
+    speed : int
+        Ticks simulated per rendered frame
+    frames : int
+        The amount of rendered frames
+    seed : int
+        Seed of the scripted input
+    timings : Timings
+        If given, the subsystems are timed
+
+    Returns
+    -------
+    dict
+        Frames per second at this speed
+    '''
+    seconds = 0
+    done = 0
+    with timed_subsystems(timings) if timings else nullcontext():
+        game = new_controller(seed)
+        while done < frames:
+            if game.sim.gameover:
+                seed += 1
+                game = new_controller(seed)
+            game.accumulator += speed * DELTATIME
+            start = time.perf_counter()
+            game.update()
+            seconds += time.perf_counter() - start
+            done += 1
+    return {
+        "speed": speed,
+        "frames": frames,
+        "seconds": seconds,
+        "frames_per_second": frames / seconds
+    }
+
+
+def count_allocations(frames, seed):
+    '''
+    Measures the memory allocated while rendering frames at normal speed
+
+    Returns
+    -------
+    dict
+        Vector2 objects created per frame, the average peak of memory allocated during a frame
+        and the memory blocks which are still allocated after a frame
+    '''
+    vectors = [0]
+    init = Vector2.__init__
+
+    def counted_init(self, x=0, y=0):
+        vectors[0] += 1
+        init(self, x, y)
+
+    peak = 0
+    game = new_controller(seed)
+    blocks = sys.getallocatedblocks()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    Vector2.__init__ = counted_init
+    tracemalloc.start()
+    try:
+        for _ in range(frames):
+            game.accumulator += DELTATIME
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            game.update()
+            peak += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+        Vector2.__init__ = init
+    return {
+        "frames": frames,
+        "vectors_per_frame": vectors[0] / frames,
+        "peak_bytes_per_frame": peak / frames,
+        "retained_blocks_per_frame": (sys.getallocatedblocks() - blocks) / frames,
+        "gc_collections": sum(stat["collections"] for stat in gc.get_stats()) - collections
+    }
+
+
+def run(episodes=3, frames=600, seed=0):
+    '''
+    Runs all benchmarks
+
+    Returns
+    -------
+    dict
+        All results, ready to be written as JSON
+    '''
+    timings = Timings()
+    rendered = [run_rendered(speed, frames, seed) for speed in SPEEDS]
+    run_rendered(1, frames, seed, timings)
+    return {
+        "python": platform.python_version(),
+        "pygame": pg.version.ver,
+        "platform": platform.platform(),
+        "seed": seed,
+        "headless": run_headless(episodes, seed),
+        "headless_advance": run_headless_advance(episodes, seed),
+        "headless_coarse": [run_headless_coarse(coarse, episodes, seed) for coarse in COARSE_FRAMES],
+        "rendered": rendered,
+        "rendered_subsystems": timings.results(),
+        "allocations": count_allocations(frames, seed)
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the game loop and its subsystems")
+    parser.add_argument("--episodes", type=int, default=3, help="headless games to play")
+    parser.add_argument("--frames", type=int, default=600, help="rendered frames per speed")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the scripted input")
+    parser.add_argument("--output", default=None, help="JSON file to write, stdout if omitted")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args.episodes, args.frames, args.seed)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
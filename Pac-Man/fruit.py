@@ -2,48 +2,50 @@ import pygame as pg
 from settings import *
 from map_script import sprite_load
 from vectors import Vector2
-from map_script import sprite_load
 import random
+
+#the sprite and the points of every fruit type
+FRUITS = {
+    "cherry": ('cherry_fruit.png', 100),
+    "strawberry": ('strawberry_fruit.png', 300),
+    "orange": ('orange_fruit.png', 500),
+    "apple": ('apple_fruit.png', 700),
+    "melon": ('melon_fruit.png', 1000),
+    "galaxian": ('galaxian_boss.png', 2000),
+    "bell": ('bellthingy.png', 3000),
+    "key": ('key.png', 5000)
+}
+
 class Fruit():
-    def __init__(self, _map, fruit_type="cherry"):
+    def __init__(self, _map, fruit_type="cherry", rng=None):
         self.position = Vector2(13.5*TILEWIDTH, 20*TILEHEIGHT)
-        self.timer = 0
-        self.display_length = random.randint(15,40)
+        #the random numbers of the game the fruit belongs to
+        self.rng = random.Random() if rng is None else rng
         self.sprite = None
-        self.delete = False
+        self.reset()
         self.set_fruit_type(fruit_type)
 
-    def update(self, deltatime):
-        self.timer += deltatime
-        if self.timer >= self.display_length:
+    def reset(self):
+        self.timer = 0
+        self.display_length = self.rng.randint(15,40)
+        self.delete = False
+
+    def update(self, frames=1):
+        self.timer += frames
+        if self.timer >= self.display_length * FPS:
             self.delete = True
 
+    def snapshot(self):
+        return self.timer, self.display_length, self.delete
+
+    def restore(self, state):
+        self.timer, self.display_length, self.delete = state
+
     def set_fruit_type(self, fruit_type):
-        if fruit_type == "cherry":
-            self.sprite = sprite_load('cherry_fruit.png', 32,32,0)
-            self.points = 100
-        elif fruit_type == "strawberry":
-            self.sprite = sprite_load('strawberry_fruit.png', 32,32,0)
-            self.points = 300
-        elif fruit_type == "orange":
-            self.sprite = sprite_load('orange_fruit.png', 32,32,0)
-            self.points = 500
-        elif fruit_type == "apple":
-            self.sprite = sprite_load('apple_fruit.png', 32,32,0)
-            self.points = 700
-        elif fruit_type == "melon":
-            self.sprite = sprite_load('melon_fruit.png', 32,32,0)
-            self.points = 1000
-        elif fruit_type == "galaxian":
-            self.sprite = sprite_load('galaxian_boss.png', 32,32,0)
-            self.points = 2000
-        elif fruit_type == "bell":
-            self.sprite = sprite_load('bellthingy.png', 32,32,0)
-            self.points = 3000
-        elif fruit_type == "key":
-            self.sprite = sprite_load('key.png', 32,32,0)
-            self.points = 5000
+        if fruit_type in FRUITS:
+            sprite, self.points = FRUITS[fruit_type]
+            self.sprite = sprite_load(sprite, 32,32,0)
     
     def render(self, screen):
-        screen.blit(self.sprite, (self.position.x - TILEWIDTH/2, self.position.y - TILEHEIGHT/2))
+        return [screen.blit(self.sprite, (self.position.x - TILEWIDTH/2, self.position.y - TILEHEIGHT/2))]
     
@@ -1,12 +1,10 @@
 import pygame as pg
 from settings import *
-from vectors import Vector2
-from random import randint
-from map_script import sprite_load
-import datetime
-from animation import Animation
-import sound
-import time
+from vectors import Vector2, copy_vector, closest_on_segment
+import random
+from map_script import sprite_load, move_bit, DIRECTION_BITS, REVERSE_BITS, GHOST_UP_BANNED
+from maze import MOVE_UP
+from animation import Animation, find_frame, find_animation
 
 
 class Ghost():
@@ -50,19 +48,12 @@ class Ghost():
     mode : dict
         A dictionary which assigns integers to different mode methods
 
-    directions : list
-        a list containing all possible directions
-
     points : int
         The amount of points the ghost grants upon getting eaten
 
     direction : Vector2
         The current direction
 
-    banned_nodes : list
-        A list containing the coordinates of all nodes, which do not allow the ghost to change
-        its direction
-
     map : Map
         The Map class object
 
@@ -88,6 +79,9 @@ class Ghost():
     radius : int
         Collision radius
 
+    last_position : tuple
+        The position at the start of the last update, see AllGhosts.update
+
     CAGE_ENTRANCE : Vector2
         The entrance of the ghost cage
     
@@ -96,9 +90,36 @@ class Ghost():
 
     Methods
     -------
+    reset_state()
+        Puts the ghost back into its starting state
+
+    snapshot()
+        Returns the state of the ghost
+
+    restore(state)
+        Returns to a state created by snapshot
+
     update(deltatime, pacman)
         Updates location and check if decision must be made
 
+    collision_check(pacman)
+        Checks whether the ghost and pacman touch
+
+    crossed_paths(pacman, distance)
+        Checks whether the ghost and pacman touched on their way during the last update
+
+    travel(deltatime, pacman)
+        Moves the ghost in an update of several frames
+
+    quiet_ticks(limit)
+        Returns for how many ticks the ghost does not reach the end of a tunnel
+
+    plan(ticks, deltatime)
+        Returns the positions of the ghost in the next ticks until it passes the next tile
+
+    glide(positions, ticks, deltatime)
+        Does what update does in the first ticks of a plan
+
     get_tile(pos)
         Gets the tile of a certain object
 
@@ -120,60 +141,117 @@ class Ghost():
     passed_next_tile()
         Checks whether next tile was passed, and if yes, calls center
 
+    beyond_next_tile(pos_x, pos_y)
+        Checks whether a position lies beyond the center of the next tile
+
     center(position):
         Changes the position of the ghost to the center of the tile
 
     render(screen):
         Renders the ghost
     '''
+    #attributes which are part of a snapshot next to position, animations and sprite
+    STATE = ('speed', 'target', 'mode', 'direction', 'cruis', 'next_tile', 'previous_tile',
+             'pellet_countdown', 'waiting', 'releasing', 'leaving', 'entering', 'show', 'flash')
+
     def __init__(self, _map, position, sprite, direction=UP):
-        self.position = position
-        self.starting_position = position
-        self.speed = 80
-        self.target = None
-        self.mode = 0
+        self.starting_position = position.copy()
+        self.starting_direction = direction
         self.modes = {
             0: self.chase, # pylint: disable=no-member
             1: self.scatter,
             2: self.frightened,
             3: self.eaten
         }
-        self.directions = [UP, LEFT, DOWN, RIGHT]
         self.points = 200
-        self.direction = direction
-        self.banned_nodes = [
-            (13, 27),
-            (16, 27),
-            (13, 15),
-            (16, 15)
-        ]
         self.map = _map
+        self.sprite = sprite
+        #self.frightened_sprite = sprite_load('blue_ghost1.png', 32, 32, 0)
+        #self.eaten_sprite = sprite_load('ghosteyes_left.png', 32, 32, 0)
+        self.radius = 16
+        self.CAGE_ENTRANCE = Vector2(14 * TILEWIDTH, 14.5 * TILEHEIGHT)
+        self.animations = {}
+        self.define_animations()
+        self.all_animations = list(self.animations.values())
+        self.VISUALIZE = True
+        self.reset_state()
+
+    def reset_state(self):
+        '''
+        Puts the ghost back into the state it had after being created. The sprites and
+        animation frames are kept, so a reset does not load anything
+        '''
+        self.position = self.starting_position.copy()
+        self.last_position = self.position.as_tuple()
+        self.speed = 80
+        self.target = None
+        self.mode = 0
+        self.direction = self.starting_direction
         self.cruis = False
         self.next_tile = None
-        self.sprite = sprite
         self.pellet_countdown = 0
         self.waiting = False
         self.current_sprite = self.sprite
-        #self.frightened_sprite = sprite_load('blue_ghost1.png', 32, 32, 0)
-        #self.eaten_sprite = sprite_load('ghosteyes_left.png', 32, 32, 0)
-        self.radius = 16
         self.previous_tile = self.get_current_tile().as_tuple()
         self.previous_dir = None
-        self.CAGE_ENTRANCE = Vector2(14 * TILEWIDTH, 14.5 * TILEHEIGHT)
         self.releasing = False
-        self.corner = None
         self.leaving = False
         self.entering = False
-        self.retreating = None
         self.animation = None
         self.previous_anim = None
-        self.animations = {}
-        self.define_animations()
+        for anim in self.animations.values():
+            anim.reset()
+            anim.deltatime = 0
         self.show = True
-        self.VISUALIZE = True
         self.flash = False
-        #self.animation = None
-        #self.animations = {}
+
+    def snapshot(self):
+        '''
+        Returns the state of the ghost, which contains no surfaces and can be given to restore.
+        Animations and the sprite are stored as indices into all_animations
+
+        Returns
+        -------
+        tuple
+            The state
+        '''
+        animations = self.all_animations
+        #previous_dir is compared by identity to direction, so that has to be kept
+        previous_dir = True if self.previous_dir is self.direction else copy_vector(self.previous_dir)
+        return (
+            self.position.copy(),
+            tuple(copy_vector(getattr(self, name)) for name in self.STATE),
+            previous_dir,
+            tuple(anim.snapshot() for anim in animations),
+            find_animation(animations, self.animation),
+            find_animation(animations, self.previous_anim),
+            find_frame(animations, self.current_sprite)
+        )
+
+    def restore(self, state):
+        '''
+        Returns to a state created by snapshot, nothing is loaded or created except vectors
+
+        Parameters
+        ----------
+        state : tuple
+            The state
+        '''
+        position, values, previous_dir, animation_states, animation, previous_anim, sprite = state
+        animations = self.all_animations
+        self.position = position.copy()
+        for name, value in zip(self.STATE, values):
+            setattr(self, name, copy_vector(value))
+        self.previous_dir = self.direction if previous_dir is True else copy_vector(previous_dir)
+        for anim, anim_state in zip(animations, animation_states):
+            anim.restore(anim_state)
+        self.animation = None if animation is None else animations[animation]
+        self.previous_anim = None if previous_anim is None else animations[previous_anim]
+        if sprite is None:
+            self.current_sprite = self.sprite
+        else:
+            self.current_sprite = animations[sprite[0]].sprites[sprite[1]]
+
     def update(self, deltatime, pacman):
         '''
         Updates location and check if decision must be made
@@ -185,10 +263,14 @@ class Ghost():
         pacman : Pacman
             A Pacman class object
         '''
+        #an update of several frames decides on every tile on the way, see travel
+        if deltatime > DELTATIME:
+            self.travel(deltatime, pacman)
+            return
         if self.direction != self.previous_dir:
             self.previous_dir = self.direction
             return
-        self.position += self.direction * self.speed * deltatime
+        self.position += self.direction * (self.speed * deltatime)
         self.previous_dir = self.direction
         #Check whether passed a node
         if self.passed_next_tile():
@@ -197,7 +279,110 @@ class Ghost():
             self.set_next_tile()
 
         self.update_animations(deltatime)
-        
+
+    def travel(self, deltatime, pacman):
+        '''
+        Moves the ghost in an update of several frames. The frames up to the one in which it
+        passes the next tile follow its plan, that frame is a single update in which it decides,
+        so it moves and decides just like in updates of one frame
+
+        Parameters
+        ----------
+        deltatime : float
+            The time of the update, a multiple of DELTATIME
+        pacman : Pacman
+            A Pacman class object
+        '''
+        frames = round(deltatime / DELTATIME)
+        while frames:
+            positions = self.plan(frames, DELTATIME)
+            if len(positions) >= frames:
+                self.glide(positions, frames, DELTATIME)
+                break
+            self.glide(positions, len(positions), DELTATIME)
+            self.update(DELTATIME, pacman)
+            frames -= len(positions) + 1
+        if self.map.teleport_check(self):
+            self.set_next_tile()
+
+    def quiet_ticks(self, limit):
+        '''
+        Returns for how many of the next ticks the ghost does not reach the end of a tunnel.
+        Everything else the ghost does in these ticks follows from plan and its decisions
+
+        Parameters
+        ----------
+        limit : int
+            The most ticks which are looked at
+
+        Returns
+        -------
+        int
+            The amount of ticks, 0 if the next tick needs update
+        '''
+        #releasing ghosts speed up to at most 90, see release
+        reach = max(self.speed, 90) * DELTATIME
+        x = self.position.x
+        margin = min(x + 1.5 * TILEWIDTH, SWIDTH + 1.5 * TILEWIDTH - x)
+        return max(min(limit, int((margin - 1) / reach)), 0)
+
+    def plan(self, ticks, deltatime):
+        '''
+        Returns the positions update moves the ghost to in the next ticks until it passes the
+        next tile, where it decides. The positions are summed up once, just like update does
+
+        Parameters
+        ----------
+        ticks : int
+            The most ticks which are looked at
+        deltatime : float
+            Changes with different FPS, so that all movement is independent of FPS
+
+        Returns
+        -------
+        list
+            The position after every tick before the one passing the next tile, as tuple
+        '''
+        move = self.direction * (self.speed * deltatime)
+        x = self.position.x
+        y = self.position.y
+        positions = []
+        #the ghost pauses for a tick after turning, see update
+        if self.direction != self.previous_dir:
+            positions.append((x, y))
+        while len(positions) < ticks:
+            x += move.x
+            y += move.y
+            if self.beyond_next_tile(x, y):
+                break
+            positions.append((x, y))
+        return positions
+
+    def glide(self, positions, ticks, deltatime):
+        '''
+        Does what update does in the first ticks of a plan, all at once
+
+        Parameters
+        ----------
+        positions : list
+            The positions returned by plan
+        ticks : int
+            The amount of ticks, at most the length of positions
+        deltatime : float
+            Changes with different FPS, so that all movement is independent of FPS
+        '''
+        if not ticks:
+            return
+        position = positions[ticks - 1]
+        if self.direction != self.previous_dir:
+            self.previous_dir = self.direction
+            ticks -= 1
+            if not ticks:
+                return
+        self.position.x, self.position.y = position
+        self.update_animations(deltatime)
+        if ticks > 1:
+            self.current_sprite = self.animation.skip(deltatime, ticks - 1)
 
     def get_tile(self, pos):
         '''
@@ -255,14 +440,14 @@ class Ghost():
     
     def get_directions(self):
         results = dict()
-        tile = self.get_current_tile()
-        node = self.map.nodes.get((tile.x + 1, tile.y + 1), False)
-        if node:
-            node = self.map.node_types.get(node, False)
-            for direction in self.directions:
-                allow = not (direction == UP and (tile.x + 1, tile.y + 1) in self.banned_nodes) \
-                    and node.check_dir(direction) and ((self.direction * -1).as_int() != direction.as_int())
-                if allow:
+        moves = self.map.node_moves(self.get_current_tile())
+        if moves:
+            #ghosts never reverse and can not go up on some nodes
+            allowed = moves & ~REVERSE_BITS[move_bit(self.direction)]
+            if moves & GHOST_UP_BANNED:
+                allowed &= ~MOVE_UP
+            for direction, bit in DIRECTION_BITS:
+                if allowed & bit:
                     results[direction] = self.determine_distance(direction)
         if len(results) == 0:
             results[self.direction] = 1
@@ -327,20 +512,36 @@ class Ghost():
         bool
             True if next tile was passed
         '''
-        coordinates = Vector2(self.next_tile[0] * TILEWIDTH + TILEWIDTH / 2,
-                              self.next_tile[1] * TILEHEIGHT + TILEHEIGHT / 2)
-        if self.direction.x < 0 and self.position.x < coordinates.x or \
-            self.direction.x > 0 and self.position.x > coordinates.x:
+        if self.beyond_next_tile(self.position.x, self.position.y):
             if not self.waiting and not self.releasing:
-                self.center(coordinates)
-            return True
-        elif self.direction.y < 0 and self.position.y < coordinates.y or \
-            self.direction.y > 0 and self.position.y > coordinates.y:
-            if not self.waiting and not self.releasing:
-                self.center(coordinates)
+                self.center(Vector2(self.next_tile[0] * TILEWIDTH + TILEWIDTH / 2,
+                                    self.next_tile[1] * TILEHEIGHT + TILEHEIGHT / 2))
             return True
         return False
 
+    def beyond_next_tile(self, pos_x, pos_y):
+        '''
+        Checks whether a position lies beyond the center of the next tile in the direction
+
+        Parameters
+        ----------
+        pos_x : float
+            The x coordinate of the position
+        pos_y : float
+            The y coordinate of the position
+
+        Returns
+        -------
+        bool
+            True if the position is beyond the center
+        '''
+        x = self.next_tile[0] * TILEWIDTH + TILEWIDTH / 2
+        y = self.next_tile[1] * TILEHEIGHT + TILEHEIGHT / 2
+        return self.direction.x < 0 and pos_x < x or \
+            self.direction.x > 0 and pos_x > x or \
+            self.direction.y < 0 and pos_y < y or \
+            self.direction.y > 0 and pos_y > y
+
     def center(self, position):
         '''
         Changes the position of the ghost to the center of the tile
@@ -355,43 +556,82 @@ class Ghost():
         ----------
         screen : pygame.Surface
             The surface on which the ghost should be rendered
+
+        Returns
+        -------
+        list
+            The rects of the screen which were drawn on
         '''
+        rects = []
         if self.show:
-            screen.blit(self.current_sprite, (self.position.x - TILEWIDTH, self.position.y - TILEWIDTH))
+            rects.append(screen.blit(self.current_sprite, (self.position.x - TILEWIDTH, self.position.y - TILEWIDTH)))
             if self.mode < 2:
                 if self.target:
-                    pg.draw.circle(screen, self.color, (self.target.x * TILEWIDTH + TILEWIDTH / 2, self.target.y * TILEWIDTH + TILEWIDTH / 2,), 5)
+                    rects.append(pg.draw.circle(screen, self.color, (self.target.x * TILEWIDTH + TILEWIDTH / 2, self.target.y * TILEWIDTH + TILEWIDTH / 2,), 5))
+        return rects
     def reverse(self):
         if self.releasing:
             return
-        self.direction *= -1
+        self.direction = self.direction * -1
         container = self.previous_tile
         self.previous_tile = self.next_tile
         self.next_tile = container
 
-    def collision_check(self, pacman, pp_sound):
-        if (self.position - pacman.position).magnitude() <= self.radius:
+    def collision_check(self, pacman):
+        '''
+        Checks whether the ghost and pacman touch, either now or on their way during the last
+        update, so that they can not move through each other in an update of several frames
+
+        Returns
+        -------
+        int
+            1 if the ghost got eaten, 2 if pacman got caught, None otherwise
+        '''
+        distance = (self.position - pacman.position).magnitude()
+        if distance <= self.radius or self.crossed_paths(pacman, distance):
             if self.mode == 2:
                 #self.current_sprite = self.eaten_sprite
                 self.mode = 3
-                sound.play_channel('eat_ghost.wav', 0.15, 0, 4)
-                pp_sound.pause()
                 self.show = False
-                self.retreating = sound.play_channel('retreating.wav', 0.2, -1, 3)
                 self.speed = 160
                 return 1
             elif self.mode < 2:
                 return 2
                 
 
+    def crossed_paths(self, pacman, distance):
+        '''
+        Returns whether the ghost and pacman came within radius of each other while moving
+        from their last positions to the current ones. Seen from pacman, the ghost moves
+        along a straight line in that time
+
+        Parameters
+        ----------
+        pacman : Pacman
+            Pac-Man
+        distance : float
+            The current distance to pacman, which is larger than radius
+        '''
+        start_x = self.last_position[0] - pacman.last_position[0]
+        start_y = self.last_position[1] - pacman.last_position[1]
+        end_x = self.position.x - pacman.position.x
+        end_y = self.position.y - pacman.position.y
+        moved_x = end_x - start_x
+        moved_y = end_y - start_y
+        #they can not have been closer than the distance now minus how far they moved relative
+        #to each other, and the path of a teleport leads across the whole map
+        if (distance - self.radius) ** 2 > moved_x * moved_x + moved_y * moved_y or \
+                abs(moved_x) >= SWIDTH / 2:
+            return False
+        return closest_on_segment((start_x, start_y), (end_x, end_y), (0, 0))[1] <= self.radius ** 2
+
     def scatter(self):
         self.determine_path(self.corner)
 
     def frightened(self):
         self.target = self.get_current_tile()
         results = list(self.get_directions().keys())
-        random = randint(0, len(results) - 1)
-        self.direction = results[random]
+        self.direction = results[self.ghosts.rng.randint(0, len(results) - 1)]
 
     def start_release(self):
         self.releasing = True
@@ -482,11 +722,14 @@ class Blinky(Ghost):
         self.color = RED
         self.name = 'blinky'
         sprite = sprite_load('blinky_left1.png', 32, 32, 0)
-        super().__init__(_map, Vector2(14 * TILEWIDTH, 14.5 * TILEHEIGHT), sprite, direction=LEFT)
         self.pacman = pacman
         self.corner = Vector2(25, -1)
-        self.set_next_tile()
         self.release_order = [UP]
+        super().__init__(_map, Vector2(14 * TILEWIDTH, 14.5 * TILEHEIGHT), sprite, direction=LEFT)
+
+    def reset_state(self):
+        super().reset_state()
+        self.set_next_tile()
 
     def chase(self):
         target = self.get_tile(self.pacman.position)
@@ -498,7 +741,7 @@ class Blinky(Ghost):
         else:
             self.entering = True
             self.releasing = True
-            self.position = self.CAGE_ENTRANCE
+            self.position = self.CAGE_ENTRANCE.copy()
             self.enter()
     
     def enter(self):
@@ -506,8 +749,6 @@ class Blinky(Ghost):
         if self.position.y > 17.5 * TILEHEIGHT:
             self.entering = False
             self.mode = self.ghosts.current_mode
-            if all(ghost.mode != 3 for ghost in self.ghosts):
-                self.retreating.stop()
                 
             self.speed = 40
     
@@ -534,11 +775,14 @@ class Pinky(Ghost):
         self.color = PINK
         self.name = 'pinky'
         sprite = sprite_load('pinky_left1.png', 32, 32, 0)
-        super().__init__(_map, Vector2(14 * TILEWIDTH, 17.5 * TILEHEIGHT), sprite, direction=DOWN)
         self.pacman = pacman
         self.corner = Vector2(3, -1)
-        self.waiting = True
         self.release_order = [UP]
+        super().__init__(_map, Vector2(14 * TILEWIDTH, 17.5 * TILEHEIGHT), sprite, direction=DOWN)
+
+    def reset_state(self):
+        super().reset_state()
+        self.waiting = True
         self.next_tile = (self.get_current_tile().x, 17.5)
         
     def chase(self):
@@ -568,41 +812,42 @@ class Pinky(Ghost):
         else:
             self.entering = True
             self.releasing = True
-            self.position = self.CAGE_ENTRANCE
+            self.position = self.CAGE_ENTRANCE.copy()
             self.enter()
     
     def enter(self):
         self.direction = DOWN#self.release_order[-1] * -1
         if self.position.y > 17.5 * TILEHEIGHT:
             self.entering = False
-            #stop retreating audio
             self.mode = self.ghosts.current_mode
-            if all(ghost.mode != 3 for ghost in self.ghosts):
-                self.retreating.stop()
             self.speed = 40
 
 
 class Inky(Ghost):
+    STATE = Ghost.STATE + ('release_counter',)
+
     def __init__(self, _map, pacman, blinky, all_ghosts):
         self.ghosts = all_ghosts
         self.color = TEAL
         self.name = 'inky'
         sprite = sprite_load('inky_left1.png', 32, 32, 0)
-        super().__init__(_map, Vector2(12 * TILEWIDTH, 17.5 * TILEHEIGHT), sprite, direction=UP)
         self.pacman = pacman
-        self.waiting = True
         self.corner = Vector2(27, 34)
         self.blinky = blinky
-        self.next_tile = (self.get_current_tile().x, 16.5)
-        self.leaving = False
         self.release_order = [RIGHT, UP]
+        super().__init__(_map, Vector2(12 * TILEWIDTH, 17.5 * TILEHEIGHT), sprite, direction=UP)
+
+    def reset_state(self):
+        super().reset_state()
+        self.waiting = True
+        self.next_tile = (self.get_current_tile().x, 16.5)
         self.release_counter = 0
         
 
     def release(self):
         if (self.starting_position - self.position).magnitude() <= 1 or self.leaving:
             if not self.leaving:
-                self.position = self.starting_position
+                self.position = self.starting_position.copy()
                 self.next_tile = (13.5, self.get_current_tile().y)
                 self.leaving = True
                 self.direction = self.release_order[self.release_counter]
@@ -635,7 +880,7 @@ class Inky(Ghost):
             else:
                 self.speed = 60
             self.leaving = False
-            self.position = self.CAGE_ENTRANCE
+            self.position = self.CAGE_ENTRANCE.copy()
             self.release_counter = 0
             self.set_next_tile()
         
@@ -656,7 +901,7 @@ class Inky(Ghost):
         else:
             self.entering = True
             self.releasing = True
-            self.position = self.CAGE_ENTRANCE
+            self.position = self.CAGE_ENTRANCE.copy()
             self.enter()
     
     def enter(self):
@@ -664,31 +909,32 @@ class Inky(Ghost):
         if self.position.y > 17.5 * TILEHEIGHT:
             self.direction = LEFT#self.release_order[-2] * -1
             if self.position.x < self.starting_position.x:
-                self.position = self.starting_position
+                self.position = self.starting_position.copy()
                 self.next_tile = (13.5, self.get_current_tile().y)
                 self.leaving = True
                 self.direction = self.release_order[self.release_counter]
                 self.release_counter += 1
                 self.entering = False
-                #stop retreating audio
                 self.mode = self.ghosts.current_mode
-                if all(ghost.mode != 3 for ghost in self.ghosts):
-                    self.retreating.stop()
                 self.speed = 40
 
 class Clyde(Ghost):
+    STATE = Ghost.STATE + ('release_counter',)
+
     def __init__(self, _map, pacman, all_ghosts):
         self.ghosts = all_ghosts
         self.color = ORANGE
         self.name = 'clyde'
         sprite = sprite_load('clyde_left1.png', 32, 32, 0)
-        super().__init__(_map, Vector2(16 * TILEWIDTH, 17.5 * TILEHEIGHT), sprite, direction=UP)
         self.pacman = pacman
-        self.leaving = False
-        self.waiting = True
         self.corner = Vector2(0, 34)
-        self.next_tile = (self.get_current_tile().x, 16.5)
         self.release_order = [LEFT, UP]
+        super().__init__(_map, Vector2(16 * TILEWIDTH, 17.5 * TILEHEIGHT), sprite, direction=UP)
+
+    def reset_state(self):
+        super().reset_state()
+        self.waiting = True
+        self.next_tile = (self.get_current_tile().x, 16.5)
         self.release_counter = 0
 
     def chase(self):
@@ -700,7 +946,7 @@ class Clyde(Ghost):
     def release(self):
         if (self.starting_position - self.position).magnitude() <= 1 or self.leaving:
             if not self.leaving:
-                self.position = self.starting_position
+                self.position = self.starting_position.copy()
                 self.next_tile = (13.5, self.get_current_tile().y)
                 self.leaving = True
                 self.direction = self.release_order[self.release_counter]
@@ -733,7 +979,7 @@ class Clyde(Ghost):
             else:
                 self.speed = 60
             self.leaving = False
-            self.position = self.CAGE_ENTRANCE
+            self.position = self.CAGE_ENTRANCE.copy()
             self.release_counter = 0
             self.set_next_tile()
 
@@ -743,7 +989,7 @@ class Clyde(Ghost):
         else:
             self.entering = True
             self.releasing = True
-            self.position = self.CAGE_ENTRANCE
+            self.position = self.CAGE_ENTRANCE.copy()
             self.enter()
     
     def enter(self):
@@ -751,23 +997,22 @@ class Clyde(Ghost):
         if self.position.y > 17.5 * TILEHEIGHT:
             self.direction = RIGHT#self.release_order[-2] * -1
             if self.position.x > self.starting_position.x:
-                self.position = self.starting_position
+                self.position = self.starting_position.copy()
                 self.next_tile = (13.5, self.get_current_tile().y)
                 self.leaving = True
                 self.direction = self.release_order[self.release_counter]
                 self.release_counter += 1
                 self.entering = False
                 self.mode = self.ghosts.current_mode
-                #stop retreating audio
-                if all(ghost.mode != 3 for ghost in self.ghosts):
-                    self.retreating.stop()
                 self.speed = 40
 
 class AllGhosts():
     #TODO: Timer fix
-    def __init__(self, _map, pacman):
+    def __init__(self, _map, pacman, rng=None):
         self.map = _map
         self.pacman = pacman
+        #the random numbers of the game, used by frightened ghosts to pick their direction
+        self.rng = random.Random() if rng is None else rng
         self.blinky = Blinky(_map, pacman, self)
         self.pinky = Pinky(_map, pacman, self)
         self.inky = Inky(_map, pacman, self.blinky, self)
@@ -779,31 +1024,68 @@ class AllGhosts():
             self.clyde
         ]
         
-        self.frightened_timer = None
-        self.chase_timer = None
-        self.chase_time = None
-        self.chase_time_list = [15, 20, 7, 20, 5, 20, 5]
-        self.set_chase_timer(self.chase_time_list[0]) # --------------------------------------
-        self.chase_time_list.pop(0)
-        self.current_mode = 1
-        self.chase_only = False
-        for ghost in self:
-            ghost.mode = self.current_mode
-        
-        self.rend = True
-        self.multiplier = 0.5
+        self.ticks = 0
+        self.reset()
+
     def __iter__(self):
         return iter(self.ghosts)
 
-    def update(self, deltatime, pacman, pp_sound):
+    #attributes which are part of a snapshot next to chase_time_list and the ghosts
+    STATE = ('ticks', 'frightened_timer', 'chase_timer', 'chase_time', 'current_mode',
+             'chase_only', 'rend', 'multiplier')
+
+    def snapshot(self):
+        '''
+        Returns the mode timers and the state of every ghost
+
+        Returns
+        -------
+        tuple
+            The state, which can be given to restore
+        '''
+        return (
+            tuple(getattr(self, name) for name in self.STATE),
+            tuple(self.chase_time_list),
+            tuple(ghost.snapshot() for ghost in self)
+        )
+
+    def restore(self, state):
+        '''
+        Returns to a state created by snapshot
+
+        Parameters
+        ----------
+        state : tuple
+            The state
+        '''
+        values, chase_time_list, ghosts = state
+        for name, value in zip(self.STATE, values):
+            setattr(self, name, value)
+        self.chase_time_list = list(chase_time_list)
+        for ghost, ghost_state in zip(self, ghosts):
+            ghost.restore(ghost_state)
+
+    def update(self, deltatime, pacman):
+        '''
+        Advances the mode timers by the ticks of deltatime and moves all ghosts
+
+        Returns
+        -------
+        bool
+            True if the frightened phase ended during this update
+        '''
+        pp_ended = False
+        self.ticks += round(deltatime / DELTATIME)
+        for ghost in self:
+            ghost.last_position = ghost.position.as_tuple()
         if not self.rend:
             self.frightened_timer = None
-            if self.chase_timer:
-                self.chase_timer = datetime.datetime.now()
-            return
-        if self.frightened_timer and (datetime.datetime.now() - self.frightened_timer).seconds >= 6:
-            difference = (datetime.datetime.now() - self.frightened_timer).microseconds
-            if difference < 250000 or 500000 < difference < 750000:
+            if self.chase_timer is not None:
+                self.chase_timer = self.ticks
+            return pp_ended
+        if self.frightened_timer is not None and self.ticks - self.frightened_timer >= 6 * FPS:
+            difference = (self.ticks - self.frightened_timer) % FPS
+            if difference < FPS / 4 or FPS / 2 < difference < FPS * 3 / 4:
                 for ghost in self:
                     if ghost.mode == 2:
                         ghost.flash = True
@@ -812,14 +1094,12 @@ class AllGhosts():
                     ghost.flash = False
 
 
-        if self.frightened_timer and (datetime.datetime.now() - self.frightened_timer).seconds >= 8:
-            pp_sound.stop()
-            pg.mixer.music.unpause()
-            
+        if self.frightened_timer is not None and self.ticks - self.frightened_timer >= 8 * FPS:
             self.pp_over()
             self.frightened_timer = None
-        if not self.frightened_timer and \
-            (datetime.datetime.now() - self.chase_timer).seconds >= self.chase_time \
+            pp_ended = True
+        if self.frightened_timer is None and \
+            self.ticks - self.chase_timer >= self.chase_time \
             and (not self.chase_only or self.current_mode == 1):
             self.current_mode = 1 - self.current_mode
             for ghost in self:
@@ -827,27 +1107,29 @@ class AllGhosts():
                     ghost.mode = self.current_mode
                     if not ghost.waiting:
                         ghost.reverse()
-                    
-                    print("Activated mode", self.current_mode)
             if len(self.chase_time_list) > 0:
-                self.set_chase_timer(self.chase_time_list[0])
+                self.set_chase_timer(self.chase_time_list[0] * FPS)
                 self.chase_time_list.pop(0)
             else:
                 self.chase_only = True
         for ghost in self:
             ghost.update(deltatime, pacman)
+        return pp_ended
+
     def render(self, screen):
+        rects = []
         if self.rend:
             for ghost in self:
-                ghost.render(screen)
+                rects += ghost.render(screen)
+        return rects
 
-    def check_events(self, pacman, pellets_eaten, release_after_pellets, pp_sound):
+    def check_events(self, pacman, pellets_eaten, release_after_pellets):
         ret = 0
         if len(release_after_pellets) > 0 and release_after_pellets[0] <= pellets_eaten:
             self.release_next()
             ret = 3
         for ghost in self:
-            coll = ghost.collision_check(pacman, pp_sound)
+            coll = ghost.collision_check(pacman)
             if coll == 1:
                 ret = 1
                 if all(ghost.mode == 3 for ghost in self):
@@ -855,17 +1137,14 @@ class AllGhosts():
                     self.frightened_timer = None
             elif coll == 2:
                 ret = 2
-        if all(ghost.mode != 3 for ghost in self.ghosts) and any(ghost.mode == 2 for ghost in self.ghosts):
-            pp_sound.unpause()
         return ret
     
     def power_pellet(self):
-        if not self.frightened_timer:
+        if self.frightened_timer is None:
             self.multiplier = 0.5
-        if self.chase_timer and not self.frightened_timer:
-            self.chase_time -= (datetime.datetime.now() - self.chase_timer).seconds
-            print("Remaining:", self.chase_time)
-        self.frightened_timer = datetime.datetime.now()
+        if self.chase_timer is not None and self.frightened_timer is None:
+            self.chase_time -= self.ticks - self.chase_timer
+        self.frightened_timer = self.ticks
         for ghost in self:
             if ghost.mode < 2 and not ghost.releasing:
                 ghost.reverse()
@@ -885,7 +1164,15 @@ class AllGhosts():
                     ghost.speed = 80
                 ghost.current_sprite = ghost.sprite
     def set_chase_timer(self, time):
-        self.chase_timer = datetime.datetime.now()
+        '''
+        Starts the scatter/chase timer at the current tick
+
+        Parameters
+        ----------
+        time : int
+            The length of the current mode in ticks
+        '''
+        self.chase_timer = self.ticks
         self.chase_time = time
     
     def release_next(self):
@@ -894,32 +1181,25 @@ class AllGhosts():
                 ghost.start_release()
                 return
     def reset(self):
-        pacman = self.pacman
-        _map = self.map
-        self.blinky = Blinky(_map, pacman, self)
-        self.pinky = Pinky(_map, pacman, self)
-        self.inky = Inky(_map, pacman, self.blinky, self)
-        self.clyde = Clyde(_map, pacman, self)
-        self.ghosts = [
-            self.blinky,
-            self.pinky,
-            self.inky,
-            self.clyde
-        ]
-        
+        '''
+        Resets all ghosts and the mode timers, the ghosts are reused
+        '''
+        for ghost in self:
+            ghost.reset_state()
         self.frightened_timer = None
         self.chase_timer = None
         self.chase_time = None
         self.chase_time_list = [15, 20, 7, 20, 5, 20, 5]
-        self.set_chase_timer(self.chase_time_list[0]) # --------------------------------------
+        self.set_chase_timer(self.chase_time_list[0] * FPS) # --------------------------------------
         self.chase_time_list.pop(0)
         self.current_mode = 1
         self.chase_only = False
         for ghost in self:
             ghost.mode = self.current_mode
-        
+
         self.rend = True
         self.multiplier = 0.5
+
     def cruising(self):
         self.blinky.cruis = True
         if self.blinky.speed == 80:
@@ -1,61 +1,128 @@
 '''
 Runs the game
+
+Usage: python main.py [--seed N] [--record FILE] [--replay FILE] [--profile] [--trace FILE]
+
+F3 shows the time spent in each part of a frame
 '''
+import argparse
+import json
+import math
 import pygame as pg
 from pygame.locals import *
 from settings import *
 import sound
-from map_script import Map
-from pacman import Pacman
-from pellets import AllPellets
-from variables import Variables
-from ghosts import AllGhosts
+from simulation import *
 from text import AllText
-from fruit import Fruit
+from replay import Replay, Recorder, ReplayInput, new_seed
+from profiler import FrameProfiler
+
+#states of the GameController. Only in PLAYING the Simulation is stepped, all others are
+#pauses which end after a certain time, while the window keeps handling events.
+#STATE_GAME_OVER is not the GAME_OVER event of the Simulation
+READY = "ready"
+PLAYING = "playing"
+GHOST_EATEN_FREEZE = "ghost_eaten_freeze"
+DEATH_FREEZE = "death_freeze"
+DEATH_ANIM = "death_anim"
+DEATH_SOUND = "death_sound"
+LEVEL_WIPE = "level_wipe"
+STATE_GAME_OVER = "game_over"
+
+#durations of the pauses in seconds
+GAME_START_TIME = 5
+LEVEL_START_TIME = 2
+GHOST_EATEN_TIME = 1
+DEATH_FREEZE_TIME = 1
+DEATH_SOUND_TIME = 0.2
+#the level wipe shows the level for WIPE_HOLD_TIME, then blackens the maze tile by tile
+#within WIPE_TIME and shows the black screen for WIPE_BLACK_TIME
+WIPE_HOLD_TIME = 1
+WIPE_TIME = GRIDROWS * GRIDCOLS / 1000
+WIPE_BLACK_TIME = 0.5
 
 
 class GameController(object):
     '''
-    Manages the game
+    Manages the game window, input and sound and renders the Simulation
 
     Attributes
     ----------
     screen : pygame.Surface
         The game window
+    maze : pygame.Surface
+        All tiles of the maze, composited once
     background : pygame.Surface
-        A black background
+        The maze with all uneaten pellets, everything else is drawn on top of it
+    dirty_rects : list
+        The rects drawn on during the previous frame, which need to be restored
+    redraw : bool
+        Indicates whether the whole screen has to be redrawn in the next frame
     clock : pygame.time.clock
         A clock used to stabilize FPS
-    gameover : bool
-        Indicates whether a game over has ocurred
-    score : int
-        Describes the current score
-    pellets_eaten : int
-        Indicates the amount of eaten pellets
+    accumulator : float
+        Real time which has passed, but has not been simulated yet
+    state : string
+        READY, PLAYING, GHOST_EATEN_FREEZE, DEATH_FREEZE, DEATH_ANIM, DEATH_SOUND, LEVEL_WIPE
+        or STATE_GAME_OVER
+    state_time : float
+        Seconds spent in the current state
+    state_length : float
+        Seconds after which the current pause ends, infinite for untimed states
+    pauses : bool
+        If False, every pause ends in the frame after it started, e.g. for benchmarks
+    wiped : int
+        The amount of tiles already blackened during the level wipe
+    sim : Simulation
+        The game logic, holding the map, Pac-Man, ghosts, pellets, fruit and score
+    seed : int
+        The seed of the random numbers of the game
+    input : callable
+        Returns the direction of the next tick, the keyboard, a Recorder or a ReplayInput
+    recorder : Recorder
+        Records the input of every tick, if the game is recorded
+    profiler : FrameProfiler
+        Times the parts of every frame, None until profiling is enabled
+    text : AllText
+        All texts shown on the screen
     run : bool
         Changes to false, to stop game execution when player quits the game, in order to prevent a no response error
-    pellets : AllPellets
-        Initializes an AllPellets class object
-    map : Map
-        Initializes a Map class object
-    pacman : Pacman
-        Initializes a Pacman class object
-    level : int
-        Defines the current level
+    pp_sound : pygame.mixer.Channel
+        The channel playing the power pellet sound
+    retreating : pygame.mixer.Channel
+        The channel playing the sound of eaten ghosts returning to the cage
     
     Methods
     -------
     set_background()
-        Creates a black background window
+        Composites the maze and the pellets into the background
+    erase_pellet(position)
+        Removes an eaten pellet from the background
+    read_keyboard()
+        Returns the direction of the arrow keys which are pressed
+    save_recording(path)
+        Writes the recorded input to a replay file
+    enable_profiling()
+        Starts timing the parts of every frame
+    toggle_overlay()
+        Shows or hides the frame times
+    start_game()
+        Shows the level and READY! until the game starts
     update()
         Updates the entire game each frame
+    set_state(state, length)
+        Changes the state and starts its timer
+    update_state(deltatime)
+        Advances the current pause
+    handle_events(events)
+        Plays sounds and shows texts for the events of the Simulation
     reset()
-        Resets the level(Map, Pellets, Pac-Man)
-    check_pellet_collision()
-        Checks for collisions between Pac-Man and pellets
+        Starts the level wipe, after which the level is reset
+    wipe()
+        Advances the level wipe
     check_Events()
         Checks for specific pygame events
-    death()
+    check_death()
         Handels Pac-Man's death
     set_events()
         Defines pygame events
@@ -63,219 +130,317 @@ class GameController(object):
         Renders all elements of the game every update cycle
     '''
 
-    def __init__(self):
-        
+    def __init__(self, seed=None, record=False, replay=None, profile=False):
+        '''
+        Parameters
+        ----------
+        seed : int
+            The seed of the random numbers, a new one is chosen if it is None
+        record : bool
+            Whether the input of every tick is recorded
+        replay : Replay
+            A replay whose input is played back instead of reading the keyboard
+        profile : bool
+            Whether the parts of every frame are timed from the start
+        '''
+        if replay is not None:
+            seed = replay.seed
+        elif seed is None:
+            seed = new_seed()
+        self.seed = seed
+
         #Initialise all pygame components
         pg.init()
         sound.start()
         #Set screen and background
         self.screen = pg.display.set_mode(SCREENSIZE, 0, 32)
-        self.background = None
-        self.set_background()
         self.clock = pg.time.Clock()
-        self.gameover = False
-        self.score = 0
-        self.timer = 0.0
-        self.waiting = False
-        self.death = False
-        self.highscore = 0
-        self.rend = True
-        self.pellets_eaten = 0
+        self.accumulator = 0.0
+        self.state = PLAYING
+        self.state_time = 0.0
+        self.state_length = math.inf
+        self.pauses = True
+        self.wiped = 0
         self.run = True
-        self.pellets = AllPellets()
-        self.map = Map()
+        self.sim = Simulation(headless=False, seed=seed)
+        self.input = self.read_keyboard if replay is None else ReplayInput(replay)
+        self.recorder = None
+        if record:
+            self.recorder = Recorder(self.input, seed)
+            self.input = self.recorder
+        self.maze = None
+        self.background = None
+        self.dirty_rects = []
+        self.redraw = True
+        self.set_background()
         self.text = AllText()
-        self.pacman = Pacman(self.map)
-        self.ghosts = AllGhosts(self.map, self.pacman)
-        self.fruit = Fruit(self.map)
-        self.level = 1
         self.PP_over = pg.USEREVENT
-        self.release_after_pellets = [0, 30, 60]
         self.pp_sound = None
+        self.retreating = None
+        self.profiler = None
+        if profile:
+            self.enable_profiling()
         self.start_game()
-        self.cruising = 60
-        
-        sound.background_music('siren_1.wav', 0.2)
-        
-        
- 
+
     def set_background(self):
         '''
-        Creates a black background
+        Composites the maze and all uneaten pellets into the background. The maze does not
+        change during a level, so this only has to be done when a level starts
+        '''
+        if not self.maze:
+            self.maze = pg.surface.Surface(SCREENSIZE).convert()
+            self.maze.fill(BLACK)
+            self.sim.map.render(self.maze)
+        self.background = self.maze.copy()
+        self.sim.pellets.render(self.background)
+        self.redraw = True
+
+    def erase_pellet(self, position):
+        '''
+        Removes an eaten pellet from the background
 
+        Parameters
+        ----------
+        position : Vector2
+            The position of the pellet
+        '''
+        rect = pg.Rect(position.x - TILEWIDTH / 2, position.y - TILEHEIGHT / 2, TILEWIDTH, TILEHEIGHT)
+        self.background.blit(self.maze, rect, rect)
+        self.dirty_rects.append(rect)
+        
+    def read_keyboard(self):
+        '''
         Returns
         -------
-        pygame.Surface
+        Vector2
+            The direction of the arrow keys which are pressed, None if there are none
         '''
-        self.background = pg.surface.Surface(SCREENSIZE).convert()
-        self.background.fill(BLACK)   
-        
+        return self.sim.pacman.possible_dirs()
+
+    def save_recording(self, path):
+        '''
+        Writes the input recorded so far to a replay file
+
+        Parameters
+        ----------
+        path : string
+            The path of the file
+        '''
+        self.recorder.replay.save(path)
+
+    def enable_profiling(self):
+        '''
+        Starts timing the parts of every frame
+        '''
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+            self.profiler.attach(self)
+
+    def toggle_overlay(self):
+        '''
+        Shows or hides the frame times, profiling is enabled the first time they are shown
+        '''
+        self.enable_profiling()
+        self.profiler.show = not self.profiler.show
+        self.redraw = True
+
     def start_game(self):
-        self.waiting = True
-        self.update()
+        '''
+        Shows the level and READY! while the start music plays, then the game starts
+        '''
+        self.set_state(READY, GAME_START_TIME)
+        self.render()
         sound.play_sound('game_start.wav', 0.3, 0)
-        pg.time.wait(5000)
-        self.waiting = False
-        self.text.stop_showing_ready()
-        
 
     def update(self):
         '''
         Main update loop, updates the entire game each frame
         '''
-
-        #time difference between previous and currently rendered picture to make frame
-        #length hardware independent
+        #time difference between previous and currently rendered picture. The simulation
+        #catches up with it in fixed ticks, which makes the game speed hardware independent
+        deltatime = self.clock.tick(FPS) / 1000
         
-        if not self.waiting:
-            deltatime = self.clock.tick(FPS) / 1000
-            
-            if deltatime > 0.020:
-                deltatime = 0.020
-        
-        else:
-           
-            if self.rend:
-                self.pacman.update_animations(1 / FPS)
-                self.render()
-                
-                if self.pacman.reset:
-                    sound.play_sound('death_2.wav', 0.3, 0)
-                    pg.time.wait(200)
-                    sound.play_sound('death_2.wav', 0.3, 0)
-                    pg.time.wait(200)
-                    self.pacman.show = False
-                    
-                    if not self.gameover:
-                        self.reset()
-                    else:
-                        sound.reset()
-            return
-        
-        self.pacman.update(deltatime, self.map)
-        self.check_pellet_collision()
+        if deltatime > 0.050:
+            deltatime = 0.050
+
+        if self.state != PLAYING:
+            self.update_state(deltatime)
+
+        if self.state == PLAYING:
+            self.accumulator += deltatime
+            while self.accumulator >= DELTATIME and self.state == PLAYING:
+                self.accumulator -= DELTATIME
+                events = self.sim.step(self.input())
+                self.handle_events(events)
+                self.text.update(DELTATIME)
         self.check_Events()
-        self.check_fruit_events(deltatime)
-        self.ghosts.update(deltatime, self.pacman, self.pp_sound)
-        self.set_highscore()
-        self.text.update_score(self.score, self.highscore)
-        ghost_events = self.ghosts.check_events(self.pacman,self.pellets_eaten, self.release_after_pellets, self.pp_sound)
-        
-        if self.cruising and self.pellets_eaten >= self.cruising:
-            self.ghosts.cruising()
-            self.cruising = False
-        
-        if ghost_events == 3:
-            self.release_after_pellets.pop(0)
-        
-        elif ghost_events == 2:
-            self.waiting = True
-            pg.time.wait(1000)
-            self.render()
-            self.waiting = False
-            self.check_death()
-        
-        elif ghost_events == 1:
-            ghost_points = int(self.ghosts.get_points())
-            self.score += ghost_points
-            self.text.add_temp_text(ghost_points, self.pacman.position - Vector2(TILEWIDTH,0))
-            self.pacman.show = False
-            self.waiting = True
+        if self.state != LEVEL_WIPE:
+            self.text.update_score(self.sim.score, self.sim.highscore)
             self.render()
-            pg.time.wait(1000)
-            for ghost in self.ghosts:
-                ghost.show = True
-            self.waiting = False
-            self.pacman.show = True
-        
-        self.text.update(deltatime)
-        self.render()
-        
-    def set_highscore(self):
-        if self.highscore < self.score:
-            self.highscore = self.score
 
-    def reset(self):
+    def set_state(self, state, length=math.inf):
         '''
-        Resets the level(Map, Pellets, Pac-Man, Ghosts)
+        Changes the state of the game and starts its timer
+
+        Parameters
+        ----------
+        state : string
+            The new state
+        length : float
+            Seconds after which the state ends, if it is a timed pause
         '''
-        self.ghosts.rend = False
-        sound.reset()
-        self.render()
-        self.waiting = True
-        pg.event.get()
-        pg.time.wait(1000)
-        self.rend = False
-        for row in self.map.tiles:
-            pg.event.get()
-            for tile in row:
-                self.screen.blit(self.map.tiles[0][0].sprite, (tile.x, tile.y))
-                pg.display.update()
-                pg.time.wait(1)
-        pg.display.update()
-        pg.time.wait(500)
-        self.rend = True
-        self.waiting = True
-        self.pacman.reset_self()
-        self.ghosts.reset()
-        if self.pellets.isEmpty():
-            self.pellets_eaten = 0
-            self.pellets.reset()
-        self.render()
-        pg.event.get()
-        pg.time.wait(2000)
-        self.release_after_pellets = [0 + self.pellets_eaten, 10 + self.pellets_eaten, 20 + self.pellets_eaten]
-        sound.start()
-        sound.background_music('siren_1.wav', 0.2)
-        self.death = False
-        self.cruising = 60 + self.pellets_eaten
-        self.waiting = False
+        self.state = state
+        self.state_time = 0.0
+        self.state_length = length
 
-    def check_pellet_collision(self):
+    def update_state(self, deltatime):
         '''
-        Checks for collisions between Pac-Man and all the pellets on the map
+        Advances the current pause and changes to the next state once it is over. Without
+        pauses, the time is skipped to the end of the pause
 
-        Attributes
+        Parameters
         ----------
-        pellet : bool
-            when a pellet has been eaten, pacman.py will return pellet as 'True'
+        deltatime : float
+            Time since the previous frame
         '''
-        pellet = self.pacman.eat_pellet(self.pellets.pellet_list)
-        if pellet:
-            self.pellets_eaten += 1
+        self.state_time += deltatime if self.pauses else math.inf
+        state = self.state
+        pacman = self.sim.pacman
 
-            #Amount of times, eating animation is played
-            self.pacman.pellet_anim = 2
-            
-            #Play eating sound(wakawakawaka)
-            sound.play_channel('pellet_munch_1.wav', 0.2, 0, 1)
-            
-            #stop Pac-Man's movement for 1 frame or 16,67ms when a pellet is eaten
-            self.pacman.stop_frame = True
+        if state == READY:
+            if self.state_time >= self.state_length:
+                self.text.stop_showing_ready()
+                sound.start()
+                sound.background_music('siren_1.wav', 0.2)
+                self.accumulator = 0.0
+                self.set_state(PLAYING)
+
+        elif state == GHOST_EATEN_FREEZE:
+            if self.state_time >= self.state_length:
+                for ghost in self.sim.ghosts:
+                    ghost.show = True
+                pacman.show = True
+                self.set_state(PLAYING)
 
-            #Increases current score by pellet.points or powerpellet.points amount
-            self.score += pellet.points
+        elif state == DEATH_FREEZE:
+            if self.state_time >= self.state_length:
+                self.check_death()
+                self.set_state(DEATH_ANIM)
 
-            #removes eaten pellets from the pellet list
-            self.pellets.pellet_list.remove(pellet)
-            #print(self.score)
+        elif state == DEATH_ANIM:
+            if self.pauses:
+                pacman.update_animations(deltatime)
+            else:
+                pacman.reset = True
+            if pacman.reset:
+                sound.play_sound('death_2.wav', 0.3, 0)
+                self.set_state(DEATH_SOUND, 2 * DEATH_SOUND_TIME)
 
-            if pellet.name == "PowerPellet":
+        elif state == DEATH_SOUND:
+            #death_2.wav is played twice
+            if self.state_time >= self.state_length:
+                pacman.show = False
+                if not self.sim.gameover:
+                    self.reset()
+                else:
+                    sound.reset()
+                    self.set_state(STATE_GAME_OVER)
+            elif self.state_time - deltatime < DEATH_SOUND_TIME <= self.state_time:
+                sound.play_sound('death_2.wav', 0.3, 0)
+
+        elif state == LEVEL_WIPE:
+            self.wipe()
+
+    def handle_events(self, events):
+        '''
+        Plays sounds and shows texts for the events of the Simulation
+
+        Parameters
+        ----------
+        events : list
+            Tuples of (event, points, position) returned by Simulation.step
+        '''
+        for event, points, position in events:
+            if event == PELLET_EATEN:
+                #Play eating sound(wakawakawaka)
+                sound.play_channel('pellet_munch_1.wav', 0.2, 0, 1)
+                self.erase_pellet(position)
+
+            elif event == POWER_PELLET_EATEN:
+                sound.play_channel('pellet_munch_1.wav', 0.2, 0, 1)
+                self.erase_pellet(position)
                 pg.mixer.music.pause()
-                
                 self.pp_sound = sound.play_channel('power_pellet.wav', 0.2, -1, 0)
-
-                self.ghosts.power_pellet()
                 pg.time.set_timer(self.PP_over, 8000)
 
-        #checks if the list of all uneaten pellets is empty
-        if self.pellets.isEmpty():
-            #no longer show Pac-Man's sprite
-            self.pacman.show = False
-            self.ghosts.rend = False
-            self.level += 1
-            self.reset()
-            #TODO: flash background, reset level, reset Pac-Man(save lives and score)
+            elif event == POWER_PELLET_OVER:
+                self.pp_sound.stop()
+                pg.mixer.music.unpause()
+
+            elif event == FRUIT_EATEN:
+                self.text.add_temp_text(points, position)
+
+            elif event == LEVEL_COMPLETE:
+                #no longer show Pac-Man's sprite
+                self.sim.pacman.show = False
+                self.sim.ghosts.rend = False
+                self.reset()
+
+            elif event == DEATH:
+                self.set_state(DEATH_FREEZE, DEATH_FREEZE_TIME)
+
+            elif event == GHOST_EATEN:
+                sound.play_channel('eat_ghost.wav', 0.15, 0, 4)
+                self.pp_sound.pause()
+                self.retreating = sound.play_channel('retreating.wav', 0.2, -1, 3)
+                self.text.add_temp_text(points, position - Vector2(TILEWIDTH,0))
+                self.sim.pacman.show = False
+                self.set_state(GHOST_EATEN_FREEZE, GHOST_EATEN_TIME)
+
+        ghosts = self.sim.ghosts
+        if all(ghost.mode != 3 for ghost in ghosts):
+            #stop retreating audio
+            if self.retreating:
+                self.retreating.stop()
+                self.retreating = None
+            if any(ghost.mode == 2 for ghost in ghosts):
+                self.pp_sound.unpause()
+
+    def reset(self):
+        '''
+        Starts the level wipe, at its end the level(Pellets, Pac-Man, Ghosts) is reset
+        '''
+        self.sim.ghosts.rend = False
+        sound.reset()
+        self.wiped = 0
+        self.set_state(LEVEL_WIPE, WIPE_HOLD_TIME + WIPE_TIME + WIPE_BLACK_TIME)
+        self.render()
+
+    def wipe(self):
+        '''
+        Advances the level wipe: the level is shown for a moment, then every tile is
+        blackened row by row and after a black screen the reset level is shown
+        '''
+        elapsed = self.state_time
+        if elapsed < WIPE_HOLD_TIME:
+            self.render()
+            return
+
+        tiles = [tile for row in self.sim.map.tiles for tile in row]
+        wiped = min(len(tiles), (elapsed - WIPE_HOLD_TIME) / WIPE_TIME * len(tiles))
+        black = self.sim.map.tiles[0][0].sprite
+        rects = []
+        for tile in tiles[self.wiped:int(wiped)]:
+            rects.append(self.screen.blit(black, (tile.x, tile.y)))
+        self.wiped = int(wiped)
+        pg.display.update(rects)
+
+        if elapsed >= self.state_length:
+            self.sim.reset()
+            self.set_background()
+            self.pp_sound = None
+            self.retreating = None
+            self.set_state(READY, LEVEL_START_TIME)
 
     def check_Events(self):
         '''
@@ -293,35 +458,23 @@ class GameController(object):
             #when player tries to close the window, the game is no longer permitted to run
             if event.type == pg.QUIT:
                 self.run = False
+            if event.type == pg.KEYDOWN and event.key == pg.K_F3:
+                self.toggle_overlay()
             if event.type == self.PP_over:
                 pass
                 #self.ghosts.pp_over()
-    def check_fruit_events(self, deltatime):
-        self.timer += deltatime
-        if self.timer >= 10 and not self.fruit.delete:
-            self.fruit.update(deltatime)
-            dist = (self.pacman.position - self.fruit.position).magnitude_squared()
-            if dist < 16 ** 2:
-                self.score += self.fruit.points
-                self.fruit.delete = True
-                self.text.add_temp_text(self.fruit.points, self.fruit.position)      
 
     def check_death(self):
         '''
         Handels Pac-Man's death
         '''
-        self.ghosts.rend = False
-        self.render()
-        self.pacman.live_lost()
+        self.sim.ghosts.rend = False
         pg.mixer.stop()
         pg.mixer.music.stop()
         sound.play_channel('death_1.wav', 0.2, 0, 5)
-        self.waiting = True
-       
 
-        if self.pacman.lives == 0:
-            self.gameover = True
-            self.pacman.show = False
+        if self.sim.gameover:
+            self.sim.pacman.show = False
             
             self.text.show_gameover()
             
@@ -334,32 +487,65 @@ class GameController(object):
 
     def render(self):
         '''
-        Renders all visual elements
-6
+        Renders all visual elements. Only the parts of the screen which were drawn on in this
+        or the previous frame are restored from the background and updated
+
         Returns
         -------
         pygame.Surface
             Updated screen with all screen elements
 
         '''
-        #renders the map walls
-        for row in self.map.tiles:
-            for tile in row:
-                self.screen.blit(tile.sprite, (tile.x, tile.y))
+        sim = self.sim
+        screen_rect = self.screen.get_rect()
+
+        #restore the background where sprites were drawn in the previous frame
+        if self.redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.dirty_rects:
+                self.screen.blit(self.background, rect, rect)
+
+        rects = []
+        rects += sim.pacman.render(self.screen)
+        rects += sim.ghosts.render(self.screen)
+        rects += sim.pacman.render_lives(self.screen)
+        rects += self.text.render(self.screen)
+        if sim.fruit_visible():
+            rects += sim.fruit.render(self.screen)
+        if self.profiler and self.profiler.show:
+            rects += self.profiler.render(self.screen)
+        rects = [rect.clip(screen_rect) for rect in rects]
+
+        if self.redraw:
+            pg.display.update()
+            self.redraw = False
+        else:
+            pg.display.update(self.dirty_rects + rects)
+        self.dirty_rects = rects
+
 
-        self.pellets.render(self.screen)
-        self.pacman.render(self.screen)
-        self.ghosts.render(self.screen)
-        self.pacman.render_lives(self.screen)
-        self.text.render(self.screen)
-        if self.timer >= 10 and not self.fruit.delete:
-            self.fruit.render(self.screen)
-        pg.display.update()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pac-Man")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random numbers")
+    parser.add_argument("--record", default=None, help="replay file to record the game into")
+    parser.add_argument("--replay", default=None, help="replay file to play back")
+    parser.add_argument("--profile", action="store_true", help="time every frame, print p50 and p99 at the end")
+    parser.add_argument("--trace", default=None, help="trace file to write the frame times to at the end")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    replay = Replay.load(args.replay) if args.replay else None
 
     #Initializes the- GameController class object
-    game = GameController()
+    game = GameController(args.seed, args.record is not None, replay, args.profile or args.trace is not None)
     while game.run:
         game.update()
+    if args.record:
+        game.save_recording(args.record)
+    if game.profiler:
+        if args.trace:
+            game.profiler.export_trace(args.trace)
+        print(json.dumps(game.profiler.summary(), indent=2))
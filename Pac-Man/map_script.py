@@ -2,17 +2,57 @@
 Loads all tile assets, creates a two dimensional array
 with all sprites and assigns a sprite to each tile
 '''
-import os
 import pygame as pg
 from settings import *
 from vectors import Vector2
+from spritesheet import ATLAS
+from maze import load_maze, DEFAULT_MAZE, MOVE_UP, MOVE_LEFT, MOVE_DOWN, MOVE_RIGHT
+
+#bit of Map.moves which forbids ghosts to go up, above the four direction bits of maze.MOVE_*
+GHOST_UP_BANNED = 16
+#the tiles (column, row) from which ghosts can not go up
+GHOST_UP_BANNED_TILES = ((12, 26), (15, 26), (12, 14), (15, 14))
+#the bit of every direction constant, the order is the one in which ghosts consider them
+MOVE_BITS = {UP: MOVE_UP, LEFT: MOVE_LEFT, DOWN: MOVE_DOWN, RIGHT: MOVE_RIGHT}
+DIRECTION_BITS = tuple(MOVE_BITS.items())
+#the bit of the reverse direction, indexed by the bit of a direction
+REVERSE_BITS = bytes(
+    {MOVE_UP: MOVE_DOWN, MOVE_LEFT: MOVE_RIGHT, MOVE_DOWN: MOVE_UP, MOVE_RIGHT: MOVE_LEFT}.get(bit, 0)
+    for bit in range(16)
+)
+
+
+def move_bit(direction):
+    '''
+    Returns the bit of a direction in Map.moves. Directions which are not one of the
+    constants, e.g. ones created by reversing a direction, are looked up by their coordinates
+
+    Parameters
+    ----------
+    direction : Vector2
+        The direction
+
+    Returns
+    -------
+    int
+        The bit, 0 if the direction is not along one of the axes or has no length
+    '''
+    bit = MOVE_BITS.get(direction)
+    if bit is None:
+        x, y = direction.x, direction.y
+        if x == 0:
+            bit = MOVE_UP if y < 0 else MOVE_DOWN if y > 0 else 0
+        elif y == 0:
+            bit = MOVE_LEFT if x < 0 else MOVE_RIGHT
+        else:
+            bit = 0
+    return bit
 
-#TODO: Implement spritesheets
 #TODO: Cleansing
 
 def tile_load(img):
     '''
-    Loads and scales image
+    Returns a tile, scaled to the tile size if necessary. Tiles are only decoded once
 
     Parameters:
         img: File name of the tile
@@ -20,39 +60,82 @@ def tile_load(img):
     Returns:
         The loaded and scaled image
     '''
-    return pg.transform.scale(
-        pg.image.load(os.path.join(PATH, "assets", "Tiles", img)),
-        (TILEWIDTH, TILEHEIGHT))
+    tile = ATLAS.load("Tiles", img)
+    if tile.get_size() != (TILEWIDTH, TILEHEIGHT):
+        tile = pg.transform.scale(tile, (TILEWIDTH, TILEHEIGHT))
+    return tile
+
+#the rotated tiles of all maps, keyed by (file name, rotation in degrees)
+TILE_VARIANTS = {}
+#the Tiles of every maze, keyed by the Maze
+TILE_GRIDS = {}
+
+def tile_variant(img, rotation):
+    '''
+    Returns a tile, rotated counterclockwise. Every rotation of a tile is only created once
+    and shared by all Tiles of all maps
+
+    Parameters:
+        img: File name of the tile
+        rotation: Rotation in degrees
+
+    Returns:
+        The rotated tile, which must not be drawn on
+    '''
+    key = (img, rotation % 360)
+    tile = TILE_VARIANTS.get(key)
+    if tile is None:
+        tile = tile_load(img)
+        if key[1]:
+            tile = pg.transform.rotate(tile, key[1])
+        TILE_VARIANTS[key] = tile
+    return tile
 
 def sprite_load(img, scale_x, scale_y, rotate):
-    return pg.transform.rotate(pg.transform.scale(
-        pg.image.load(os.path.join(PATH, "assets", "Sprites", img)),
-        (scale_x, scale_y)), rotate)
-
-#define sprites
-BLACK_TILE = tile_load("Black.png")
-CLOSED_LEFT = tile_load("Cage_Wall_Closed_Left.png")
-CLOSED_RIGHT = tile_load("Cage_Wall_Closed_Right.png")
-CAGE_CORNER = tile_load("Cage_Wall_Corner.png")
-CAGE_DOUBLE = tile_load("Cage_Wall_Double.png")
-PELLET = tile_load("Pellet.png")
-POWER_PELLET = tile_load("Power_Pellet.png")
-CORNER_DOUBLE = tile_load("Wall_Corner_Double.png")
-WIDE_LEFT = tile_load("Wall_Corner_Wide_Left.png")
-WIDE_RIGHT = tile_load("Wall_Corner_Wide_Right.png")
-CORNER = tile_load("Wall_Corner.png")
-BIG_CORNER = tile_load("Corner_Big.png")
-WALL_DOUBLE = tile_load("Wall_Double.png")
-WALL = tile_load("Wall.png")
+    '''
+    Returns a sprite from the spritesheets, scaled and rotated if necessary
+
+    Parameters:
+        img: File name of the sprite
+        scale_x, scale_y: Size of the sprite
+        rotate: Rotation in degrees
+
+    Returns:
+        The sprite, which is shared if it needs no transformation
+    '''
+    sprite = ATLAS.get(img)
+    if sprite.get_size() != (scale_x, scale_y):
+        sprite = pg.transform.scale(sprite, (scale_x, scale_y))
+    if rotate:
+        sprite = pg.transform.rotate(sprite, rotate)
+    return sprite
+
+#define sprites, they are loaded on first use, so that they can be converted to the display format
+BLACK_TILE = "Black.png"
+CLOSED_LEFT = "Cage_Wall_Closed_Left.png"
+CLOSED_RIGHT = "Cage_Wall_Closed_Right.png"
+CAGE_CORNER = "Cage_Wall_Corner.png"
+CAGE_DOUBLE = "Cage_Wall_Double.png"
+PELLET = "Pellet.png"
+POWER_PELLET = "Power_Pellet.png"
+CORNER_DOUBLE = "Wall_Corner_Double.png"
+WIDE_LEFT = "Wall_Corner_Wide_Left.png"
+WIDE_RIGHT = "Wall_Corner_Wide_Right.png"
+CORNER = "Wall_Corner.png"
+BIG_CORNER = "Corner_Big.png"
+WALL_DOUBLE = "Wall_Double.png"
+WALL = "Wall.png"
 
 
 class Tile():
     '''
-    Each tile has its own sprite, which is rotated upon assignment, as well as
+    Each tile has a sprite, which is shared with all tiles of the same type and rotation, as well as
     a x and a y coordinate. The coordinates are NOT in the center, but in the top-left corner
     '''
-    def __init__(self, sprite, rotation, x, y):
-        self.sprite = pg.transform.rotate(sprite, rotation)
+    __slots__ = ('sprite', 'x', 'y')
+
+    def __init__(self, img, rotation, x, y):
+        self.sprite = tile_variant(img, rotation)
         self.x = x
         self.y = y
 
@@ -75,54 +158,32 @@ sprite_assign = {
     "D": BLACK_TILE
 }   
 
-#TODO: New node class
-class Node():
-    def __init__(self, up, left, down, right):
-        self.up = bool(up)
-        self.left = bool(left)
-        self.down = bool(down)
-        self.right = bool(right)
-        self.directions = {
-            1: {
-                0: self.right
-            },
-            0: {
-                1: self.down,
-                0: False,
-                -1: self.up
-            },
-            -1: {
-                0: self.left
-            }
-            
-        }
-
-    def check_dir(self, direction):
-        direction = direction.normalize()
-        result = self.directions.get(direction.x, False)
-        if result:
-            result = result.get(direction.y, False)
-        return result
-
 class Map():
     '''
     Class containing all map info
+
+    Parameters
+    ----------
+    name : string
+        The name of the maze in assets/Map
+
+    Attributes
+    ----------
+    maze : Maze
+        The compiled maze
+    tiles : list
+        The Tile of every position, as a list per row, shared by all maps of the same maze
+    exits : list
+        The tiles (column, row) where the tunnels lead off the map
+    moves : bytearray
+        The directions which can be taken on every node as MOVE_* bits, with GHOST_UP_BANNED
+        set on GHOST_UP_BANNED_TILES, indexed by row * GRIDCOLS + column. Tiles which are no
+        node are 0, as no direction can be changed on them
     '''
-    def __init__(self):
+    def __init__(self, name=DEFAULT_MAZE):
+        self.maze = load_maze(name)
         self.tiles = []
         self.map_init()
-        self.nodes = []
-        self.node_types = {
-            'TL': Node(1, 1, 0, 0),
-            'TR': Node(1, 0, 0, 1),
-            'LD': Node(0, 1, 1, 0),
-            'DR': Node(0, 0, 1, 1),
-            'TLD': Node(1, 1, 1, 0),
-            'TLR': Node(1, 1, 0, 1),
-            'TDR': Node(1, 0, 1, 1),
-            'LDR': Node(0, 1, 1, 1),
-            'TLDR': Node(1, 1, 1, 1)
-        }
         self.set_nodes()
         self.sprites = {
             'life': sprite_load('Life.png', 32, 32, 0)
@@ -130,91 +191,70 @@ class Map():
     
     def map_init(self):
         '''
-        Generates all tiles
+        Generates all tiles. The tiles of a maze never change, so they are only generated for
+        the first map of a maze and shared by all others
         '''
-        with open(os.path.join(PATH, "assets", "Map", "Sprites.txt"), "r") as s_map, \
-            open(os.path.join(PATH, "assets", "Map", "Rotations.txt"), "r") as r_map:
-            map_lines = s_map.readlines()
-            rotation_lines = r_map.readlines()
-            for row in range(GRIDROWS):
-                row_list = []
-                for col in range(GRIDCOLS):
-                    char = map_lines[row][col]
-                    rotation = int(rotation_lines[row][col]) * 90
-                    row_list.append(Tile(
-                        sprite_assign.get(char, BLACK_TILE),
-                        rotation,
-                        col * TILEWIDTH,
-                        row * TILEHEIGHT
-                    ))
-                self.tiles.append(row_list)
+        self.tiles = TILE_GRIDS.get(self.maze)
+        if self.tiles is not None:
+            return
+        self.tiles = TILE_GRIDS[self.maze] = []
+        tiles = self.maze.tiles.decode("ascii")
+        for row in range(GRIDROWS):
+            row_list = []
+            for col in range(GRIDCOLS):
+                index = row * GRIDCOLS + col
+                row_list.append(Tile(
+                    sprite_assign.get(tiles[index], BLACK_TILE),
+                    self.maze.rotations[index] * 90,
+                    col * TILEWIDTH,
+                    row * TILEHEIGHT
+                ))
+            self.tiles.append(row_list)
     def set_nodes(self):
-        self.nodes = {
-            (2, 5): 'DR',
-            (7, 5): 'LDR',
-            (13, 5): 'LD',
-            (16, 5): 'DR',
-            (22, 5): 'LDR',
-            (27, 5): 'LD',
-            (2, 9): 'TDR',
-            (7, 9): 'TLDR',
-            (10, 9): 'LDR',
-            (13, 9): 'TLR',
-            (16, 9): 'TLR',
-            (19, 9): 'LDR',
-            (22, 9): 'TLDR',
-            (27, 9): 'TLD',
-            (2, 12): 'TR',
-            (7, 12): 'TLD',
-            (10, 12): 'TR',
-            (13, 12): 'LD',
-            (16, 12): 'DR',
-            (19, 12): 'TL',
-            (22, 12): 'TDR',
-            (27, 12): 'TL',
-            (10, 15): 'DR',
-            (13, 15): 'TLR',
-            (16, 15): 'TLR',
-            (19, 15): 'LD',
-            (7, 18): 'TLDR',
-            (10, 18): 'TLD',
-            (19, 18): 'TDR',
-            (22, 18): 'TLDR',
-            (10, 21): 'TDR',
-            (19, 21): 'TLD',
-            (2, 24): 'DR',
-            (7, 24): 'TLDR',
-            (10, 24): 'TLR',
-            (13, 24): 'LD',
-            (16, 24): 'DR',
-            (19, 24): 'TLR',
-            (22, 24): 'TLDR',
-            (27, 24): 'LD',
-            (2, 27): 'TR',
-            (4, 27): 'LD',
-            (7, 27): 'TDR',
-            (10, 27): 'LDR',
-            (13, 27): 'TLR',
-            (16, 27): 'TLR',
-            (19, 27): 'LDR',
-            (22, 27): 'TLD',
-            (25, 27): 'DR',
-            (27, 27): 'TL',
-            (2, 30): 'DR',
-            (4, 30): 'TLR',
-            (7, 30): 'TL',
-            (10, 30): 'TR',
-            (13, 30): 'LD',
-            (16, 30): 'DR',
-            (19, 30): 'TL',
-            (22, 30): 'TR',
-            (25, 30): 'TLR',
-            (27, 30): 'LD',
-            (2, 33): 'TR',
-            (13, 33): 'TLR',
-            (16, 33): 'TLR',
-            (27, 33): 'TL'
-        }
+        '''
+        Fills the move table with the directions the nodes of the maze allow and lists the
+        exits
+        '''
+        self.moves = bytearray(GRIDROWS * GRIDCOLS)
+        for index in self.maze.nodes:
+            self.moves[index] = self.maze.moves[index]
+        for col, row in GHOST_UP_BANNED_TILES:
+            self.moves[row * GRIDCOLS + col] |= GHOST_UP_BANNED
+        self.exits = [(index % GRIDCOLS, index // GRIDCOLS) for index in self.maze.exits]
+
+    def node_moves(self, tile):
+        '''
+        Returns the entry of moves of a tile
+
+        Parameters
+        ----------
+        tile : Vector2
+            The tile, may be outside of the map in the tunnels
+
+        Returns
+        -------
+        int
+            The MOVE_* bits and GHOST_UP_BANNED, 0 if the tile is no node
+        '''
+        x = int(tile.x)
+        y = int(tile.y)
+        if 0 <= x < GRIDCOLS and 0 <= y < GRIDROWS:
+            return self.moves[y * GRIDCOLS + x]
+        return 0
+
+    def render(self, screen):
+        '''
+        Draws all tiles of the maze
+
+        Parameters
+        ----------
+        screen : pygame.Surface
+            The surface the maze is drawn on
+        '''
+        for row in self.tiles:
+            for tile in row:
+                screen.blit(tile.sprite, (tile.x, tile.y))
+
     def teleport_check(self, obj):
         '''
         Teleports pacman or ghosts to other side if necessary
@@ -0,0 +1,230 @@
+'''
+Contains the Maze class, which holds everything known about a maze before the game starts,
+and load_maze, which compiles a maze source into a binary file once and reads that afterwards
+'''
+import os
+import struct
+from settings import *
+
+MAZE_PATH = os.path.join(PATH, "assets", "Map")
+CACHE_PATH = os.path.join(MAZE_PATH, "cache")
+DEFAULT_MAZE = "map1"
+
+#values of Maze.pellets
+EMPTY_TILE = 0
+PELLET_TILE = 1
+POWERPELLET_TILE = 2
+
+#bits of Maze.moves, in the order of the direction indices of maze_graph
+MOVE_UP = 1
+MOVE_LEFT = 2
+MOVE_DOWN = 4
+MOVE_RIGHT = 8
+
+PELLET_SYMBOLS = "pn"
+POWERPELLET_SYMBOLS = "PN"
+WALL_SYMBOL = "."
+
+#file layout: header, the five tables of one byte per tile, then the tile indices of the
+#nodes and the exits as uint16, all little endian
+MAGIC = b"PMMZ"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBHH")
+
+
+class Maze():
+    '''
+    A compiled maze. All tables hold one byte per tile, indexed by row * cols + col
+
+    Attributes
+    ----------
+    rows : int
+        The amount of rows
+    cols : int
+        The amount of columns
+    tiles : bytes
+        The symbol of the wall sprite of every tile, see map_script.sprite_assign
+    rotations : bytes
+        The rotation of every wall sprite in quarter turns
+    paths : bytes
+        The path symbol of every tile, WALL_SYMBOL for tiles which can not be walked on
+    pellets : bytes
+        EMPTY_TILE, PELLET_TILE or POWERPELLET_TILE for every tile
+    moves : bytes
+        Bitmask of the directions which lead from every tile to a walkable tile
+    nodes : tuple
+        The tiles at which a direction can be taken which is at a right angle to another,
+        i.e. intersections and corners
+    exits : tuple
+        The walkable tiles on the left and right edge, where the tunnels lead off the map
+
+    Methods
+    -------
+    compile(source)
+        Creates a maze from the text of a maze source
+    from_bytes(data)
+        Creates a maze from its binary form
+    to_bytes()
+        Returns the binary form of the maze
+    symbols()
+        Returns the path symbols as rows
+    '''
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, rows, cols, tiles, rotations, paths, pellets, moves, nodes, exits):
+        self.rows = rows
+        self.cols = cols
+        self.tiles = tiles
+        self.rotations = rotations
+        self.paths = paths
+        self.pellets = pellets
+        self.moves = moves
+        self.nodes = nodes
+        self.exits = exits
+
+    @classmethod
+    def compile(cls, source):
+        '''
+        Creates a maze from the text of a maze source. Every line which is not empty and does
+        not start with # is a row, every tile in it is the symbol of its sprite, its rotation
+        and the symbol of its path. Moves, nodes and exits are derived from the paths, tunnels
+        wrap around horizontally
+
+        Parameters
+        ----------
+        source : string
+            The maze source
+
+        Returns
+        -------
+        Maze
+            The compiled maze
+        '''
+        rows = [line.split() for line in source.splitlines() if line.strip() and not line.startswith("#")]
+        if len(rows) != GRIDROWS or any(len(row) != GRIDCOLS for row in rows):
+            raise ValueError("A maze has to have {} rows of {} tiles".format(GRIDROWS, GRIDCOLS))
+        cells = [cell for row in rows for cell in row]
+        if any(len(cell) != 3 or not cell[1].isdigit() for cell in cells):
+            raise ValueError("Every tile of a maze has to be a sprite, a rotation and a path")
+        tiles = "".join(cell[0] for cell in cells).encode("ascii")
+        rotations = bytes(int(cell[1]) % 4 for cell in cells)
+        paths = "".join(cell[2] for cell in cells)
+
+        def walkable(row, col):
+            return 0 <= row < GRIDROWS and paths[row * GRIDCOLS + col % GRIDCOLS] != WALL_SYMBOL
+
+        pellets = bytearray(len(paths))
+        moves = bytearray(len(paths))
+        nodes = []
+        exits = []
+        for row in range(GRIDROWS):
+            for col in range(GRIDCOLS):
+                index = row * GRIDCOLS + col
+                symbol = paths[index]
+                if symbol == WALL_SYMBOL:
+                    continue
+                if symbol in PELLET_SYMBOLS:
+                    pellets[index] = PELLET_TILE
+                elif symbol in POWERPELLET_SYMBOLS:
+                    pellets[index] = POWERPELLET_TILE
+                vertical = walkable(row - 1, col) * MOVE_UP | walkable(row + 1, col) * MOVE_DOWN
+                horizontal = walkable(row, col - 1) * MOVE_LEFT | walkable(row, col + 1) * MOVE_RIGHT
+                moves[index] = vertical | horizontal
+                if vertical and horizontal:
+                    nodes.append(index)
+                if col in (0, GRIDCOLS - 1):
+                    exits.append(index)
+        return cls(GRIDROWS, GRIDCOLS, tiles, rotations, paths.encode("ascii"), bytes(pellets),
+                   bytes(moves), tuple(nodes), tuple(exits))
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''
+        Creates a maze from its binary form
+
+        Parameters
+        ----------
+        data : bytes
+            The binary form, see to_bytes
+
+        Returns
+        -------
+        Maze
+            The maze, None if data is not a compiled maze of this version
+        '''
+        if len(data) < HEADER.size:
+            return None
+        magic, version, rows, cols, node_count, exit_count = HEADER.unpack_from(data)
+        size = rows * cols
+        if magic != MAGIC or version != VERSION or \
+                len(data) != HEADER.size + 5 * size + 2 * (node_count + exit_count):
+            return None
+        tables = [data[HEADER.size + i * size:HEADER.size + (i + 1) * size] for i in range(5)]
+        indices = struct.unpack_from("<{}H".format(node_count + exit_count), data, HEADER.size + 5 * size)
+        return cls(rows, cols, *tables, indices[:node_count], indices[node_count:])
+
+    def to_bytes(self):
+        '''
+        Returns
+        -------
+        bytes
+            The binary form of the maze
+        '''
+        return b"".join([
+            HEADER.pack(MAGIC, VERSION, self.rows, self.cols, len(self.nodes), len(self.exits)),
+            self.tiles, self.rotations, self.paths, self.pellets, self.moves,
+            struct.pack("<{}H".format(len(self.nodes) + len(self.exits)), *self.nodes, *self.exits)
+        ])
+
+    def symbols(self):
+        '''
+        Returns
+        -------
+        list
+            The path symbol of every tile, as a list per row
+        '''
+        paths = self.paths.decode("ascii")
+        return [list(paths[row * self.cols:(row + 1) * self.cols]) for row in range(self.rows)]
+
+
+#the mazes loaded by this process, by name
+MAZES = {}
+
+
+def load_maze(name=DEFAULT_MAZE):
+    '''
+    Returns a maze, which is compiled from assets/Map/<name>.maze into the cache directory if
+    the source is newer than the compiled file, otherwise only the compiled file is read. Every
+    maze is only loaded once per process
+
+    Parameters
+    ----------
+    name : string
+        The name of the maze source
+
+    Returns
+    -------
+    Maze
+        The maze
+    '''
+    maze = MAZES.get(name)
+    if maze is not None:
+        return maze
+    source = os.path.join(MAZE_PATH, name + ".maze")
+    compiled = os.path.join(CACHE_PATH, name + ".bin")
+    if os.path.exists(compiled) and os.path.getmtime(compiled) >= os.path.getmtime(source):
+        with open(compiled, "rb") as file:
+            maze = Maze.from_bytes(file.read())
+    if maze is None:
+        with open(source, "r") as file:
+            maze = Maze.compile(file.read())
+        #the cache is skipped if it can not be written
+        try:
+            os.makedirs(CACHE_PATH, exist_ok=True)
+            with open(compiled, "wb") as file:
+                file.write(maze.to_bytes())
+        except OSError:
+            pass
+    MAZES[name] = maze
+    return maze
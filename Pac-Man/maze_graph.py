@@ -0,0 +1,245 @@
+'''
+Contains the MazeGraph class, which precomputes the shortest paths between all walkable tiles
+'''
+import hashlib
+import os
+from collections import deque
+import numpy as np
+from settings import *
+from map_script import Map
+from maze import CACHE_PATH
+
+#direction indices, in the order in which ghosts prefer directions of equal distance
+DIRECTIONS = [UP, LEFT, DOWN, RIGHT]
+D_UP = 0
+D_LEFT = 1
+D_DOWN = 2
+D_RIGHT = 3
+NO_ACTION = 4
+DIR_X = np.array([0, -1, 0, 1, 0])
+DIR_Y = np.array([-1, 0, 1, 0, 0])
+REVERSE = np.array([D_DOWN, D_RIGHT, D_UP, D_LEFT, NO_ACTION])
+
+UNREACHABLE = np.iinfo(np.uint16).max
+
+
+def build_move_table(_map):
+    '''
+    Returns a flat table with a bitmask of allowed directions for every tile, as compiled into
+    the maze of the map
+
+    Parameters
+    ----------
+    _map : Map
+        The Map class object
+
+    Returns
+    -------
+    numpy.ndarray
+        One bitmask per tile, bit i is set if DIRECTIONS[i] is allowed
+    '''
+    return np.frombuffer(_map.maze.moves, dtype=np.uint8).astype(np.int64)
+
+
+class MazeGraph():
+    '''
+    The graph of all walkable tiles, with the length of the shortest path and the first
+    direction to take between every pair of them. The tables are computed once per map with a
+    breadth first search from every tile and cached on disk, keyed by a hash of the map
+
+    Parameters
+    ----------
+    _map : Map
+        The Map class object, a new one is created if None
+    cache : bool
+        Whether the tables are read from and written to the cache directory
+
+    Attributes
+    ----------
+    move_table : numpy.ndarray
+        Bitmask of allowed directions for every tile, see build_move_table
+    tile_index : numpy.ndarray
+        The index of every tile in the tables, -1 for tiles which can not be walked on
+    tiles : numpy.ndarray
+        The x and y coordinates of every walkable tile, shape (V, 2)
+    distances : numpy.ndarray
+        Length of the shortest path in tiles between all walkable tiles, shape (V, V)
+    next_dirs : numpy.ndarray
+        Index into DIRECTIONS of the first step of the shortest path, -1 if there is none
+    key : string
+        The hash of the map the tables belong to
+
+    Methods
+    -------
+    index(tile)
+        Returns the index of a tile in the tables
+    distance(start, goal)
+        Returns the length of the shortest path between two tiles
+    next_direction(start, goal)
+        Returns the first direction of the shortest path between two tiles
+    path(start, goal)
+        Returns all tiles of the shortest path between two tiles
+    '''
+    def __init__(self, _map=None, cache=True):
+        if _map is None:
+            _map = Map()
+        self.move_table = build_move_table(_map)
+        self.tile_index = np.full(GRIDROWS * GRIDCOLS, -1, dtype=np.int16)
+        walkable = np.flatnonzero(self.move_table)
+        self.tile_index[walkable] = np.arange(len(walkable))
+        self.tiles = np.stack((walkable % GRIDCOLS, walkable // GRIDCOLS), axis=1)
+        self.key = hashlib.sha1(self.move_table.tobytes()).hexdigest()
+        self.distances = None
+        self.next_dirs = None
+        path = os.path.join(CACHE_PATH, "graph_" + self.key + ".npz")
+        if not (cache and self.load(path)):
+            self.compute()
+            if cache:
+                self.save(path)
+
+    def load(self, path):
+        '''
+        Reads the tables from a cache file
+
+        Returns
+        -------
+        bool
+            True if the tables could be read
+        '''
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            self.distances = data["distances"]
+            self.next_dirs = data["next_dirs"]
+        return True
+
+    def save(self, path):
+        '''
+        Writes the tables to a cache file, the cache is skipped if it can not be written
+        '''
+        try:
+            os.makedirs(CACHE_PATH, exist_ok=True)
+            np.savez_compressed(path, distances=self.distances, next_dirs=self.next_dirs)
+        except OSError:
+            pass
+
+    def compute(self):
+        '''
+        Runs a breadth first search from every walkable tile
+        '''
+        count = len(self.tiles)
+        self.distances = np.full((count, count), UNREACHABLE, dtype=np.uint16)
+        self.next_dirs = np.full((count, count), -1, dtype=np.int8)
+        neighbours = []
+        for x, y in self.tiles:
+            allowed = self.move_table[y * GRIDCOLS + x]
+            neighbours.append([
+                (d, self.tile_index[(y + DIR_Y[d]) * GRIDCOLS + (x + DIR_X[d]) % GRIDCOLS])
+                for d in range(4) if allowed >> d & 1
+            ])
+
+        for start in range(count):
+            distances = self.distances[start]
+            next_dirs = self.next_dirs[start]
+            distances[start] = 0
+            queue = deque()
+            for d, tile in neighbours[start]:
+                if distances[tile] == UNREACHABLE:
+                    distances[tile] = 1
+                    next_dirs[tile] = d
+                    queue.append(tile)
+            while queue:
+                tile = queue.popleft()
+                for _, neighbour in neighbours[tile]:
+                    if distances[neighbour] == UNREACHABLE:
+                        distances[neighbour] = distances[tile] + 1
+                        next_dirs[neighbour] = next_dirs[tile]
+                        queue.append(neighbour)
+
+    def index(self, tile):
+        '''
+        Returns the index of a tile in the tables
+
+        Parameters
+        ----------
+        tile : tuple
+            The x and y coordinates of the tile
+
+        Returns
+        -------
+        int
+            The index, -1 if the tile can not be walked on or is outside of the map
+        '''
+        x, y = int(tile[0]), int(tile[1])
+        if 0 <= x < GRIDCOLS and 0 <= y < GRIDROWS:
+            return int(self.tile_index[y * GRIDCOLS + x])
+        return -1
+
+    def distance(self, start, goal):
+        '''
+        Returns the length of the shortest path between two tiles
+
+        Parameters
+        ----------
+        start : tuple
+            The x and y coordinates of the first tile
+        goal : tuple
+            The x and y coordinates of the second tile
+
+        Returns
+        -------
+        int
+            The amount of steps, None if there is no path
+        '''
+        i, j = self.index(start), self.index(goal)
+        if i < 0 or j < 0 or self.distances[i, j] == UNREACHABLE:
+            return None
+        return int(self.distances[i, j])
+
+    def next_direction(self, start, goal):
+        '''
+        Returns the first direction of the shortest path between two tiles
+
+        Parameters
+        ----------
+        start : tuple
+            The x and y coordinates of the first tile
+        goal : tuple
+            The x and y coordinates of the second tile
+
+        Returns
+        -------
+        Vector2
+            The direction, None if the tiles are the same or there is no path
+        '''
+        i, j = self.index(start), self.index(goal)
+        if i < 0 or j < 0 or self.next_dirs[i, j] < 0:
+            return None
+        return DIRECTIONS[self.next_dirs[i, j]]
+
+    def path(self, start, goal):
+        '''
+        Returns all tiles of the shortest path between two tiles
+
+        Parameters
+        ----------
+        start : tuple
+            The x and y coordinates of the first tile
+        goal : tuple
+            The x and y coordinates of the second tile
+
+        Returns
+        -------
+        list
+            Tuples of the tiles from start to goal, None if there is no path
+        '''
+        i, j = self.index(start), self.index(goal)
+        if i < 0 or j < 0 or self.distances[i, j] == UNREACHABLE:
+            return None
+        tiles = [tuple(int(c) for c in self.tiles[i])]
+        while i != j:
+            d = self.next_dirs[i, j]
+            x, y = self.tiles[i]
+            i = self.tile_index[(y + DIR_Y[d]) * GRIDCOLS + (x + DIR_X[d]) % GRIDCOLS]
+            tiles.append(tuple(int(c) for c in self.tiles[i]))
+        return tiles
@@ -1,12 +1,14 @@
 '''
 Contains the Pacman class
 '''
+import math
 import pygame as pg
 from pygame.locals import *
-from vectors import Vector2
+from vectors import Vector2, copy_vector, closest_on_segment
 from settings import *
-from animation import Animation
-from map_script import sprite_load
+from animation import Animation, find_frame, find_animation
+from map_script import sprite_load, move_bit, MOVE_BITS, REVERSE_BITS
+from maze import MOVE_UP, MOVE_LEFT, MOVE_DOWN, MOVE_RIGHT
 
 class Pacman():
     '''
@@ -25,6 +27,10 @@ class Pacman():
         Tuple of the RGB-value
     position : Vector2
         Pac-Man's position on the board
+    last_position : tuple
+        The position at the start of the last update
+    way_points : list
+        The positions pacman turned at during the last update, as tuples
     direction : Vector2
         Current direction
     not_moved : bool
@@ -50,23 +56,37 @@ class Pacman():
 
     Methods
     -------
-    update(deltatime, _map)
+    update(deltatime, _map, direction)
         Updates the position of pacman, checks whether he is on a node and manage direction changes
-    move_on_node(node, direction, _map)
+    travel(deltatime, _map, direction)
+        Moves pacman in an update of several frames up to the last node center on the way
+    choose_direction(node, on_node_center, direction)
+        Changes the direction by the input, the remembered input and the node
+    quiet_ticks(action, _map, pellets, limit)
+        Returns for how many ticks update would only move pacman on or let him stand still
+    path(ticks, deltatime)
+        Returns the positions of pacman in the ticks found by quiet_ticks
+    glide(action, position, ticks, deltatime)
+        Does what update does in the ticks found by quiet_ticks
+    move_on_node(node, direction)
         Checks if node accepts a certain direction and assign it
-    node_check(node, direction, _map)
+    node_check(node, direction)
         Checks if it allows a certain direction
     possible_dirs()
         Checks whether key was pressed and returns appropriate Vector2
     assign_direction(direction)
         Changes the direction to the desired direction
     render(screen)
-        TEMPORARY: Draws a circle on pacman's position
+        Draws pacman's sprite on his position
     get_tile()
         Returns the tile pacman is currently located on
-    eat_pellet(pellet_list)
-        Calculate distance to all pellets and return if within eating radius
-    position_check(node, tile, _map)
+    eat_pellet(pellets)
+        Look up the pellets around pacman's tile and return one if within eating radius
+    eat_pellets(pellets)
+        Look up the pellets which came within eating radius on pacman's way in the last update
+    passes(position, radius)
+        Checks whether pacman came closer than radius to position during the last update
+    position_check(node, tile)
         Fixes unwanted behaviour
     set_to_center(pos_x, pos_y)
         Sets position to center of tile and stops pacman
@@ -80,10 +100,16 @@ class Pacman():
 
     # pylint: disable=too-many-instance-attributes
 
+    #attributes which are part of a snapshot next to position, animations and sprite
+    STATE = ('direction', 'not_moved', 'remember_direction', 'lives', 'death_animation',
+             'stop_frame', 'show', 'pellet_anim', 'reset')
+
     def __init__(self, _map):
         self.name = "pacman"
         self.color = YELLOW
         self.position = Vector2(14*16, 27*16-8)
+        self.last_position = self.position.as_tuple()
+        self.way_points = []
         self.direction = STOP
         self.not_moved = True
         self.remember_direction = None
@@ -112,7 +138,7 @@ class Pacman():
         }
         self.reset = False
 
-    def update(self, deltatime, _map):
+    def update(self, deltatime, _map, direction=None):
         '''
         Updates the position of pacman, checks whether he is on a node and manage direction changes
 
@@ -122,21 +148,33 @@ class Pacman():
             Changes with different FPS, so that all movement is independent of FPS
         _map : Map
             The Map object for sprites and tiles
+        direction : Vector2
+            The desired direction, None if no input was given
         '''
-        #check if frame has to be skipped
+        #the position the movement of this tick starts from and the points it turns at, see
+        #Ghost.crossed_paths and eat_pellets
+        self.last_position = self.position.as_tuple()
+        self.way_points = []
+
+        #check if frame has to be skipped, an update of several frames only rests for one of them
         if self.stop_frame:
             self.stop_frame = False
-            return
+            if deltatime <= DELTATIME:
+                return
+            deltatime -= DELTATIME
+
+        #A move of several frames decides on every node center it passes, see travel
+        moving = self.travel(deltatime, _map, direction) if deltatime > DELTATIME else deltatime
 
         #Move to the faced direction
-        self.position += self.direction*self.speed*deltatime
+        self.position += self.direction * (self.speed * moving)
         #TODO: self.update_animations(deltatime)
 
         #Get the current tile pacman is on
         tile = self.get_tile()
 
-        #TODO: change so that nodes are read from file
-        node = _map.nodes.get((tile.x + 1, tile.y + 1), False)
+        #the directions allowed if pacman is on a node, 0 otherwise
+        node = _map.node_moves(tile)
 
         #Center the position of pacman to prevent errors
         self.center(tile)
@@ -150,11 +188,129 @@ class Pacman():
                 on_node_center = True
             else:
                 #Prevent pacman from going through walls which happens when pacman moved too fast
-                self.position_check(node, tile, _map)
+                self.position_check(node, tile)
+
+        self.choose_direction(node, on_node_center, direction)
 
-        #Determine next direction
-        direction = self.possible_dirs()
+        _map.teleport_check(self)
 
+        self.update_animations(deltatime)
+
+    def travel(self, deltatime, _map, direction):
+        '''
+        Moves pacman in an update of several frames up to the last node center he passes on
+        the way. On each of them he decides like in a frame which ends on the center, so he
+        turns and stops on the nodes he would reach frame by frame
+
+        Parameters
+        ----------
+        deltatime : float
+            The time of the update, longer than DELTATIME
+        _map : Map
+            The Map class object which contains the move table
+        direction : Vector2
+            The desired direction, None if no input was given
+
+        Returns
+        -------
+        float
+            The time left for moving on from the last node center
+        '''
+        while deltatime > 0:
+            tile = self.get_tile()
+            if self.direction is STOP:
+                #starting to move takes a frame, see update
+                node = _map.node_moves(tile)
+                on_node_center = bool(node) and \
+                    abs(tile.x * TILEWIDTH - (self.position.x - TILEWIDTH / 2)) <= 1 and \
+                    abs(tile.y * TILEHEIGHT - (self.position.y - TILEHEIGHT / 2)) <= 1
+                self.choose_direction(node, on_node_center, direction)
+                deltatime -= DELTATIME
+                if self.direction is STOP:
+                    return 0.0
+                continue
+
+            #the distance to the center of the tile pacman is on
+            step_x = self.direction.x
+            step_y = self.direction.y
+            col = tile.x
+            row = tile.y
+            mid_x = col * TILEWIDTH + TILEWIDTH / 2
+            mid_y = row * TILEHEIGHT + TILEHEIGHT / 2
+            ahead = step_x * (mid_x - self.position.x) + step_y * (mid_y - self.position.y)
+            frame = self.speed * DELTATIME
+            #a center closer than a frame minus the window of update was decided on in the
+            #frame which ended at the start, see update
+            if ahead < frame - 1:
+                node = _map.node_moves(tile)
+                if node and not self.node_check(node, self.direction):
+                    #the next frame runs into the wall and puts him back on the center, see position_check
+                    self.set_to_center(mid_x, mid_y)
+                    self.way_points.append(self.position.as_tuple())
+                    self.choose_direction(node, False, direction)
+                    deltatime -= DELTATIME
+                    continue
+                col += step_x
+                row += step_y
+                ahead += TILEWIDTH
+
+            #reversing happens after the move of the first frame, see update
+            if direction and direction is not self.direction and self.direction.is_parallel(direction):
+                self.position += self.direction * frame
+                self.way_points.append(self.position.as_tuple())
+                self.assign_direction(direction)
+                deltatime -= DELTATIME
+                continue
+
+            #the next node whose tile is reached
+            distance = self.speed * deltatime
+            node = 0
+            while ahead - TILEWIDTH / 2 <= distance:
+                node = _map.node_moves(Vector2(col, row))
+                if node:
+                    break
+                col += step_x
+                row += step_y
+                ahead += TILEWIDTH
+            if not node:
+                return deltatime
+            mid_x = col * TILEWIDTH + TILEWIDTH / 2
+            mid_y = row * TILEHEIGHT + TILEHEIGHT / 2
+            if not node & REVERSE_BITS[move_bit(self.direction)]:
+                #a node which does not lead back puts him on its center in the first frame
+                #that ends on its tile, see position_check
+                self.set_to_center(mid_x, mid_y)
+                self.way_points.append(self.position.as_tuple())
+                self.choose_direction(node, False, direction)
+                deltatime -= (int((ahead - TILEWIDTH / 2) / frame) + 1) * DELTATIME
+                continue
+            if ahead > distance:
+                return deltatime
+
+            self.position.x = int(mid_x)
+            self.position.y = int(mid_y)
+            self.way_points.append(self.position.as_tuple())
+            deltatime -= ahead / self.speed
+            self.choose_direction(node, True, direction)
+            #pacman stops on the center if the node does not let him go on, see position_check
+            if not self.node_check(node, self.direction):
+                self.direction = STOP
+                return 0.0
+        return 0.0
+
+    def choose_direction(self, node, on_node_center, direction):
+        '''
+        Changes the direction by the input, the remembered input and the node pacman is on
+
+        Parameters
+        ----------
+        node : int
+            The entry of the tile pacman is on in the move table, 0 if it is no node
+        on_node_center : bool
+            True if pacman is on the center of a node tile, where he can turn
+        direction : Vector2
+            The desired direction, None if no input was given
+        '''
         #Reset remember_direction if the vector is parallel to direction vector, in order to
         #prevent 'jumping back' when hitting a wall
         if self.remember_direction and self.direction.is_parallel(self.remember_direction):
@@ -171,7 +327,7 @@ class Pacman():
                 if on_node_center:
 
                     #Check if node allows movement to desired direction
-                    self.move_on_node(node, direction, _map)
+                    self.move_on_node(node, direction)
 
                 #Else check if pacman moves for first time
                 elif self.not_moved:
@@ -189,7 +345,7 @@ class Pacman():
             #As the desired action is not reversing, change direction only if on the
             #center of a node and if the node allows the direction
             elif on_node_center:
-                self.move_on_node(node, direction, _map)
+                self.move_on_node(node, direction)
 
             #Otherwise, remember the desired direction, in order to change direction when
             #pacman reaches a node
@@ -200,21 +356,168 @@ class Pacman():
         elif on_node_center:
 
             #Determine whether previous input was given and is suitable
-            if self.remember_direction and self.node_check(node, self.remember_direction, _map):
+            if self.remember_direction and self.node_check(node, self.remember_direction):
                 self.assign_direction(self.remember_direction)
                 self.remember_direction = None
 
             #Otherwise, continue with same direction, if possible
             else:
                 direction = self.direction
-                if not self.move_on_node(node, direction, _map):
+                if not self.move_on_node(node, direction):
                     self.direction = STOP
-        
-        _map.teleport_check(self)
 
-        self.update_animations(deltatime)
+    def quiet_ticks(self, action, _map, pellets, limit):
+        '''
+        Returns for how many of the next ticks update would do nothing but move pacman on
+        along his lane, or let him stand still on a node in front of a wall. Pacman is centered
+        on his lane, so the next thing to happen lies ahead of him on it: the window around
+        the center of a node in which he can turn, the range of a pellet or the end of a
+        tunnel. The ticks are the distance to it divided by the distance of a tick
 
-    def move_on_node(self, node, direction, _map):
+        Parameters
+        ----------
+        action : Vector2
+            The desired direction in all of these ticks, None if no input is given
+        _map : Map
+            The Map class object which contains the move table
+        pellets : AllPellets
+            All pellets on the map, the ticks end before a pellet is in eating range
+        limit : int
+            The most ticks which are looked at
+
+        Returns
+        -------
+        int
+            The amount of ticks, 0 if the next tick needs update
+        '''
+        if self.stop_frame or self.death_animation or self.not_moved or limit <= 0:
+            return 0
+        action_bit = 0 if action is None else MOVE_BITS.get(action)
+        if action_bit is None:
+            return 0
+        direction = self.direction
+        tile = self.get_tile()
+        radius = self.radius + self.collision_radius
+
+        if direction is STOP:
+            #standing still is only quiet on the center of a node which does not allow the action
+            node = _map.node_moves(tile)
+            if not node or node & action_bit or self.remember_direction or \
+                    abs(tile.x * TILEWIDTH - (self.position.x - TILEWIDTH / 2)) > 1 or \
+                    abs(tile.y * TILEHEIGHT - (self.position.y - TILEHEIGHT / 2)) > 1 or \
+                    pellets.collide(self.position, tile, radius):
+                return 0
+            return limit
+
+        #reversing is done by update, turning is only remembered until the next node
+        bit = MOVE_BITS.get(direction)
+        if bit is None or action_bit == REVERSE_BITS[bit]:
+            return 0
+        sign = direction.x + direction.y
+        if direction.x:
+            along = self.position.x
+            across = self.position.y - (tile.y * TILEHEIGHT + TILEHEIGHT / 2)
+            ahead = (SWIDTH + 1.5 * TILEWIDTH - along) if sign > 0 else along + 1.5 * TILEWIDTH
+        else:
+            along = self.position.y
+            across = self.position.x - (tile.x * TILEWIDTH + TILEWIDTH / 2)
+            ahead = math.inf
+        if across:
+            return 0
+        step = self.speed * DELTATIME
+        #the tiles from the one behind pacman to the last one he can reach, each with the
+        #range before and after its center in which update does more than moving him on
+        tiles = int(limit * step / TILEWIDTH) + 3
+        for count in range(-1, tiles):
+            if direction.x:
+                col, row = tile.x + sign * count, tile.y
+                center = col * TILEWIDTH + TILEWIDTH / 2
+            else:
+                col, row = tile.x, tile.y + sign * count
+                center = row * TILEHEIGHT + TILEHEIGHT / 2
+            before = after = 0
+            node = _map.node_moves(Vector2(col, row))
+            if node:
+                #the center where he can turn, and the side of a wall, see position_check
+                before = 1 if node & REVERSE_BITS[bit] else TILEWIDTH / 2
+                after = 1 if node & bit else TILEWIDTH / 2
+            if pellets.get_pellet(col, row):
+                before = max(before, radius)
+                after = max(after, radius)
+            distance = sign * (center - along)
+            if (before or after) and distance + after >= 0:
+                ahead = min(ahead, distance - before)
+                break
+        if ahead <= 0:
+            return 0
+        if ahead == math.inf:
+            return limit
+        #the positions are summed up tick by tick, which the margin allows for
+        return max(min(limit, math.ceil((ahead - 0.001) / step) - 1), 0)
+
+    def path(self, ticks, deltatime):
+        '''
+        Returns the positions update moves pacman to in ticks found by quiet_ticks
+
+        Parameters
+        ----------
+        ticks : int
+            The amount of ticks
+        deltatime : float
+            Changes with different FPS, so that all movement is independent of FPS
+
+        Returns
+        -------
+        list
+            The position after every tick, as tuple
+        '''
+        move = self.direction * (self.speed * deltatime)
+        x = self.position.x + move.x
+        y = self.position.y + move.y
+        if self.direction is STOP:
+            return [(x, y)] * ticks
+        tile = self.get_tile()
+        if move.x:
+            y = int(tile.y * TILEHEIGHT + TILEHEIGHT / 2)
+        else:
+            x = int(tile.x * TILEWIDTH + TILEWIDTH / 2)
+        positions = []
+        for _ in range(ticks):
+            positions.append((x, y))
+            if move.x:
+                x += move.x
+            else:
+                y += move.y
+        return positions
+
+    def glide(self, action, position, ticks, deltatime):
+        '''
+        Does what update does in ticks found by quiet_ticks, all at once
+
+        Parameters
+        ----------
+        action : Vector2
+            The desired direction, None if no input was given
+        position : tuple
+            The position after the ticks, see path
+        ticks : int
+            The amount of ticks
+        deltatime : float
+            Changes with different FPS, so that all movement is independent of FPS
+        '''
+        self.position.x, self.position.y = position
+        if self.remember_direction and self.direction.is_parallel(self.remember_direction):
+            self.remember_direction = None
+        if action is not None and action is not self.direction and self.direction is not STOP:
+            self.remember_direction = action
+        #the animation is only advanced once it is the one of the direction
+        while ticks and (self.direction is STOP or self.pellet_anim or self.animation is not self.previous_anim):
+            self.update_animations(deltatime)
+            ticks -= 1
+        if ticks:
+            self.sprite = self.animation.skip(deltatime, ticks)
+
+    def move_on_node(self, node, direction):
         '''
         Calls the node_check function to check,
         whether the node accepts the desired direction, and if yes,
@@ -222,46 +525,38 @@ class Pacman():
 
         Parameters
         ----------
-        node : string
-            A string containing all possible directions
+        node : int
+            The entry of the node in the move table of the map
         direction : Vector2
             The desired direction
-        _map : Map
-            The Map class object which contains all nodes and all node types
 
         Returns
         -------
         bool
             Indicates, whether direction was changed
         '''
-        check = self.node_check(node, direction, _map)
+        check = self.node_check(node, direction)
         if check:
             self.assign_direction(direction)
         return check
 
-    def node_check(self, node, direction, _map):
+    def node_check(self, node, direction):
         '''
-        Converts the node string to a Node class object and checks if it allows a certain direction
+        Checks if a node allows a certain direction
 
         Parameters
         ----------
-        node : string
-            A string containing all possible directions
+        node : int
+            The entry of the node in the move table of the map
         direction : Vector2
             The desired direction
-        _map : Map
-            The Map class object which contains all nodes and all node types
 
         Returns
         -------
         bool
             Indicates, whether direction was changed
         '''
-        node = _map.node_types.get(node, False)
-        if node:
-            result = node.check_dir(direction)
-            return result
-        return False
+        return bool(node & move_bit(direction))
 
     def possible_dirs(self):
         '''
@@ -296,12 +591,17 @@ class Pacman():
 
     def render(self, screen):
         '''
-        TEMPORARY: Draws a circle on pacman's position
+        Draws pacman's sprite on his position
+
+        Returns
+        -------
+        list
+            The rects of the screen which were drawn on
         '''
         if self.show:
-            pos = (self.position - Vector2(TILEWIDTH, TILEHEIGHT)).as_int()
-            screen.blit(self.sprite, pos)
-            
+            pos = (int(self.position.x - TILEWIDTH), int(self.position.y - TILEHEIGHT))
+            return [screen.blit(self.sprite, pos)]
+        return []
 
     def get_tile(self):
         '''
@@ -317,30 +617,111 @@ class Pacman():
 
         return Vector2(x, y)
 
-    def eat_pellet(self, pellet_list):
+    def eat_pellet(self, pellets):
         '''
-        Calculate distance to all pellets and return if within eating radius
+        Look up the pellets around pacman's tile and return one if within eating radius
 
         Parameters
         ----------
-        pellet_list : list
-            A list containing all pellets
+        pellets : AllPellets
+            All pellets on the map
 
         Returns
         -------
         Pellet
             The Pellet which is in eating range, returns none if there are no pellets in range
         '''
-        for pellet in pellet_list:
-            d = self.position - pellet.position
-            d_squared = d.magnitude_squared()
-            r_squared = (self.radius + self.collision_radius)**2
+        return pellets.collide(self.position, self.get_tile(), self.radius + self.collision_radius)
 
-            if d_squared <= r_squared:
-                return pellet
-        return None
+    def eat_pellets(self, pellets):
+        '''
+        Look up the pellets which came within eating radius on pacman's way in the last update,
+        for updates of several frames in which he can pass more than one pellet. He rests for
+        the frame after each of them, see update, so if that frame was part of the update he
+        is moved back by a frame, otherwise stop_frame is set
+
+        Parameters
+        ----------
+        pellets : AllPellets
+            All pellets on the map
+
+        Returns
+        -------
+        list
+            The Pellets in eating range, in the order pacman reached them
+        '''
+        radius = self.radius + self.collision_radius
+        points = [self.last_position] + self.way_points + [self.position.as_tuple()]
+        eaten = []
+        #how far along the way each pellet came within radius
+        reached = []
+        travelled = 0.0
+        length = 0.0
+        for start, end in zip(points, points[1:]):
+            #the way of a teleport leads across the whole map, where no pellets are
+            if abs(end[0] - start[0]) > SWIDTH / 2:
+                length = 0.0
+                continue
+            length = math.hypot(end[0] - start[0], end[1] - start[1])
+            for pellet in pellets.sweep(start, end, radius):
+                if pellet not in eaten:
+                    #where the way enters the circle of radius around the pellet
+                    p_x = pellet.position.x - start[0]
+                    p_y = pellet.position.y - start[1]
+                    along = (p_x * (end[0] - start[0]) + p_y * (end[1] - start[1])) / length if length else 0.0
+                    across = max(radius**2 - (p_x * p_x + p_y * p_y - along * along), 0.0)
+                    eaten.append(pellet)
+                    reached.append(travelled + max(along - math.sqrt(across), 0.0))
+            travelled += length
+
+        frame = self.speed * DELTATIME
+        for i, distance in enumerate(reached):
+            #the frames end every frame along the way, the pellet is eaten in the first one
+            #which ends in range
+            eaten_at = math.ceil(distance / frame - 1e-6) * frame
+            if eaten_at > travelled + 1e-6:
+                #he only gets there after the rest for the pellet before
+                del eaten[i:]
+                break
+            if self.direction is STOP:
+                #he waited on a wall anyway
+                continue
+            if eaten_at + frame <= travelled + 1e-6 and length >= frame:
+                self.position += self.direction * -frame
+                travelled -= frame
+                length -= frame
+            else:
+                self.stop_frame = True
+        return eaten
+
+    def passes(self, position, radius):
+        '''
+        Checks whether pacman came closer than radius to position during the last update, on
+        his way in an update of several frames
+
+        Parameters
+        ----------
+        position : Vector2
+            The position to check
+        radius : float
+            The range
+
+        Returns
+        -------
+        bool
+            True if pacman came in range
+        '''
+        point = position.as_tuple()
+        points = [self.last_position] + self.way_points + [self.position.as_tuple()]
+        for start, end in zip(points, points[1:]):
+            #the way of a teleport leads across the whole map
+            if abs(end[0] - start[0]) > SWIDTH / 2:
+                continue
+            if closest_on_segment(start, end, point)[1] < radius**2:
+                return True
+        return False
 
-    def position_check(self, node, tile, _map):
+    def position_check(self, node, tile):
         '''
         Checks for unwanted pacman behaviour. Sometimes nodes are not detected properly.
         Each time moves out of the predestined grid, the set_to_center gets called and
@@ -348,23 +729,20 @@ class Pacman():
 
         Parameters
         ----------
-        node : string
-            A string containing all possible directions
+        node : int
+            The entry of the node in the move table of the map
         tile : Vector2
             The tile on which pacman currently stands
-        _map : Map
-            The Map class object which contains all nodes and all node types
         '''
         mid_x = tile.x * TILEWIDTH + TILEWIDTH / 2
         mid_y = tile.y * TILEHEIGHT + TILEHEIGHT / 2
-        node = _map.node_types.get(node, False)
         if not node:
             raise Exception("Node not working!")
-        if (int(self.position.x) < int(mid_x) and not node.left) or \
-           (int(self.position.x) > int(mid_x) and not node.right):
+        if (int(self.position.x) < int(mid_x) and not node & MOVE_LEFT) or \
+           (int(self.position.x) > int(mid_x) and not node & MOVE_RIGHT):
             self.set_to_center(mid_x, mid_y)
-        elif (int(self.position.y) < int(mid_y) and not node.up) or \
-             (int(self.position.y) > (mid_y) and not node.down):
+        elif (int(self.position.y) < int(mid_y) and not node & MOVE_UP) or \
+             (int(self.position.y) > (mid_y) and not node & MOVE_DOWN):
             self.set_to_center(mid_x, mid_y)
 
     def set_to_center(self, pos_x, pos_y):
@@ -473,7 +851,8 @@ class Pacman():
         self.eating_animation_list["down"] = anim
 
         anim = Animation("singular", "death")
-        anim.fps = 1
+        #lasts as long as death_1.wav
+        anim.fps = 4
         anim.add_frame('pacman_open2.png', 90, False)
         anim.add_frame('pacman_death2.png', 0, False)
         anim.add_frame('pacman_death3.png', 0, False)
@@ -487,6 +866,7 @@ class Pacman():
         anim.add_frame('pacman_death11.png', 0, False)
         anim.add_frame('Black.png', 0, False)
         self.animation_list['death'] = anim
+        self.all_animations = list(self.animation_list.values()) + list(self.eating_animation_list.values())
 
     def update_animations(self, deltatime):
         if self.death_animation:
@@ -547,11 +927,18 @@ class Pacman():
         ----------
         screen : pygame.Surface
             The game window
+
+        Returns
+        -------
+        list
+            The rects of the screen which were drawn on
         '''
+        rects = []
         for i in range(self.lives - 1):
             x = (2 + 2 * i) * TILEWIDTH
             y = 34 * TILEHEIGHT
-            screen.blit(self.life_sprite, (x, y))
+            rects.append(screen.blit(self.life_sprite, (x, y)))
+        return rects
     def reset_self(self):
         self.position = Vector2(14*16, 27*16-8)
         self.direction = STOP
@@ -562,7 +949,58 @@ class Pacman():
         self.not_moved = True
         self.remember_direction = None
         self.sprite = sprite_load('pacman_closed.png', 32, 32, 0)
-        self.animation = None
-        self.previous_anim = None
         self.reset = False
-        self.define_animations()
\ No newline at end of file
+        self.reset_animations()
+
+    def reset_animations(self):
+        '''
+        Rewinds all animations to their first frame, the frames themselves are kept
+        '''
+        for anim in list(self.animation_list.values()) + list(self.eating_animation_list.values()):
+            anim.reset()
+            anim.deltatime = 0
+        self.animation = self.animation_list["right"]
+        self.previous_anim = self.animation
+
+    def snapshot(self):
+        '''
+        Returns the state of Pac-Man, which contains no surfaces and can be given to restore.
+        Animations and the sprite are stored as indices into all_animations
+
+        Returns
+        -------
+        tuple
+            The state
+        '''
+        animations = self.all_animations
+        return (
+            self.position.copy(),
+            tuple(copy_vector(getattr(self, name)) for name in self.STATE),
+            tuple(anim.snapshot() for anim in animations),
+            find_animation(animations, self.animation),
+            find_animation(animations, self.previous_anim),
+            find_frame(animations, self.sprite)
+        )
+
+    def restore(self, state):
+        '''
+        Returns to a state created by snapshot, nothing is loaded or created except vectors
+
+        Parameters
+        ----------
+        state : tuple
+            The state
+        '''
+        position, values, animation_states, animation, previous_anim, sprite = state
+        animations = self.all_animations
+        self.position = position.copy()
+        for name, value in zip(self.STATE, values):
+            setattr(self, name, copy_vector(value))
+        for anim, anim_state in zip(animations, animation_states):
+            anim.restore(anim_state)
+        self.animation = None if animation is None else animations[animation]
+        self.previous_anim = None if previous_anim is None else animations[previous_anim]
+        if sprite is None:
+            self.sprite = sprite_load('pacman_closed.png', 32, 32, 0)
+        else:
+            self.sprite = animations[sprite[0]].sprites[sprite[1]]
\ No newline at end of file
@@ -0,0 +1,394 @@
+'''
+Contains the PacmanEnv class, a reinforcement learning environment with the interface of a
+gym environment, which plays the game through a headless Simulation
+'''
+import random
+import numpy as np
+import pygame as pg
+from settings import *
+from simulation import *
+from pellets import AllPellets, PELLET_TILE, POWERPELLET_TILE
+from maze_graph import DIRECTIONS
+
+#actions are indices into ACTIONS, in the same order as the direction indices of maze_graph
+ACTIONS = DIRECTIONS + [None]
+
+#observation encodings
+GRID = "grid"
+FEATURES = "features"
+RGB = "rgb"
+
+#channels of the grid observation
+GRID_WALL = 0
+GRID_PELLET = 1
+GRID_POWERPELLET = 2
+GRID_PACMAN = 3
+GRID_GHOST = 4
+GRID_FRIGHTENED = 5
+GRID_EATEN = 6
+GRID_FRUIT = 7
+GRID_CHANNELS = 8
+
+#layout of the feature observation: Pac-Man's position and direction, the position and mode
+#of every ghost, the share of remaining pellets, the lives, the remaining frightened time and
+#whether the fruit is shown. Positions are divided by the screen size
+FEATURE_GHOSTS = 6
+FEATURE_COUNT = 2 + 4 + 4 * FEATURE_GHOSTS + 4
+
+FRIGHTENED_TICKS = 8 * FPS
+LIVES = 5
+
+
+class PacmanEnv():
+    '''
+    A reinforcement learning environment with reset, step and render like a gym environment.
+    Every step advances the game by frame_skip ticks, the reward is the increase of the score.
+    Observations are written into buffers which are allocated once, so the returned array is
+    the same object after every step and has to be copied to be kept
+
+    Parameters
+    ----------
+    observation : string
+        The encoding of the observations, GRID, FEATURES or RGB
+    frame_skip : int
+        The amount of ticks every step lasts, the action is repeated for each of them
+    max_steps : int
+        Steps after which an episode is truncated, None for no limit
+
+    Attributes
+    ----------
+    sim : Simulation
+        The game of the current episode, the same object for all episodes
+    action_count : int
+        The amount of actions, UP, LEFT, DOWN, RIGHT and no input
+    observation_shape : tuple
+        The shape of the observations
+    observation_dtype : numpy.dtype
+        The data type of the observations
+    grid : numpy.ndarray
+        Buffer of the grid observation, one channel per GRID_* constant, shape
+        (GRID_CHANNELS, GRIDROWS, GRIDCOLS)
+    features : numpy.ndarray
+        Buffer of the feature observation, shape (FEATURE_COUNT,)
+    pixels : numpy.ndarray
+        Buffer the frame is copied into, in the column-major order of pygame, shape
+        (SWIDTH, SHEIGHT, 3)
+    rgb : numpy.ndarray
+        Row-major view of pixels, shape (SHEIGHT, SWIDTH, 3)
+    info : dict
+        Score, lives, level and events of the last step, updated in place
+
+    Methods
+    -------
+    reset(seed)
+        Starts a new game and returns the first observation
+    step(action)
+        Advances the game and returns observation, reward, terminated, truncated and info
+    render(mode)
+        Returns the current frame or shows it in a window
+    snapshot()
+        Returns the state of the episode
+    restore(state)
+        Returns to a state created by snapshot
+    close()
+        Closes the window opened by render
+    '''
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, observation=GRID, frame_skip=1, max_steps=None):
+        if observation not in (GRID, FEATURES, RGB):
+            raise ValueError("Unknown observation encoding: " + str(observation))
+        self.observation = observation
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.action_count = len(ACTIONS)
+        #the game is created once, every episode starts a new game in it
+        self.sim = Simulation()
+        self.steps = 0
+        self.window = None
+        #draws the seeds of episodes which are reset without one
+        self.seeds = random.Random()
+
+        self.grid = np.zeros((GRID_CHANNELS, GRIDROWS, GRIDCOLS), dtype=np.uint8)
+        symbols = AllPellets().read_mapfile()
+        for row in range(GRIDROWS):
+            for col in range(GRIDCOLS):
+                self.grid[GRID_WALL, row, col] = symbols[row][col] == '.'
+        #the pellet channels are read straight from the pellet grid of the simulation, which
+        #is changed in place by new games
+        self.pellet_view = np.frombuffer(self.sim.pellets.grid, dtype=np.uint8).reshape(GRIDROWS, GRIDCOLS)
+        self.features = np.zeros(FEATURE_COUNT, dtype=np.float32)
+        self.pixels = np.zeros((SWIDTH, SHEIGHT, 3), dtype=np.uint8)
+        self.rgb = self.pixels.transpose(1, 0, 2)
+        self.frame = pg.Surface(SCREENSIZE)
+        self.maze = None
+        self.background = None
+
+        buffer = {GRID: self.grid, FEATURES: self.features, RGB: self.rgb}[observation]
+        self.observation_shape = buffer.shape
+        self.observation_dtype = buffer.dtype
+        self.info = {"score": 0, "lives": LIVES, "level": 1, "events": []}
+
+    def reset(self, seed=None):
+        '''
+        Starts a new game
+
+        Parameters
+        ----------
+        seed : int
+            Seed of the random numbers used by the game, which makes the episode repeatable.
+            Without a seed, the seed is drawn from the seeds of the previous episodes, so all
+            episodes after a seeded reset are repeatable as well
+
+        Returns
+        -------
+        tuple
+            The first observation and the info dictionary
+        '''
+        if seed is None:
+            seed = self.seeds.getrandbits(63)
+        else:
+            self.seeds.seed(seed)
+        self.sim.new_game(seed)
+        self.steps = 0
+        self.background = None
+        self.info["events"] = []
+        self.update_info()
+        return self.observe(), self.info
+
+    def step(self, action):
+        '''
+        Advances the game by frame_skip ticks
+
+        Parameters
+        ----------
+        action : int
+            Index into ACTIONS, NO_ACTION or None for no input
+
+        Returns
+        -------
+        tuple
+            The observation, the reward, whether the game is over, whether the episode was
+            truncated and the info dictionary
+        '''
+        direction = None if action is None else ACTIONS[action]
+        sim = self.sim
+        score = sim.score
+        events = self.info["events"]
+        events.clear()
+        for _ in range(self.frame_skip):
+            events += sim.step(direction)
+            if sim.gameover:
+                break
+        self.steps += 1
+        if self.background is not None:
+            self.update_background(events)
+        self.update_info()
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        return self.observe(), sim.score - score, sim.gameover, truncated, self.info
+
+    def snapshot(self):
+        '''
+        Returns the state of the episode, see Simulation.snapshot
+
+        Returns
+        -------
+        tuple
+            The state, which can be given to restore
+        '''
+        return self.sim.snapshot(), self.steps
+
+    def restore(self, state):
+        '''
+        Returns to a state created by snapshot, which allows forking an episode for tree search
+
+        Parameters
+        ----------
+        state : tuple
+            The state
+
+        Returns
+        -------
+        numpy.ndarray
+            The observation of the restored state
+        '''
+        sim_state, self.steps = state
+        self.sim.restore(sim_state)
+        self.background = None
+        self.info["events"].clear()
+        self.update_info()
+        return self.observe()
+
+    def update_info(self):
+        '''
+        Writes score, lives and level into the info dictionary
+        '''
+        self.info["score"] = self.sim.score
+        self.info["lives"] = self.sim.pacman.lives
+        self.info["level"] = self.sim.level
+
+    def observe(self):
+        '''
+        Writes the current observation into its buffer
+
+        Returns
+        -------
+        numpy.ndarray
+            The buffer of the observation
+        '''
+        if self.observation == GRID:
+            return self.observe_grid()
+        if self.observation == FEATURES:
+            return self.observe_features()
+        return self.observe_rgb()
+
+    def observe_grid(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            The grid observation
+        '''
+        grid = self.grid
+        np.equal(self.pellet_view, PELLET_TILE, out=grid[GRID_PELLET])
+        np.equal(self.pellet_view, POWERPELLET_TILE, out=grid[GRID_POWERPELLET])
+        grid[GRID_PACMAN:].fill(0)
+        col, row = tile_of(self.sim.pacman.position)
+        grid[GRID_PACMAN, row, col] = 1
+        for ghost in self.sim.ghosts:
+            col, row = tile_of(ghost.position)
+            if ghost.mode == 2:
+                grid[GRID_FRIGHTENED, row, col] = 1
+            elif ghost.mode == 3:
+                grid[GRID_EATEN, row, col] = 1
+            else:
+                grid[GRID_GHOST, row, col] = 1
+        if self.sim.fruit_visible():
+            col, row = tile_of(self.sim.fruit.position)
+            grid[GRID_FRUIT, row, col] = 1
+        return grid
+
+    def observe_features(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            The feature observation
+        '''
+        sim = self.sim
+        features = self.features
+        features.fill(0)
+        features[0] = sim.pacman.position.x / SWIDTH
+        features[1] = sim.pacman.position.y / SHEIGHT
+        for i, direction in enumerate(DIRECTIONS):
+            if sim.pacman.direction is direction:
+                features[2 + i] = 1
+        index = 6
+        for ghost in sim.ghosts:
+            features[index] = ghost.position.x / SWIDTH
+            features[index + 1] = ghost.position.y / SHEIGHT
+            features[index + 2 + ghost.mode] = 1
+            index += FEATURE_GHOSTS
+        features[index] = sim.pellets.remaining / len(sim.pellets.pellet_list)
+        features[index + 1] = sim.pacman.lives / LIVES
+        if sim.ghosts.frightened_timer is not None:
+            features[index + 2] = max(0, FRIGHTENED_TICKS - (sim.ghosts.ticks - sim.ghosts.frightened_timer)) / FRIGHTENED_TICKS
+        features[index + 3] = sim.fruit_visible()
+        return features
+
+    def observe_rgb(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            The current frame
+        '''
+        self.draw_frame()
+        pg.pixelcopy.surface_to_array(self.pixels, self.frame)
+        return self.rgb
+
+    def draw_frame(self):
+        '''
+        Draws the maze, the pellets, Pac-Man, the ghosts, the fruit and the lives onto frame
+        '''
+        if self.maze is None:
+            self.maze = pg.Surface(SCREENSIZE)
+            self.maze.fill(BLACK)
+            self.sim.map.render(self.maze)
+        if self.background is None:
+            self.background = self.maze.copy()
+            self.sim.pellets.render(self.background)
+        sim = self.sim
+        self.frame.blit(self.background, (0, 0))
+        sim.pacman.render(self.frame)
+        sim.ghosts.render(self.frame)
+        sim.pacman.render_lives(self.frame)
+        if sim.fruit_visible():
+            sim.fruit.render(self.frame)
+
+    def update_background(self, events):
+        '''
+        Removes eaten pellets from the background, or draws all of them again for a new level
+        '''
+        for event, _, position in events:
+            if event == LEVEL_COMPLETE:
+                self.background = None
+                return
+            if event in (PELLET_EATEN, POWER_PELLET_EATEN):
+                rect = pg.Rect(position.x - TILEWIDTH / 2, position.y - TILEHEIGHT / 2, TILEWIDTH, TILEHEIGHT)
+                self.background.blit(self.maze, rect, rect)
+
+    def render(self, mode="rgb_array"):
+        '''
+        Renders the current state of the game
+
+        Parameters
+        ----------
+        mode : string
+            "rgb_array" to get the frame, "human" to show it in a window
+
+        Returns
+        -------
+        numpy.ndarray
+            The frame for "rgb_array", which is the same buffer as the RGB observation
+        '''
+        if mode == "rgb_array":
+            return self.observe_rgb()
+        if mode == "human":
+            if self.window is None:
+                pg.display.init()
+                self.window = pg.display.set_mode(SCREENSIZE)
+            self.draw_frame()
+            self.window.blit(self.frame, (0, 0))
+            pg.display.flip()
+            pg.event.pump()
+            return None
+        raise ValueError("Unknown render mode: " + str(mode))
+
+    def close(self):
+        '''
+        Closes the window opened by render
+        '''
+        if self.window is not None:
+            pg.display.quit()
+            self.window = None
+
+
+def tile_of(position):
+    '''
+    Returns the tile of a position, clamped to the map
+
+    Parameters
+    ----------
+    position : Vector2
+        The position
+
+    Returns
+    -------
+    tuple
+        The column and the row of the tile
+    '''
+    col = round((position.x - TILEWIDTH / 2) / TILEWIDTH)
+    row = round((position.y - TILEHEIGHT / 2) / TILEHEIGHT)
+    return min(max(col, 0), GRIDCOLS - 1), min(max(row, 0), GRIDROWS - 1)
@@ -1,7 +1,9 @@
 import pygame as pg
-from vectors import Vector2
+from vectors import Vector2, closest_on_segment
 from settings import *
 import map_script
+#values of AllPellets.grid, the same as the pellet layout of the maze
+from maze import load_maze, DEFAULT_MAZE, EMPTY_TILE, PELLET_TILE, POWERPELLET_TILE
 
 class Pellet(object):
     '''
@@ -19,6 +21,8 @@ class Pellet(object):
         Point value to score of a single pellet
     show : bool
         Indicates wether the pellet should be visible
+    index : int
+        The index of the pellet's tile in AllPellets.grid
     
     Methods
     -------
@@ -33,6 +37,7 @@ class Pellet(object):
         self.points = 10
         #self.color = WHITE
         self.show = True
+        self.index = None
 
     def render(self, screen):
         '''
@@ -54,7 +59,7 @@ class Pellet(object):
             pos = (int(pos[0] - TILEWIDTH/2), int(pos[1] - TILEWIDTH/2))
             #pg.draw.circle(screen, self.color, pos, self.radius)
             #pos = (int(pos[0]), int(pos[1]))
-            screen.blit(map_script.PELLET, pos)
+            screen.blit(map_script.tile_load(map_script.PELLET), pos)
 
 class Powerpellet(object):
     '''
@@ -74,6 +79,8 @@ class Powerpellet(object):
         Timer for when powerpellet is consumed by Pac-Man
     show : bool
         Indicates wether the powerpellet should be visible
+    index : int
+        The index of the powerpellet's tile in AllPellets.grid
     
     Methods
     -------
@@ -88,6 +95,7 @@ class Powerpellet(object):
         #self.color = WHITE
         self.timer = 0
         self.show = True
+        self.index = None
 
     def render(self, screen):
         '''
@@ -112,85 +120,209 @@ class Powerpellet(object):
             
             #pos = (int(pos[0]+TILEWIDTH/2), int(pos[1]+TILEWIDTH/2))
             #pg.draw.circle(screen, self.color, pos, self.radius)
-            screen.blit(map_script.POWER_PELLET, pos)
+            screen.blit(map_script.tile_load(map_script.POWER_PELLET), pos)
 
 class AllPellets(object):
     '''
-    Puts all pellets in one class object, class that gets called from other scripts
+    Puts all pellets in one class object, class that gets called from other scripts. The pellets
+    are stored in a grid with one entry per tile, so looking up or eating a pellet does not
+    depend on the amount of pellets
 
     Attributes
     ----------
     pellet_list : list
-        list of all(uneaten) pellets(including powerpellets)
+        list of all pellets(including powerpellets), eaten pellets are hidden
     powerpellets : list
         List of all powerpellets
-    pellet_symbols : list
-        List of symbols used to indicate 'pellet' in map1.txt
-    powerpellet_symbols : list
-        List of symbols used to indicate 'powerpellet' in map1.txt
+    grid : bytearray
+        One byte per tile, EMPTY_TILE, PELLET_TILE or POWERPELLET_TILE, indexed by row * GRIDCOLS + col
+    pellet_grid : list
+        The Pellet or Powerpellet object of each tile, None for tiles without one
+    remaining : int
+        The amount of uneaten pellets
+    maze : Maze
+        The compiled maze, which holds the pellet layout
     
     Methods
     -------
     create_pellet_list()
         Appends pellets to appropriate lists
     read_mapfile()
-        Extracts symbols from map1.txt
+        Returns the path symbols of the maze
+    get_pellet(col, row)
+        Returns the uneaten pellet on a tile
+    collide(position, tile, radius)
+        Returns an uneaten pellet within radius of position
+    sweep(start, end, radius)
+        Returns the uneaten pellets within radius of a path
+    remove(pellet)
+        Marks a pellet as eaten
+    isEmpty()
+        Checks if all pellets are eaten
+    render(screen)
+        Renders all uneaten pellets
+    reset()
+        Puts all pellets back on the map
+    snapshot()
+        Returns which pellets are eaten
+    restore(state)
+        Returns to a state created by snapshot
 
     '''
     
-    def __init__(self):
+    def __init__(self, name=DEFAULT_MAZE):
         self.pellet_list = []
         self.powerpellets = []
-        self.pellet_symbols = ["p", "n"]
-        self.powerpellet_symbols = ["P", "N"]
+        self.grid = bytearray(GRIDROWS * GRIDCOLS)
+        self.pellet_grid = [None] * (GRIDROWS * GRIDCOLS)
+        self.remaining = 0
+        self.maze = load_maze(name)
         self.create_pellet_list()
 
     def create_pellet_list(self):
         '''
         Appends pellets to appropriate lists
         '''
-        grid = self.read_mapfile()
-        rows = len(grid)
-        cols = len(grid[0])
-        
-        for row in range(rows):
-            for col in range(cols):
+        layout = self.maze.pellets
+
+        for row in range(GRIDROWS):
+            for col in range(GRIDCOLS):
+                pellet = None
                 
-                #if the symbol from the file is in the pellet_symbols list --> create new Pellet and add it to pellet_list
-                if (grid[row][col] in self.pellet_symbols):
-                    self.pellet_list.append(Pellet(col*TILEWIDTH + TILEWIDTH/2, row*TILEHEIGHT + TILEWIDTH/2))
+                #create a new Pellet for tiles with a pellet and add it to pellet_list
+                if layout[row * GRIDCOLS + col] == PELLET_TILE:
+                    pellet = Pellet(col*TILEWIDTH + TILEWIDTH/2, row*TILEHEIGHT + TILEWIDTH/2)
                 
-                #if the symbol from the file is in the powerpellet_symbols list --> create new Powerpellet and add it to pellet_list & powerpellets
-                if (grid[row][col] in self.powerpellet_symbols):
-                    pp = Powerpellet(col*TILEWIDTH + TILEWIDTH/2, row*TILEHEIGHT + TILEWIDTH/2)
-                    self.pellet_list.append(pp)
-                    self.powerpellets.append(pp)
+                #create a new Powerpellet for tiles with a powerpellet and add it to pellet_list & powerpellets
+                if layout[row * GRIDCOLS + col] == POWERPELLET_TILE:
+                    pellet = Powerpellet(col*TILEWIDTH + TILEWIDTH/2, row*TILEHEIGHT + TILEWIDTH/2)
+                    self.powerpellets.append(pellet)
+
+                if pellet:
+                    pellet.index = row * GRIDCOLS + col
+                    self.pellet_list.append(pellet)
+                    self.pellet_grid[pellet.index] = pellet
+        self.reset()
                     
     def read_mapfile(self):
         '''
-        Extracts symbols from map1.txt
+        Returns the path symbols of the maze
         
         Returns
         -------
         list
-            Lists symbols (in order) from map1.txt
+            The symbol of every tile, as a list per row
+        '''
+        return self.maze.symbols()
+
+    def get_pellet(self, col, row):
+        '''
+        Returns the uneaten pellet on a tile
+
+        Parameters
+        ----------
+        col : int
+            The column of the tile
+        row : int
+            The row of the tile
+
+        Returns
+        -------
+        Pellet
+            The pellet on the tile, None if there is none or it has been eaten
+        '''
+        if 0 <= col < GRIDCOLS and 0 <= row < GRIDROWS:
+            index = row * GRIDCOLS + col
+            if self.grid[index]:
+                return self.pellet_grid[index]
+        return None
+
+    def collide(self, position, tile, radius):
+        '''
+        Returns an uneaten pellet within radius of position. Only the given tile and its
+        neighbours are checked, as no pellet further away can be in range
+
+        Parameters
+        ----------
+        position : Vector2
+            The position to check
+        tile : Vector2
+            The tile position is located on
+        radius : float
+            The eating range
+
+        Returns
+        -------
+        Pellet
+            The first pellet in range, None if there are no pellets in range
+        '''
+        r_squared = radius**2
+        for row in range(tile.y - 1, tile.y + 2):
+            for col in range(tile.x - 1, tile.x + 2):
+                pellet = self.get_pellet(col, row)
+                if pellet:
+                    d_x = position.x - pellet.position.x
+                    d_y = position.y - pellet.position.y
+                    if d_x * d_x + d_y * d_y <= r_squared:
+                        return pellet
+        return None
+
+    def sweep(self, start, end, radius):
+        '''
+        Returns the uneaten pellets which come within radius along the path from start to
+        end. Only the tiles around the path are checked
+
+        Parameters
+        ----------
+        start : tuple
+            The start of the path
+        end : tuple
+            The end of the path
+        radius : float
+            The eating range
+
+        Returns
+        -------
+        list
+            The pellets in range, in the order in which they are reached along the path
+        '''
+        r_squared = radius**2
+        cols = [round((x - TILEWIDTH / 2) / TILEWIDTH) for x in (start[0], end[0])]
+        rows = [round((y - TILEHEIGHT / 2) / TILEHEIGHT) for y in (start[1], end[1])]
+        reached = []
+        for row in range(min(rows) - 1, max(rows) + 2):
+            for col in range(min(cols) - 1, max(cols) + 2):
+                pellet = self.get_pellet(col, row)
+                if pellet:
+                    along, distance = closest_on_segment(start, end, pellet.position.as_tuple())
+                    if distance <= r_squared:
+                        reached.append((along, pellet))
+        reached.sort(key=lambda entry: entry[0])
+        return [pellet for _, pellet in reached]
+
+    def remove(self, pellet):
+        '''
+        Marks a pellet as eaten
+
+        Parameters
+        ----------
+        pellet : Pellet
+            The eaten pellet
         '''
-        with open(os.path.join(PATH, "assets", "Map", "map1.txt"), "r") as m:
-            lines = [line.rstrip('\n') for line in m]
-            return [line.split(' ') for line in lines]
+        self.grid[pellet.index] = EMPTY_TILE
+        pellet.show = False
+        self.remaining -= 1
     
     def isEmpty(self):
         '''
-        Checks if pellet_list is empty
+        Checks if all pellets are eaten
 
         Returns
         -------
         bool
-            Indicates wether the list is empty
+            Indicates wether all pellets are eaten
         '''
-        if len(self.pellet_list) == 0:
-            return True
-        return False
+        return self.remaining == 0
     
     def render(self, screen):
         '''
@@ -207,5 +339,41 @@ class AllPellets(object):
         '''
         for pellet in self.pellet_list:
             pellet.render(screen)
+
     def reset(self):
-        self.create_pellet_list()
+        '''
+        Puts all pellets back on the map
+        '''
+        for pellet in self.pellet_list:
+            if pellet.name == "PowerPellet":
+                self.grid[pellet.index] = POWERPELLET_TILE
+            else:
+                self.grid[pellet.index] = PELLET_TILE
+            pellet.show = True
+        self.remaining = len(self.pellet_list)
+
+    def snapshot(self):
+        '''
+        Returns which pellets are eaten
+
+        Returns
+        -------
+        tuple
+            A copy of the grid as bytes and the amount of remaining pellets
+        '''
+        return bytes(self.grid), self.remaining
+
+    def restore(self, state):
+        '''
+        Returns to a state created by snapshot. The grid is changed in place, so views of it
+        stay valid
+
+        Parameters
+        ----------
+        state : tuple
+            The state
+        '''
+        grid, self.remaining = state
+        self.grid[:] = grid
+        for pellet in self.pellet_list:
+            pellet.show = self.grid[pellet.index] != EMPTY_TILE
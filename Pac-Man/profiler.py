@@ -0,0 +1,244 @@
+'''
+Contains the FrameProfiler class, which measures the time spent in each part of a frame of
+the GameController and shows it in an overlay or writes it to a trace file
+'''
+import json
+import time
+import numpy as np
+import pygame as pg
+from settings import *
+from text import load_font
+
+#the timed parts of a frame, as (name, path of the object from the GameController, method)
+SECTIONS = [
+    ("pacman.update", ("sim", "pacman"), "update"),
+    ("check_pellet_collision", ("sim",), "check_pellet_collision"),
+    ("ghosts.update", ("sim", "ghosts"), "update"),
+    ("ghosts.check_events", ("sim", "ghosts"), "check_events"),
+    ("text.update", ("text",), "update"),
+    ("render", (), "render")
+]
+#index of the whole frame, GameController.update, in the timings
+FRAME = len(SECTIONS)
+NAMES = [name for name, _, _ in SECTIONS] + ["frame"]
+BUDGET_MS = 1000 / FPS
+
+OVERLAY_SIZE = 8
+OVERLAY_LINE = 12
+OVERLAY_POSITION = (4, 4)
+#frames between two updates of the overlay text
+OVERLAY_INTERVAL = 30
+
+
+class FrameProfiler():
+    '''
+    Records how long each of SECTIONS takes in every frame into ring buffers. The methods are
+    only wrapped while the profiler is attached, so the game runs without any overhead
+    otherwise. Sections called several times in a frame, e.g. once per tick, are summed up
+
+    Parameters
+    ----------
+    frames : int
+        The amount of frames kept
+    events : int
+        The amount of single calls kept for the trace
+
+    Attributes
+    ----------
+    timings : numpy.ndarray
+        Nanoseconds spent in every section and in the whole frame, one row per frame
+    count : int
+        The amount of frames recorded so far
+    show : bool
+        Whether the overlay is shown
+
+    Methods
+    -------
+    attach(game)
+        Starts timing the sections of a GameController
+    detach()
+        Stops timing
+    percentiles(percent)
+        Returns a percentile of the time of every section
+    summary()
+        Returns p50, p99 and the maximum of every section
+    render(screen)
+        Draws the overlay
+    export_trace(path)
+        Writes the recorded calls to a trace file
+    '''
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, frames=600, events=16384):
+        self.timings = np.zeros((frames, len(NAMES)), dtype=np.int64)
+        self.current = [0] * len(NAMES)
+        self.count = 0
+        self.event_section = np.zeros(events, dtype=np.int8)
+        self.event_start = np.zeros(events, dtype=np.int64)
+        self.event_duration = np.zeros(events, dtype=np.int64)
+        self.event_count = 0
+        self.wrapped = []
+        self.show = False
+        self.overlay = None
+
+    def attach(self, game):
+        '''
+        Starts timing the sections of a GameController, by replacing their methods on the
+        objects of this game with timed ones
+
+        Parameters
+        ----------
+        game : GameController
+            The game
+        '''
+        self.detach()
+        for index, (_, path, method) in enumerate(SECTIONS):
+            target = game
+            for name in path:
+                target = getattr(target, name)
+            self.wrap(target, method, index)
+        self.wrap(game, "update", FRAME)
+
+    def wrap(self, target, method, index):
+        func = getattr(target, method)
+        record = self.record
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(index, start, clock() - start)
+        setattr(target, method, timed)
+        self.wrapped.append((target, method))
+
+    def detach(self):
+        '''
+        Stops timing, the original methods are used again
+        '''
+        for target, method in self.wrapped:
+            delattr(target, method)
+        self.wrapped = []
+
+    def record(self, index, start, duration):
+        '''
+        Adds a call of a section to the current frame, the whole frame ends it
+        '''
+        event = self.event_count % len(self.event_start)
+        self.event_section[event] = index
+        self.event_start[event] = start
+        self.event_duration[event] = duration
+        self.event_count += 1
+        current = self.current
+        current[index] += duration
+        if index == FRAME:
+            self.timings[self.count % len(self.timings)] = current
+            self.count += 1
+            for i in range(len(current)):
+                current[i] = 0
+
+    def recorded(self):
+        '''
+        Returns
+        -------
+        numpy.ndarray
+            The rows of timings which hold recorded frames
+        '''
+        return self.timings[:min(self.count, len(self.timings))]
+
+    def percentiles(self, percent):
+        '''
+        Parameters
+        ----------
+        percent : float
+            The percentile, e.g. 50 for the median
+
+        Returns
+        -------
+        numpy.ndarray
+            The percentile of every section and of the whole frame in milliseconds, in the
+            order of NAMES
+        '''
+        if not self.count:
+            return np.zeros(len(NAMES))
+        return np.percentile(self.recorded(), percent, axis=0) / 1e6
+
+    def summary(self):
+        '''
+        Returns
+        -------
+        dict
+            p50, p99 and the maximum in milliseconds of every section, as well as the amount
+            of frames recorded and how many of them took longer than 1 / FPS
+        '''
+        p50 = self.percentiles(50)
+        p99 = self.percentiles(99)
+        recorded = self.recorded()
+        peak = recorded.max(axis=0) / 1e6 if self.count else np.zeros(len(NAMES))
+        return {
+            "frames": len(recorded),
+            "over_budget": int((recorded[:, FRAME] > BUDGET_MS * 1e6).sum()),
+            "sections": {
+                name: {"p50_ms": p50[i], "p99_ms": p99[i], "max_ms": peak[i]}
+                for i, name in enumerate(NAMES)
+            }
+        }
+
+    def render(self, screen):
+        '''
+        Draws p50 and p99 of every section in the top left corner. The text is only created
+        again every OVERLAY_INTERVAL frames
+
+        Returns
+        -------
+        list
+            The rect drawn on
+        '''
+        if self.overlay is None or self.count % OVERLAY_INTERVAL == 0:
+            self.overlay = self.create_overlay()
+        return [screen.blit(self.overlay, OVERLAY_POSITION)]
+
+    def create_overlay(self):
+        font = load_font(OVERLAY_SIZE)
+        p50 = self.percentiles(50)
+        p99 = self.percentiles(99)
+        lines = ["{:<22} p50   p99".format("ms")]
+        for i, name in enumerate(NAMES):
+            lines.append("{:<22}{:>5.2f} {:>5.2f}".format(name, p50[i], p99[i]))
+        width = max(font.size(line)[0] for line in lines)
+        overlay = pg.Surface((width + 8, len(lines) * OVERLAY_LINE + 4))
+        overlay.fill(BLACK)
+        for row, line in enumerate(lines):
+            color = WHITE
+            if row == len(lines) - 1 and p99[FRAME] > BUDGET_MS:
+                color = RED
+            overlay.blit(font.render(line, False, color), (4, 4 + row * OVERLAY_LINE))
+        return overlay
+
+    def export_trace(self, path):
+        '''
+        Writes the recorded calls as a trace in the Trace Event Format, which can be opened
+        with chrome://tracing or Perfetto
+
+        Parameters
+        ----------
+        path : string
+            The path of the file
+        '''
+        size = len(self.event_start)
+        first = max(0, self.event_count - size)
+        events = []
+        for count in range(first, self.event_count):
+            event = count % size
+            events.append({
+                "name": NAMES[self.event_section[event]],
+                "ph": "X",
+                "ts": int(self.event_start[event]) / 1e3,
+                "dur": int(self.event_duration[event]) / 1e3,
+                "pid": 0,
+                "tid": 0
+            })
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -0,0 +1,226 @@
+'''
+Contains the Replay class, which stores the input of every tick of a game together with the
+seed of its random numbers, and the input sources used to record and play back replays
+
+Usage: python replay.py FILE
+    Plays a replay headless at maximum speed and prints the result as JSON
+'''
+import json
+import os
+import random
+import struct
+import sys
+import time
+
+#keep stdout free for the results
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from simulation import Simulation
+from maze_graph import DIRECTIONS, NO_ACTION
+
+#actions are stored as indices into ACTIONS, in the same order as the direction indices of maze_graph
+ACTIONS = DIRECTIONS + [None]
+ACTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+
+#file layout: header followed by runs of equal actions, all little endian
+MAGIC = b"PMRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBqI")
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+
+
+class ReplayError(Exception):
+    '''
+    Raised if a replay file can not be read
+    '''
+
+
+class Replay():
+    '''
+    The input of every tick of a game and the seed of its random numbers. In files, ticks
+    with the same input are stored as one run of 3 bytes, so a whole game takes a few kilobytes
+
+    Parameters
+    ----------
+    seed : int
+        The seed of the random numbers of the game
+    actions : bytearray
+        Index into ACTIONS for every tick
+
+    Methods
+    -------
+    append(direction)
+        Adds the input of the next tick
+    save(path)
+        Writes the replay to a file
+    load(path)
+        Reads a replay from a file
+    '''
+    def __init__(self, seed, actions=None):
+        self.seed = seed
+        self.actions = bytearray() if actions is None else actions
+
+    def __len__(self):
+        return len(self.actions)
+
+    def append(self, direction):
+        '''
+        Adds the input of the next tick
+
+        Parameters
+        ----------
+        direction : Vector2
+            UP, LEFT, DOWN, RIGHT or None
+        '''
+        if direction is None:
+            self.actions.append(NO_ACTION)
+        else:
+            self.actions.append(ACTION_INDEX[direction])
+
+    def save(self, path):
+        '''
+        Writes the replay to a file
+
+        Parameters
+        ----------
+        path : string
+            The path of the file
+        '''
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, len(self.actions)))
+        start = 0
+        while start < len(self.actions):
+            action = self.actions[start]
+            end = start + 1
+            while end < len(self.actions) and self.actions[end] == action and end - start < MAX_RUN:
+                end += 1
+            data += RUN.pack(action, end - start)
+            start = end
+        with open(path, "wb") as file:
+            file.write(data)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Reads a replay from a file
+
+        Parameters
+        ----------
+        path : string
+            The path of the file
+
+        Returns
+        -------
+        Replay
+            The replay
+        '''
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ReplayError("Not a replay file: " + str(path))
+        magic, version, seed, ticks = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("Not a replay file: " + str(path))
+        if version != VERSION:
+            raise ReplayError("Unsupported replay version: " + str(version))
+        actions = bytearray()
+        for action, length in RUN.iter_unpack(data[HEADER.size:]):
+            if action >= len(ACTIONS):
+                raise ReplayError("Invalid action in replay: " + str(action))
+            actions += bytes((action,)) * length
+        if len(actions) != ticks:
+            raise ReplayError("Replay is incomplete: " + str(path))
+        return cls(seed, actions)
+
+
+class Recorder():
+    '''
+    Input source which passes on the input of another source and records it
+
+    Parameters
+    ----------
+    source : callable
+        Returns the input of the next tick
+    seed : int
+        The seed of the random numbers of the recorded game
+    '''
+    def __init__(self, source, seed):
+        self.source = source
+        self.replay = Replay(seed)
+
+    def __call__(self):
+        direction = self.source()
+        self.replay.append(direction)
+        return direction
+
+
+class ReplayInput():
+    '''
+    Input source which plays back a replay, after its end there is no more input
+
+    Parameters
+    ----------
+    replay : Replay
+        The replay to play back
+    '''
+    def __init__(self, replay):
+        self.replay = replay
+        self.tick = 0
+
+    @property
+    def finished(self):
+        return self.tick >= len(self.replay)
+
+    def __call__(self):
+        if self.finished:
+            return None
+        direction = ACTIONS[self.replay.actions[self.tick]]
+        self.tick += 1
+        return direction
+
+
+def new_seed():
+    '''
+    Returns
+    -------
+    int
+        A random seed for a new game
+    '''
+    return random.SystemRandom().getrandbits(63)
+
+
+def play(replay):
+    '''
+    Plays a replay headless at maximum speed
+
+    Parameters
+    ----------
+    replay : Replay
+        The replay to play
+
+    Returns
+    -------
+    Simulation
+        The game after the last tick of the replay
+    '''
+    sim = Simulation(seed=replay.seed)
+    for action in replay.actions:
+        sim.step(ACTIONS[action])
+    return sim
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__.strip().splitlines()[-2].strip())
+        sys.exit(2)
+    start = time.perf_counter()
+    sim = play(Replay.load(sys.argv[1]))
+    json.dump({
+        "ticks": sim.ticks,
+        "seconds": time.perf_counter() - start,
+        "score": sim.score,
+        "level": sim.level,
+        "lives": sim.pacman.lives,
+        "gameover": sim.gameover
+    }, sys.stdout, indent=2)
+    print()
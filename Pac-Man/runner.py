@@ -0,0 +1,226 @@
+'''
+Contains run_episodes, which plays many headless games with a bot in a pool of worker
+processes and streams the result of every game back in batches
+
+Usage: python runner.py [--episodes N] [--workers N] [--batch N] [--seed N] [--max-ticks N]
+                        [--policy MODULE:NAME] [--output FILE]
+    Writes one JSON line per game to FILE and prints a summary as JSON
+'''
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+#keep stdout free for the results
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from settings import *
+from simulation import *
+from maze_graph import MazeGraph
+
+#the values reported for every game, in the order of the result tuples
+RESULT_FIELDS = ('seed', 'score', 'level', 'pellets_eaten', 'deaths', 'ticks', 'truncated')
+
+
+class RandomPolicy():
+    '''
+    Bot which takes a random direction every 30 ticks, the same for the same seed
+
+    Parameters
+    ----------
+    graph : MazeGraph
+        The graph of the maze, not used by this bot
+    '''
+    def __init__(self, graph):
+        self.random = random.Random()
+        self.direction = LEFT
+
+    def reset(self, seed):
+        '''
+        Prepares the bot for a new game
+
+        Parameters
+        ----------
+        seed : int
+            The seed of the game
+        '''
+        self.random.seed(seed)
+        self.direction = LEFT
+
+    def __call__(self, sim):
+        if sim.ticks % 30 == 0:
+            self.direction = self.random.choice([UP, LEFT, DOWN, RIGHT])
+        return self.direction
+
+
+class Worker():
+    '''
+    Plays games in a worker process. The Simulation and the MazeGraph are built once, when
+    the process starts, every game after that reuses them
+
+    Parameters
+    ----------
+    policy : callable
+        Called with the MazeGraph, returns the bot. The bot is called with the Simulation
+        every tick and returns the direction Pac-Man should take, before every game its
+        reset method is called with the seed of the game
+    max_ticks : int
+        Ticks after which a game is stopped, None for no limit
+
+    Methods
+    -------
+    play(seed)
+        Plays one game and returns its result
+    '''
+    def __init__(self, policy, max_ticks):
+        self.sim = Simulation()
+        self.graph = MazeGraph(self.sim.map)
+        self.bot = policy(self.graph)
+        self.max_ticks = max_ticks
+
+    def play(self, seed):
+        '''
+        Plays one game
+
+        Parameters
+        ----------
+        seed : int
+            The seed of the game
+
+        Returns
+        -------
+        tuple
+            The values of RESULT_FIELDS
+        '''
+        sim = self.sim
+        bot = self.bot
+        sim.new_game(seed)
+        bot.reset(seed)
+        pellets = 0
+        deaths = 0
+        max_ticks = self.max_ticks
+        while not sim.gameover and (max_ticks is None or sim.ticks < max_ticks):
+            for event, _, _ in sim.step(bot(sim)):
+                if event == PELLET_EATEN or event == POWER_PELLET_EATEN:
+                    pellets += 1
+                elif event == DEATH:
+                    deaths += 1
+        return seed, sim.score, sim.level, pellets, deaths, sim.ticks, not sim.gameover
+
+
+#the Worker of this process, created by start_worker
+WORKER = None
+
+
+def start_worker(policy, max_ticks):
+    '''
+    Initialiser of the worker processes
+    '''
+    global WORKER
+    WORKER = Worker(policy, max_ticks)
+
+
+def play_batch(seeds):
+    '''
+    Plays one game per seed in a worker process
+
+    Returns
+    -------
+    list
+        The result tuple of every game
+    '''
+    return [WORKER.play(seed) for seed in seeds]
+
+
+def run_episodes(episodes, seed=0, policy=RandomPolicy, workers=None, batch=64, max_ticks=None):
+    '''
+    Plays games in a pool of worker processes. Every worker receives batches of seeds, so
+    there is only one message per batch and not one per game. Results of a batch are yielded
+    as soon as it is done, so they come in the order in which the batches finish
+
+    Parameters
+    ----------
+    episodes : int
+        The amount of games
+    seed : int
+        Seed of the first game, every following game uses the next one
+    policy : callable
+        Creates the bot, see Worker. It is sent to the workers, so it has to be defined at
+        the top level of a module
+    workers : int
+        The amount of worker processes, one per CPU if None
+    batch : int
+        The amount of games per batch
+    max_ticks : int
+        Ticks after which a game is stopped, None for no limit
+
+    Yields
+    ------
+    list
+        The result tuples of a batch, with the values of RESULT_FIELDS
+    '''
+    workers = workers or os.cpu_count() or 1
+    batches = (range(start, min(start + batch, seed + episodes)) for start in range(seed, seed + episodes, batch))
+    with ProcessPoolExecutor(workers, initializer=start_worker, initargs=(policy, max_ticks)) as pool:
+        #keep a few batches per worker queued, so no worker waits for the next one
+        pending = set()
+        for seeds in batches:
+            pending.add(pool.submit(play_batch, seeds))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+def load_policy(name):
+    '''
+    Returns the bot factory named MODULE:NAME
+    '''
+    module, _, attribute = name.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Plays headless games with a bot in worker processes")
+    parser.add_argument("--episodes", type=int, default=100, help="games to play")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per CPU if omitted")
+    parser.add_argument("--batch", type=int, default=16, help="games per batch")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-ticks", type=int, default=None, help="ticks after which a game is stopped")
+    parser.add_argument("--policy", default="runner:RandomPolicy", help="bot factory as MODULE:NAME")
+    parser.add_argument("--output", default=None, help="JSON lines file with the result of every game")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    games = 0
+    ticks = 0
+    scores = 0
+    start = time.perf_counter()
+    with open(args.output, "w") if args.output else contextlib.nullcontext() as output:
+        for results in run_episodes(args.episodes, args.seed, load_policy(args.policy), args.workers,
+                                    args.batch, args.max_ticks):
+            for result in results:
+                games += 1
+                ticks += result[5]
+                scores += result[1]
+                if output:
+                    output.write(json.dumps(dict(zip(RESULT_FIELDS, result))) + "\n")
+    seconds = time.perf_counter() - start
+    json.dump({
+        "episodes": games,
+        "workers": args.workers or os.cpu_count(),
+        "seconds": seconds,
+        "episodes_per_second": games / seconds,
+        "ticks_per_second": ticks / seconds,
+        "mean_score": scores / games if games else None
+    }, sys.stdout, indent=2)
+    print()
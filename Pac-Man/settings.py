@@ -4,7 +4,7 @@ Stores all settings
 #path
 import os
 
-from vectors import Vector2
+from vectors import Vector2, FrozenVector2
 
 PATH = os.path.abspath(__file__)[:-12]
 
@@ -18,6 +18,9 @@ SHEIGHT = GRIDROWS*TILEHEIGHT
 SCREENSIZE = (SWIDTH, SHEIGHT)
 FPS = 60
 
+#simulation settings, every step of the game advances it by one tick of DELTATIME seconds
+DELTATIME = 1 / FPS
+
 #colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -28,9 +31,9 @@ TEAL = (100, 255, 255)
 ORANGE = (230, 190, 40)
 TRANSPARENT = (255, 0, 255)
 
-#vectors
-UP = Vector2(0, -1)
-DOWN = Vector2(0, 1)
-LEFT = Vector2(-1, 0)
-RIGHT = Vector2(1, 0)
-STOP = Vector2()
+#vectors, the directions are immutable and can be compared by identity
+UP = FrozenVector2(0, -1)
+DOWN = FrozenVector2(0, 1)
+LEFT = FrozenVector2(-1, 0)
+RIGHT = FrozenVector2(1, 0)
+STOP = FrozenVector2()
@@ -0,0 +1,475 @@
+'''
+Contains the Simulation class, which runs the game logic without a window, mixer or any waits
+'''
+import math
+import random
+from settings import *
+from map_script import Map
+from pacman import Pacman
+from pellets import AllPellets
+from ghosts import AllGhosts
+from fruit import Fruit
+
+#events returned by Simulation.step, each as a tuple of (event, points, position), where position
+#is where the event happened or None
+PELLET_EATEN = "pellet_eaten"
+POWER_PELLET_EATEN = "power_pellet_eaten"
+POWER_PELLET_OVER = "power_pellet_over"
+GHOST_EATEN = "ghost_eaten"
+FRUIT_EATEN = "fruit_eaten"
+DEATH = "death"
+LEVEL_COMPLETE = "level_complete"
+GAME_OVER = "game_over"
+
+
+class Simulation():
+    '''
+    Holds the complete game state and advances it by single steps. Nothing in here opens a
+    window, plays a sound or waits, so it can be used for headless runs as well as by the
+    GameController, which renders it
+
+    Parameters
+    ----------
+    headless : bool
+        If True, the level is reset right after a death or a cleared level. Otherwise the
+        simulation waits until reset() is called, so the caller can show the transitions
+    seed : int
+        Seed of the random numbers of the game, a random one is used if it is None. Every
+        Simulation has its own random numbers, so games with the same seed and the same
+        actions are the same, no matter how many other games run in the same process
+
+    Attributes
+    ----------
+    map : Map
+        The Map class object
+    pellets : AllPellets
+        All pellets on the map
+    pacman : Pacman
+        The Pacman class object
+    ghosts : AllGhosts
+        All four ghosts
+    fruit : Fruit
+        The bonus fruit
+    rng : random.Random
+        The random numbers of the game, shared by the ghosts and the fruit
+    score : int
+        The current score
+    highscore : int
+        The highest score reached so far
+    level : int
+        The current level
+    pellets_eaten : int
+        The amount of pellets eaten in the current level
+    release_after_pellets : list
+        The amounts of eaten pellets after which the next ghost is released
+    cruising : int
+        The amount of eaten pellets after which Blinky speeds up, False once he did
+    ticks : int
+        The amount of ticks the game has been running, used to spawn the fruit
+    waiting : bool
+        True after a death or a cleared level until the level has been reset
+    gameover : bool
+        Indicates whether a game over has ocurred
+    events : list
+        Tuples of (event, points, position) which happened during the last step
+    start_state : tuple
+        The snapshot of the game before the first step, used by new_game
+
+    Methods
+    -------
+    step(action)
+        Advances the game by one tick and returns the events of the tick
+    advance(action, max_ticks)
+        Advances the game by several ticks with the same action, until something happens
+    quiet_ticks(action, limit)
+        Returns for how many ticks nothing would happen but Pac-Man and the ghosts moving on
+    skip(action, ticks)
+        Advances the game by ticks found by quiet_ticks
+    finish_step()
+        Updates the highscore and resets the level right away when running headless
+    reset()
+        Resets the level(Pac-Man, Ghosts and, if all are eaten, Pellets)
+    check_pellet_collision()
+        Checks for collisions between Pac-Man and pellets
+    check_fruit_events()
+        Spawns, despawns and collects the fruit
+    fruit_visible()
+        Checks whether the fruit is currently on the map
+    check_death()
+        Handels Pac-Man's death
+    new_game(seed)
+        Starts a new game with the same objects
+    snapshot()
+        Returns the complete state of the game
+    restore(state)
+        Returns to a state created by snapshot
+    '''
+
+    # pylint: disable=too-many-instance-attributes
+
+    #attributes which are part of a snapshot next to release_after_pellets and the game objects
+    STATE = ('score', 'highscore', 'level', 'pellets_eaten', 'cruising', 'ticks', 'waiting', 'gameover')
+
+    def __init__(self, headless=True, seed=None):
+        self.headless = headless
+        self.rng = random.Random(seed)
+        self.map = Map()
+        self.pellets = AllPellets()
+        self.pacman = Pacman(self.map)
+        self.ghosts = AllGhosts(self.map, self.pacman, self.rng)
+        self.fruit = Fruit(self.map, rng=self.rng)
+        self.score = 0
+        self.highscore = 0
+        self.level = 1
+        self.pellets_eaten = 0
+        self.release_after_pellets = [0, 30, 60]
+        self.cruising = 60
+        self.ticks = 0
+        self.waiting = False
+        self.gameover = False
+        self.events = []
+        self.start_state = self.snapshot()
+
+    def new_game(self, seed=None):
+        '''
+        Starts a new game, which is the same as the game of a new Simulation with this seed.
+        No map or sprite is loaded again, which makes playing many games in a row cheaper
+
+        Parameters
+        ----------
+        seed : int
+            Seed of the random numbers of the new game, a random one is used if it is None
+        '''
+        self.restore(self.start_state)
+        self.rng.seed(seed)
+        self.fruit.reset()
+
+    def step(self, action=None, frames=1):
+        '''
+        Advances the game by a tick of frames times DELTATIME seconds. The wall clock is never read, so
+        the same actions always lead to the same game, no matter how fast it is stepped.
+        A coarse tick of several frames moves Pac-Man and the ghosts as far as these frames
+        would, and the pellets and ghosts they pass on their way are checked along it, which
+        costs about as much as a single frame
+
+        Parameters
+        ----------
+        action : Vector2
+            The direction Pac-Man should take, None if no input was given
+        frames : int
+            The amount of frames of DELTATIME seconds in the tick
+
+        Returns
+        -------
+        list
+            Tuples of (event, points, position) which happened during this tick
+        '''
+        self.events = []
+        if self.waiting or self.gameover:
+            return self.events
+
+        self.ticks += frames
+        self.pacman.update(DELTATIME * frames, self.map, action)
+        self.check_pellet_collision(frames)
+        if self.waiting:
+            self.finish_step()
+            return self.events
+
+        self.check_fruit_events(frames)
+        if self.ghosts.update(DELTATIME * frames, self.pacman):
+            self.events.append((POWER_PELLET_OVER, 0, None))
+        ghost_events = self.ghosts.check_events(self.pacman, self.pellets_eaten, self.release_after_pellets)
+
+        if self.cruising and self.pellets_eaten >= self.cruising:
+            self.ghosts.cruising()
+            self.cruising = False
+
+        if ghost_events == 3:
+            self.release_after_pellets.pop(0)
+
+        elif ghost_events == 2:
+            self.check_death()
+
+        elif ghost_events == 1:
+            ghost_points = int(self.ghosts.get_points())
+            self.score += ghost_points
+            self.events.append((GHOST_EATEN, ghost_points, Vector2(*self.pacman.position.as_tuple())))
+
+        self.finish_step()
+        return self.events
+
+    def advance(self, action=None, max_ticks=FPS):
+        '''
+        Advances the game like calling step with the same action until a tick has events or
+        max_ticks ticks have passed. Stretches of ticks in which Pac-Man and the ghosts only
+        move on, see quiet_ticks, are skipped without any of the checks of step, so a long run
+        through an empty corridor costs a fraction of the ticks it takes. The game is exactly
+        the same as with step, which makes this the cheaper choice for headless runs with
+        bots that keep their action for a while
+
+        Parameters
+        ----------
+        action : Vector2
+            The direction Pac-Man should take, None if no input is given
+        max_ticks : int
+            The most ticks to advance
+
+        Returns
+        -------
+        list
+            Tuples of (event, points, position) which happened during the last tick, the
+            amount of ticks advanced is the change of ticks
+        '''
+        end = self.ticks + max_ticks
+        self.events = []
+        while self.ticks < end and not self.events and not self.waiting and not self.gameover:
+            quiet = self.quiet_ticks(action, end - self.ticks - 1)
+            if quiet:
+                self.skip(action, quiet)
+            self.step(action)
+        return self.events
+
+    def quiet_ticks(self, action, limit):
+        '''
+        Returns for how many of the next ticks nothing would happen but Pac-Man and the ghosts
+        moving on: Pac-Man reaches no decision on a node and no tunnel, no pellet, fruit or
+        ghost gets into his range, no ghost is released and no timer runs out. The ghosts
+        decide as usual in these ticks. Collisions are ruled out by the distance the ghosts and
+        Pac-Man can cover, everything else is predicted exactly
+
+        Parameters
+        ----------
+        action : Vector2
+            The direction Pac-Man should take, None if no input is given
+        limit : int
+            The most ticks which are looked at
+
+        Returns
+        -------
+        int
+            The amount of ticks, 0 if the next tick has to be stepped
+        '''
+        ghosts = self.ghosts
+        pacman = self.pacman
+        if self.waiting or self.gameover or not ghosts.rend or \
+                (self.release_after_pellets and self.release_after_pellets[0] <= self.pellets_eaten) or \
+                (self.cruising and self.pellets_eaten >= self.cruising):
+            return 0
+
+        #the mode timers, see AllGhosts.update
+        if ghosts.frightened_timer is not None:
+            limit = min(limit, ghosts.frightened_timer + 6 * FPS - 1 - ghosts.ticks)
+        elif not ghosts.chase_only or ghosts.current_mode == 1:
+            limit = min(limit, ghosts.chase_timer + ghosts.chase_time - 1 - ghosts.ticks)
+
+        #the fruit, see check_fruit_events
+        reach = pacman.speed * DELTATIME
+        if self.ticks < 10 * FPS:
+            limit = min(limit, 10 * FPS - 1 - self.ticks)
+        elif not self.fruit.delete:
+            distance = (pacman.position - self.fruit.position).magnitude()
+            limit = min(limit, math.ceil(self.fruit.display_length * FPS - self.fruit.timer) - 1,
+                        int((distance - 16 - 2) / reach))
+
+        #collisions, with a margin for the centering on tiles. Releasing ghosts speed up to at
+        #most 90 and eaten ghosts only become dangerous again inside the ghost house
+        for ghost in ghosts:
+            if ghost.mode < 3:
+                distance = (ghost.position - pacman.position).magnitude()
+                speed = max(ghost.speed, 90) * DELTATIME
+                limit = min(limit, int((distance - ghost.radius - 2) / (reach + speed)))
+
+        limit = pacman.quiet_ticks(action, self.map, self.pellets, limit)
+        for ghost in ghosts:
+            limit = ghost.quiet_ticks(limit)
+        return max(limit, 0)
+
+    def skip(self, action, ticks):
+        '''
+        Advances the game by ticks found by quiet_ticks, in which only Pac-Man and the ghosts
+        move, the ghosts decide on nodes and all animations go on. Only the ticks in which a
+        ghost passes a tile are updated, the stretches between them are done at once
+
+        Parameters
+        ----------
+        action : Vector2
+            The direction Pac-Man should take, None if no input is given
+        ticks : int
+            The amount of ticks, at most what quiet_ticks returned
+        '''
+        pacman = self.pacman
+        ghosts = self.ghosts.ghosts
+        #the positions are summed up once for every tick, the ghosts only need update in
+        #the ticks in which they pass a tile and decide, in the order of step
+        path = pacman.path(ticks, DELTATIME)
+        done = [0] * len(ghosts)
+        plans = [ghost.plan(ticks, DELTATIME) for ghost in ghosts]
+        while True:
+            tick, index = min((done[i] + len(plans[i]) + 1, i) for i in range(len(ghosts)))
+            if tick > ticks:
+                break
+            pacman.position.x, pacman.position.y = path[tick - 1]
+            for i, ghost in enumerate(ghosts[:index + 1]):
+                ghost.glide(plans[i], tick - 1 - done[i] + (i < index), DELTATIME)
+                if i == index:
+                    ghost.update(DELTATIME, pacman)
+                done[i] = tick
+                plans[i] = ghost.plan(ticks - tick, DELTATIME)
+        for i, ghost in enumerate(ghosts):
+            ghost.glide(plans[i], ticks - done[i], DELTATIME)
+        pacman.glide(action, path[-1], ticks, DELTATIME)
+        if self.fruit_visible():
+            self.fruit.timer += ticks
+        self.ticks += ticks
+        self.ghosts.ticks += ticks
+
+    def snapshot(self):
+        '''
+        Returns the complete state of the game: Pac-Man, the ghosts and their mode timers, the
+        pellets, the fruit, the score, the level and the state of the random numbers. It is
+        made of tuples, numbers, bytes and vectors only, so it is cheap to keep many of them
+        and can be pickled
+
+        Returns
+        -------
+        tuple
+            The state, which can be given to restore
+        '''
+        return (
+            tuple(getattr(self, name) for name in self.STATE),
+            tuple(self.release_after_pellets),
+            self.pacman.snapshot(),
+            self.ghosts.snapshot(),
+            self.pellets.snapshot(),
+            self.fruit.snapshot(),
+            self.rng.getstate()
+        )
+
+    def restore(self, state):
+        '''
+        Returns to a state created by snapshot. All objects are kept and no sprites are loaded,
+        so a restore only takes microseconds
+
+        Parameters
+        ----------
+        state : tuple
+            The state
+        '''
+        values, release_after_pellets, pacman, ghosts, pellets, fruit, rng = state
+        for name, value in zip(self.STATE, values):
+            setattr(self, name, value)
+        self.release_after_pellets = list(release_after_pellets)
+        self.pacman.restore(pacman)
+        self.ghosts.restore(ghosts)
+        self.pellets.restore(pellets)
+        self.fruit.restore(fruit)
+        self.rng.setstate(rng)
+        self.events = []
+
+    def finish_step(self):
+        '''
+        Updates the highscore and resets the level right away when running headless
+        '''
+        if self.highscore < self.score:
+            self.highscore = self.score
+        if self.headless and self.waiting and not self.gameover:
+            self.reset()
+
+    def reset(self):
+        '''
+        Resets the level(Pac-Man, Ghosts and, if all are eaten, Pellets)
+        '''
+        self.pacman.reset_self()
+        self.ghosts.reset()
+        if self.pellets.isEmpty():
+            self.pellets_eaten = 0
+            self.pellets.reset()
+        self.release_after_pellets = [0 + self.pellets_eaten, 10 + self.pellets_eaten, 20 + self.pellets_eaten]
+        self.cruising = 60 + self.pellets_eaten
+        self.waiting = False
+
+    def check_pellet_collision(self, frames=1):
+        '''
+        Checks for collisions between Pac-Man and all the pellets on the map, in a tick of
+        several frames with all pellets he passed on his way
+
+        Parameters
+        ----------
+        frames : int
+            The amount of frames of the last tick
+        '''
+        if frames > 1:
+            pellets = self.pacman.eat_pellets(self.pellets)
+        else:
+            pellet = self.pacman.eat_pellet(self.pellets)
+            pellets = [pellet] if pellet else []
+        for pellet in pellets:
+            self.pellets_eaten += 1
+
+            #Amount of times, eating animation is played
+            self.pacman.pellet_anim = 2
+
+            #stop Pac-Man's movement for 1 frame or 16,67ms when a pellet is eaten, a tick of
+            #several frames already rested on the way, see Pacman.eat_pellets
+            if frames == 1:
+                self.pacman.stop_frame = True
+
+            #Increases current score by pellet.points or powerpellet.points amount
+            self.score += pellet.points
+
+            #removes eaten pellets from the pellet grid
+            self.pellets.remove(pellet)
+
+            if pellet.name == "PowerPellet":
+                self.ghosts.power_pellet()
+                self.events.append((POWER_PELLET_EATEN, pellet.points, pellet.position))
+            else:
+                self.events.append((PELLET_EATEN, pellet.points, pellet.position))
+
+        #checks if the list of all uneaten pellets is empty
+        if self.pellets.isEmpty():
+            self.level += 1
+            self.waiting = True
+            self.events.append((LEVEL_COMPLETE, 0, None))
+
+    def check_fruit_events(self, frames=1):
+        '''
+        Shows the fruit after 10 seconds and checks whether Pac-Man eats it, in a tick of
+        several frames anywhere on his way
+
+        Parameters
+        ----------
+        frames : int
+            The amount of frames of the last tick
+        '''
+        if self.fruit_visible():
+            self.fruit.update(frames)
+            if frames > 1:
+                eaten = self.pacman.passes(self.fruit.position, 16)
+            else:
+                eaten = (self.pacman.position - self.fruit.position).magnitude_squared() < 16 ** 2
+            if eaten:
+                self.score += self.fruit.points
+                self.fruit.delete = True
+                self.events.append((FRUIT_EATEN, self.fruit.points, self.fruit.position))
+
+    def fruit_visible(self):
+        '''
+        Returns
+        -------
+        bool
+            True if the fruit is currently on the map
+        '''
+        return self.ticks >= 10 * FPS and not self.fruit.delete
+
+    def check_death(self):
+        '''
+        Handels Pac-Man's death
+        '''
+        self.pacman.live_lost()
+        self.waiting = True
+        self.events.append((DEATH, 0, Vector2(*self.pacman.position.as_tuple())))
+
+        if self.pacman.lives == 0:
+            self.gameover = True
+            self.events.append((GAME_OVER, 0, None))
@@ -1,40 +1,133 @@
 import pygame as pg
 from settings import *
 
+SOUND_PATH = os.path.join(PATH, "assets", "sounds")
+#channels 0 to RESERVED_CHANNELS - 1 are only used through play_channel, play_sound picks one of
+#the FREE_CHANNELS others, as many as the mixer had for overlapping sounds before
+RESERVED_CHANNELS = 6
+FREE_CHANNELS = 8
+NUM_CHANNELS = RESERVED_CHANNELS + FREE_CHANNELS
+
+
+class SoundBank():
+    '''
+    Decodes every sound in assets/sounds once and keeps the mixer running for the whole game,
+    so that playing a sound does not read any file
+
+    Attributes
+    ----------
+    sounds : dict
+        The decoded pygame.mixer.Sound of every file name
+    channels : list
+        The reserved pygame.mixer.Channel objects used by play_channel
+    track : string
+        File name of the music which is currently loaded
+
+    Methods
+    -------
+    start()
+        Initialises the mixer and loads all sounds, if that did not happen yet
+    play_channel(name, volume, loops, index)
+        Plays a sound on a certain channel
+    play_sound(name, volume, loops)
+        Plays a sound on any free channel
+    background_music(name, volume)
+        Plays music in an endless loop
+    reset()
+        Stops all sounds and the music
+    '''
+    def __init__(self):
+        self.sounds = {}
+        self.channels = []
+        self.track = None
+
+    def start(self):
+        '''
+        Initialises the mixer and loads all sounds, if that did not happen yet
+        '''
+        if not pg.mixer.get_init():
+            pg.mixer.init()
+            self.channels = []
+            self.sounds = {}
+            self.track = None
+        if not self.channels:
+            pg.mixer.set_num_channels(NUM_CHANNELS)
+            pg.mixer.set_reserved(RESERVED_CHANNELS)
+            self.channels = [pg.mixer.Channel(index) for index in range(RESERVED_CHANNELS)]
+        if not self.sounds:
+            for name in sorted(os.listdir(SOUND_PATH)):
+                if name.endswith(".wav"):
+                    self.sounds[name] = pg.mixer.Sound(os.path.join(SOUND_PATH, name))
+
+    def play_channel(self, name, volume, loops, index):
+        '''
+        Plays a sound on a certain channel, stopping what was played on it before
+
+        Returns
+        -------
+        pygame.mixer.Channel
+            The channel the sound is played on
+        '''
+        channel = self.channels[index]
+        channel.play(self.sounds[name], loops)
+        #the volume belongs to the channel, the shared sound keeps its own
+        channel.set_volume(volume)
+        return channel
+
+    def play_sound(self, name, volume, loops):
+        '''
+        Plays a sound on any free channel which is not reserved
+        '''
+        channel = self.sounds[name].play(loops)
+        if channel:
+            channel.set_volume(volume)
+
+    def background_music(self, name, volume):
+        '''
+        Plays music in an endless loop, the file is only loaded if it changed
+        '''
+        if self.track != name:
+            pg.mixer.music.load(os.path.join(SOUND_PATH, name))
+            self.track = name
+        pg.mixer.music.set_volume(volume)
+        pg.mixer.music.play(-1)
+
+    def reset(self):
+        '''
+        Stops all sounds and the music, the mixer and the loaded sounds are kept
+        '''
+        pg.mixer.stop()
+        pg.mixer.music.stop()
+
+
+#the sound bank shared by the whole game
+BANK = SoundBank()
+
 
 def load_sound(name):
-    return pg.mixer.Sound(os.path.join(PATH, "assets", "sounds", name))
+    BANK.start()
+    return BANK.sounds[name]
 
 def load_track(name):
-    pg.mixer.music.load(os.path.join(PATH, "assets", "sounds", name))
+    pg.mixer.music.load(os.path.join(SOUND_PATH, name))
+    BANK.track = name
 
 
 def background_music(name, volume):
-    load_track(name)
-    pg.mixer.music.set_volume(volume)
-    pg.mixer.music.play(-1)
+    BANK.background_music(name, volume)
 
 def play_channel(name, volume, loops, index):
-    sound = load_sound(name)
-    pg.mixer.Sound.set_volume(sound, volume)
-    channel = pg.mixer.Channel(index)
-    channel.play(sound, loops)
-    return channel
+    return BANK.play_channel(name, volume, loops, index)
 
 
 def play_sound(name, volume, loops):
-    sound = load_sound(name)
-    pg.mixer.Sound.set_volume(sound, volume)   
-    sound.play(loops)
+    BANK.play_sound(name, volume, loops)
 
 def stop(channel):
     channel.stop()
 
 def reset():
-    pg.mixer.quit()
+    BANK.reset()
 
 def start():
-    pg.mixer.init()
-    pg.mixer.set_num_channels(8)
-
-
+    BANK.start()
@@ -0,0 +1,117 @@
+'''
+Contains the SpriteAtlas class, which decodes every image file only once and hands out
+the single sprites of the spritesheets by name
+'''
+import os
+import pygame as pg
+from settings import *
+
+SHEET_PATH = os.path.join(PATH, "assets", "Spritesheets")
+
+
+class SpriteAtlas():
+    '''
+    Cache of all loaded images. Every spritesheet has an index file of the same name with the
+    ending .txt, which lists the file name of each sprite on it together with its rectangle.
+    Sprites on a sheet are handed out as subsurfaces of the sheet, so the whole sheet is decoded
+    once. Images which are not on a sheet(tiles, Black.png) are loaded from their own file, also
+    only once.
+    Images loaded while a display mode is set are converted to the pixel format of the display,
+    which makes blitting them a lot cheaper. Without a display, e.g. in headless simulations,
+    they are kept as they are
+
+    Attributes
+    ----------
+    regions : dict
+        The sheet file and the pygame.Rect of every sprite name
+    images : dict
+        All loaded surfaces, keyed by (folder, file name)
+
+    Methods
+    -------
+    read_index(sheet)
+        Reads the index file of a spritesheet
+    get(name)
+        Returns a sprite from the Sprites folder or a spritesheet
+    load(folder, name)
+        Returns an image from its own file
+    '''
+    def __init__(self):
+        self.regions = {}
+        self.images = {}
+        for file_name in sorted(os.listdir(SHEET_PATH)):
+            if file_name.endswith(".png") and \
+                    os.path.exists(os.path.join(SHEET_PATH, file_name[:-4] + ".txt")):
+                self.read_index(file_name)
+
+    def read_index(self, sheet):
+        '''
+        Reads the index file of a spritesheet, every line holds the name of a sprite followed
+        by its x, y, width and height on the sheet. Lines starting with # are ignored
+
+        Parameters
+        ----------
+        sheet : string
+            File name of the spritesheet
+        '''
+        with open(os.path.join(SHEET_PATH, sheet[:-4] + ".txt"), "r") as index:
+            for line in index:
+                line = line.split()
+                if not line or line[0].startswith("#"):
+                    continue
+                self.regions[line[0]] = (sheet, pg.Rect(*(int(value) for value in line[1:5])))
+
+    def get(self, name):
+        '''
+        Returns a sprite, cut out of its spritesheet if it is on one
+
+        Parameters
+        ----------
+        name : string
+            File name of the sprite in the Sprites folder
+
+        Returns
+        -------
+        pygame.Surface
+            The sprite, which is shared and must not be drawn on
+        '''
+        sprite = self.images.get(("Sprites", name))
+        if sprite is None:
+            region = self.regions.get(name)
+            if region is None:
+                return self.load("Sprites", name)
+            sheet, rect = region
+            sprite = self.load("Spritesheets", sheet).subsurface(rect)
+            self.images[("Sprites", name)] = sprite
+        return sprite
+
+    def load(self, folder, name):
+        '''
+        Returns an image, which is only decoded the first time it is requested
+
+        Parameters
+        ----------
+        folder : string
+            The folder in assets the image is in
+        name : string
+            File name of the image
+
+        Returns
+        -------
+        pygame.Surface
+            The image, which is shared and must not be drawn on
+        '''
+        image = self.images.get((folder, name))
+        if image is None:
+            image = pg.image.load(os.path.join(PATH, "assets", folder, name))
+            if pg.display.get_surface() is not None:
+                if image.get_flags() & pg.SRCALPHA:
+                    image = image.convert_alpha()
+                else:
+                    image = image.convert()
+            self.images[(folder, name)] = image
+        return image
+
+
+#the atlas shared by all sprites of the game
+ATLAS = SpriteAtlas()
@@ -5,6 +5,79 @@ import os
 
 #TODO: Cleansing
 
+FONT_PATH = os.path.join(PATH, "assets", "PressStart2P-vaV7.ttf")
+DIGITS = "0123456789"
+
+#fonts by size and digit glyphs by size and color, shared by all texts
+FONTS = {}
+GLYPHS = {}
+
+
+def load_font(size):
+    '''
+    Returns the font in a certain size, the file is only opened once per size
+    '''
+    font = FONTS.get(size)
+    if font is None:
+        font = FONTS[size] = pg.font.Font(FONT_PATH, size)
+    return font
+
+
+def load_glyphs(size, color):
+    '''
+    Returns the digit glyphs of a size and color, None if numbers can not be put together from
+    single glyphs without changing their look, which is the case if a glyph is wider than the
+    space it takes up
+    '''
+    key = (size, tuple(color))
+    if key not in GLYPHS:
+        font = load_font(size)
+        advance = font.metrics(DIGITS[0])[0][4]
+        fits = all(font.metrics(digit)[0][4] == advance and font.size(digit)[0] == advance
+                   for digit in DIGITS)
+        GLYPHS[key] = GlyphAtlas(font, color, advance) if fits else None
+    return GLYPHS[key]
+
+
+class GlyphAtlas():
+    '''
+    All digits of a font rendered once into a single surface, numbers are drawn by blitting
+    the glyphs one after another
+
+    Parameters
+    ----------
+    font : pygame.font.Font
+        The font of the digits
+    color : tuple
+        The color of the digits
+    advance : int
+        The width of every digit
+    '''
+    def __init__(self, font, color, advance):
+        self.surface = font.render(DIGITS, 1, color)
+        if pg.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        self.advance = advance
+        height = self.surface.get_height()
+        self.areas = {digit: pg.Rect(i * advance, 0, advance, height) for i, digit in enumerate(DIGITS)}
+
+    def render(self, screen, text, position):
+        '''
+        Draws a number
+
+        Returns
+        -------
+        pygame.Rect
+            The rect of the screen which was drawn on
+        '''
+        x, y = position
+        rect = None
+        for i, digit in enumerate(text):
+            drawn = screen.blit(self.surface, (x + i * self.advance, y), self.areas[digit])
+            rect = drawn if rect is None else rect.union(drawn)
+        return rect
+
+
 class Text(object):
     def __init__(self, text, size, color, x, y, show=True):
         self.text = text
@@ -14,17 +87,22 @@ class Text(object):
         self.show = show
         self.font = None
         self.textbox = None
+        self.glyphs = None
         self.total_time = 0
         self.display_length = 0
         self.init_text()
         self.create_textbox()
 
     def init_text(self):
-        path = os.path.join(PATH, "assets", "PressStart2P-vaV7.ttf")
-        self.font = pg.font.Font(path, self.size)
+        self.font = load_font(self.size)
         
-    def create_textbox(self):    
-        self.textbox = self.font.render(self.text, 1, self.color)
+    def create_textbox(self):
+        #numbers are drawn from the glyph atlas, everything else is rendered once
+        self.glyphs = load_glyphs(self.size, self.color) if self.text.isdigit() else None
+        if self.glyphs:
+            self.textbox = None
+        else:
+            self.textbox = self.font.render(self.text, 1, self.color)
         
     def update(self, deltatime):
         if self.display_length > 0:
@@ -35,13 +113,18 @@ class Text(object):
                 self.display_length = 0      
 
     def set_text(self, insert_text_here):
+        if insert_text_here == self.text:
+            return
         self.text = insert_text_here
         self.create_textbox()
 
     def render(self, screen):
         if self.show:
             x, y = self.position.as_tuple()
-            screen.blit(self.textbox, (x, y))
+            if self.glyphs:
+                return [self.glyphs.render(screen, self.text, (x, y))]
+            return [screen.blit(self.textbox, (x, y))]
+        return []
 
 
 class AllText():
@@ -87,8 +170,10 @@ class AllText():
         
     
     def render(self, screen):
+        rects = []
         for key in self.text_list.keys():
-            self.text_list[key].render(screen)
+            rects += self.text_list[key].render(screen)
         
         for item in self.temp_text:
-            item.render(screen)
+            rects += item.render(screen)
+        return rects
@@ -1,5 +1,6 @@
 '''
-Contains the Vector2 class
+Contains the Vector2 class and the immutable FrozenVector2 class used for direction constants,
+as well as closest_on_segment for the swept collision check of the ghosts
 '''
 
 import math
@@ -29,7 +30,11 @@ class Vector2():
         Checks whether given Vector2 and self are parallel
     normalize()
         Returns normalized Vector2
+    copy()
+        Returns a new Vector2 with the same coordinates
     '''
+    __slots__ = ('x', 'y')
+
     def __init__(self, x=0, y=0):
         self.x = x
         self.y = y
@@ -45,6 +50,23 @@ class Vector2():
 
     def __mul__(self, scalar):
         return Vector2(self.x * scalar, self.y * scalar)
+
+    #the in-place operators change the vector itself instead of creating a new one, so a vector
+    #that is shared by several objects has to be copied before it is changed this way
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other):
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
     
     def __ge__(self, other):
         if other:
@@ -137,4 +159,101 @@ class Vector2():
             return self
         _sum = abs(self.x) + abs(self.y)
         return Vector2(self.x / _sum, self.y / _sum)
-    
+
+    def copy(self):
+        '''
+        Returns a new Vector2 with the same coordinates
+
+        Returns
+        -------
+        Vector2
+            The copy
+        '''
+        return Vector2(self.x, self.y)
+
+
+class FrozenVector2(Vector2):
+    '''
+    An immutable Vector2. There is only one instance for each pair of coordinates, so the
+    constants can be compared by identity, even after being copied or pickled. The in-place
+    operators return a new Vector2 instead of changing the constant
+    '''
+    __slots__ = ()
+    _interned = {}
+
+    def __new__(cls, x=0, y=0):
+        vector = cls._interned.get((x, y))
+        if vector is None:
+            vector = super().__new__(cls)
+            object.__setattr__(vector, 'x', x)
+            object.__setattr__(vector, 'y', y)
+            cls._interned[(x, y)] = vector
+        return vector
+
+    def __init__(self, x=0, y=0):
+        pass
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenVector2 can not be changed")
+
+    def __iadd__(self, other):
+        return self + other
+
+    def __isub__(self, other):
+        return self - other
+
+    def __imul__(self, scalar):
+        return self * scalar
+
+    def __reduce__(self):
+        return FrozenVector2, (self.x, self.y)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def copy(self):
+        return self
+
+
+def copy_vector(value):
+    '''
+    Returns a copy of value if it is a Vector2 which can be changed, otherwise value itself
+    '''
+    if isinstance(value, Vector2):
+        return value.copy()
+    return value
+
+
+def closest_on_segment(start, end, point):
+    '''
+    Finds the point of the line segment from start to end which is closest to point
+
+    Parameters
+    ----------
+    start : tuple
+        The start of the segment
+    end : tuple
+        The end of the segment
+    point : tuple
+        The point
+
+    Returns
+    -------
+    tuple
+        How far along the segment the closest point is, from 0 at start to 1 at end, and its
+        squared distance to point
+    '''
+    d_x = end[0] - start[0]
+    d_y = end[1] - start[1]
+    p_x = point[0] - start[0]
+    p_y = point[1] - start[1]
+    length = d_x * d_x + d_y * d_y
+    along = 0.0
+    if length:
+        along = min(max((p_x * d_x + p_y * d_y) / length, 0.0), 1.0)
+    c_x = p_x - along * d_x
+    c_y = p_y - along * d_y
+    return along, c_x * c_x + c_y * c_y